@@ -1,172 +1,587 @@
+import time
+from typing import Optional, Union
 from app.database import DatabaseManager
-from app.models import PlayerModel, PortfolioItem, Stock
+from app.models import (
+    PlayerModel, PortfolioItem, Stock, MarketDelta, MarketSnapshot, ValuationSnapshot, Order, Watchlist,
+    ORDER_SIDES, ORDER_KINDS, COMMISSION_RATE,
+)
+from app.valuation import ValuationEngine, AccountBook
+from app.history import HistoryRecorder, format_timestamp
+from app.orders import OrderBook
+from app.profiling import PROFILER
+from app.screener import Screener, validate
+
+
+class TradeConflict(Exception):
+    """The database refused a fill the in-memory ledger allowed (it changed underneath)."""
+
 
 class GameController:
-    def __init__(self, db_manager: DatabaseManager):
+    """
+    Trading logic over an in-memory ledger.
+
+    Cash and positions are loaded from SQLite once and served from memory;
+    trades write through to the database. `version` increases on every
+    change to the ledger so views can skip rebuilding unchanged tables.
+    Market value and P&L are kept up to date by a ValuationEngine.
+
+    With a PersistenceWorker, trades and history writes are queued to it
+    and the ledger in memory is updated without waiting for the disk.
+
+    Limit, stop and take-profit orders rest in an OrderBook and are filled
+    like market trades, at the tick price, when a price update reaches them.
+
+    Every player's cash and positions are also kept in an AccountBook, so
+    a league of accounts can trade on the same feed (pass `player_id` to
+    the trading methods) and all of them are valued and sampled into
+    history together on each tick. `player_id` is the selected account:
+    the one get_player(), get_portfolio() and the valuation describe.
+
+    Watchlists and saved screens live in `watchlists` and are compiled
+    into `screener`, which the scraper evaluates on every tick.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, persistence=None, player_id: int = 1):
         self.db = db_manager
-        self.player_id = 1 # Single player for now
+        self.persistence = persistence
+        self.player_id = player_id
+        self.accounts = AccountBook()
+        self.valuation = ValuationEngine()
+        self.history = HistoryRecorder(db_manager, persistence=persistence)
+        self.orders = OrderBook()
+        self._last_order_id = 0
+        self.version = 0
+        self.fills = 0 # fills applied to the ledger in memory, to spot stale ledger reads
+        self.market_ts = None # ts of the latest market update (replay clock); None: the wall clock
+        self.watchlists = {} # name -> Watchlist
+        self.screener = Screener()
+        self.load_ledger()
+        self.load_watchlists()
+
+    def close(self):
+        """Write out buffered history."""
+        self.history.flush()
+
+    @property
+    def price_cache(self) -> dict[str, float]:
+        """Latest known price per symbol."""
+        return self.valuation.prices
+
+    def load_ledger(self):
+        """(Re)load every player's cash, positions and open orders from the database."""
+        with self.db.get_connection() as conn, PROFILER.stage("db._read_ledger"):
+            ledger = self._read_ledger(conn)
+        self._set_ledger(ledger)
+
+    def reload_ledger(self):
+        """load_ledger() through the persistence worker, after everything queued before it."""
+        if self.persistence is None:
+            self.load_ledger()
+        else:
+            fills = self.fills
+            self.persistence.submit(self._read_ledger,
+                                    callback=lambda ledger, error: self._on_ledger_read(ledger, error, fills))
+
+    @staticmethod
+    def _read_ledger(conn):
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, money FROM player ORDER BY id")
+        players = [PlayerModel(id=row['id'], money=row['money']) for row in cursor.fetchall()]
+
+        cursor.execute("SELECT * FROM portfolio")
+        holdings = [
+            (row['player_id'], PortfolioItem(
+                symbol=row['symbol'],
+                quantity=row['quantity'],
+                average_cost=row['average_cost']
+            ))
+            for row in cursor.fetchall()
+        ]
+
+        cursor.execute("SELECT * FROM orders WHERE status = 'open' ORDER BY id")
+        orders = [
+            Order(id=row['id'], symbol=row['symbol'], side=row['side'], kind=row['kind'],
+                  quantity=row['quantity'], price=row['price'], player_id=row['player_id'])
+            for row in cursor.fetchall()
+        ]
+        last_order_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM orders").fetchone()[0]
+        return players, holdings, orders, last_order_id
+
+    def _on_ledger_read(self, ledger, error, fills):
+        if error is not None:
+            return
+        if fills != self.fills:
+            # Fills made since the read was queued are not in it; their writes
+            # were queued after it, so a new read sees them
+            self.reload_ledger()
+        else:
+            self._set_ledger(ledger)
+
+    def _set_ledger(self, ledger):
+        players, holdings, orders, last_order_id = ledger
+        self.accounts.reset(players, holdings)
+        # Orders placed after the ledger was read are not in it yet
+        orders += [order for order in self.orders.orders.values() if order.id > last_order_id]
+        self.orders = OrderBook()
+        for order in orders:
+            self.orders.add(order)
+        self._last_order_id = max(self._last_order_id, last_order_id)
+        self._select(self.player_id)
+
+    def select_player(self, player_id: int) -> bool:
+        """Make `player_id` the selected account; False if there is no such player."""
+        if player_id not in self.accounts:
+            return False
+        self._select(player_id)
+        return True
+
+    def _select(self, player_id):
+        self.player_id = player_id
+        if player_id in self.accounts:
+            self.player = self.accounts.player(player_id)
+            self.positions = self.accounts.positions_of(player_id)
+        else:
+            self.player, self.positions = PlayerModel(id=0, money=0.0), {}
+        self.valuation.reset(self.player.money, list(self.positions.values()), self.price_cache)
+        self.version += 1
+
+    def add_players(self, count: int, money: float = 1000.0) -> list[int]:
+        """Open `count` new accounts with `money` each (written right away, meant for setting up leagues)."""
+        player_ids = self.db.create_players(count, money)
+        for player_id in player_ids:
+            self.accounts.add_account(player_id, money)
+        return player_ids
+
+    def get_players(self) -> list[PlayerModel]:
+        return self.accounts.players()
 
     def get_player(self) -> PlayerModel:
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM player WHERE id = ?", (self.player_id,))
-            row = cursor.fetchone()
-            if row:
-                return PlayerModel(id=row['id'], money=row['money'])
-            return PlayerModel(id=0, money=0.0)
+        return PlayerModel(id=self.player.id, money=self.player.money)
 
     def get_portfolio(self) -> list[PortfolioItem]:
-        items = []
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM portfolio WHERE player_id = ?", (self.player_id,))
-            rows = cursor.fetchall()
-            for row in rows:
-                items.append(PortfolioItem(
-                    symbol=row['symbol'],
-                    quantity=row['quantity'],
-                    average_cost=row['average_cost']
-                ))
-        return items
-
-    def buy_stock(self, stock: Stock, quantity: int) -> tuple[bool, str]:
+        return [
+            PortfolioItem(symbol=item.symbol, quantity=item.quantity, average_cost=item.average_cost)
+            for item in self.positions.values()
+        ]
+
+    @PROFILER.timed("controller.buy_stock")
+    def buy_stock(self, stock: Stock, quantity: int, player_id: int = None) -> tuple[bool, str]:
+        return self._buy(stock.symbol, stock.price, stock.commission, quantity, player_id=player_id)
+
+    @PROFILER.timed("controller.sell_stock")
+    def sell_stock(self, stock: Stock, quantity: int, player_id: int = None) -> tuple[bool, str]:
+        return self._sell(stock.symbol, stock.price, stock.commission, quantity, player_id=player_id)
+
+    def _cash(self, player_id) -> float:
+        return self.player.money if player_id == self.player_id else self.accounts.cash_of(player_id)
+
+    def _holding(self, player_id, symbol) -> Optional[PortfolioItem]:
+        if player_id == self.player_id:
+            return self.positions.get(symbol)
+        return self.accounts.position(player_id, symbol)
+
+    def _buy(self, symbol, price, commission, quantity, order=None, player_id=None) -> tuple[bool, str]:
+        player_id = self.player_id if player_id is None else player_id
+        if player_id not in self.accounts:
+            return False, f"Unknown player: {player_id}"
         if quantity <= 0:
             return False, "Quantity must be positive."
 
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check Balance
-            cursor.execute("SELECT money FROM player WHERE id = ?", (self.player_id,))
-            current_money = cursor.fetchone()['money']
-            
-            total_cost = (stock.price * quantity) + stock.commission
-            
-            if current_money < total_cost:
-                return False, f"Insufficient funds. Need {total_cost:.2f}, have {current_money:.2f}."
-            
-            # Deduct Money
-            new_money = current_money - total_cost
-            cursor.execute("UPDATE player SET money = ? WHERE id = ?", (new_money, self.player_id))
-            
-            # Update Portfolio
-            cursor.execute("SELECT * FROM portfolio WHERE player_id = ? AND symbol = ?", (self.player_id, stock.symbol))
-            existing = cursor.fetchone()
-            
-            if existing:
-                new_qty = existing['quantity'] + quantity
-                # simple avg cost calculation: (old_total_cost + new_cost) / new_qty
-                # Note: commission is usually expense, not cost basis, but depends on accounting. 
-                # Let's count price only for cost basis to keep it simple, or include commission? 
-                # Simpler: ((old_qty * old_avg) + (new_qty * price)) / total_qty
-                
-                current_total_value = existing['quantity'] * existing['average_cost']
-                new_purchase_value = quantity * stock.price
-                new_avg = (current_total_value + new_purchase_value) / new_qty
-                
-                cursor.execute("""
-                    UPDATE portfolio 
-                    SET quantity = ?, average_cost = ? 
-                    WHERE player_id = ? AND symbol = ?
-                """, (new_qty, new_avg, self.player_id, stock.symbol))
-            else:
-                cursor.execute("""
-                    INSERT INTO portfolio (player_id, symbol, quantity, average_cost)
-                    VALUES (?, ?, ?, ?)
-                """, (self.player_id, stock.symbol, quantity, stock.price))
-            
-            conn.commit()
-            
-            # Record history
-            self.snapshot_portfolio_value(conn)
+        # Check Balance
+        current_money = self._cash(player_id)
+        total_cost = (price * quantity) + commission
+        
+        if current_money < total_cost:
+            return False, f"Insufficient funds. Need {total_cost:.2f}, have {current_money:.2f}."
+
+        new_money = current_money - total_cost
+        existing = self._holding(player_id, symbol)
+        if existing:
+            new_qty = existing.quantity + quantity
+            # simple avg cost calculation: (old_total_cost + new_cost) / new_qty
+            # Note: commission is usually expense, not cost basis, but depends on accounting. 
+            # Let's count price only for cost basis to keep it simple, or include commission? 
+            # Simpler: ((old_qty * old_avg) + (new_qty * price)) / total_qty
             
-            return True, "Purchase successful."
+            current_total_value = existing.quantity * existing.average_cost
+            new_purchase_value = quantity * price
+            new_avg = (current_total_value + new_purchase_value) / new_qty
+        else:
+            new_qty = quantity
+            new_avg = price
+
+        try:
+            self._fill(player_id, new_money, symbol, new_qty, new_avg, ("buy", quantity, price, commission), order)
+        except TradeConflict as e:
+            return False, str(e)
 
-    def sell_stock(self, stock: Stock, quantity: int) -> tuple[bool, str]:
+        return True, "Purchase successful."
+
+    def _sell(self, symbol, price, commission, quantity, order=None, player_id=None) -> tuple[bool, str]:
+        player_id = self.player_id if player_id is None else player_id
+        if player_id not in self.accounts:
+            return False, f"Unknown player: {player_id}"
         if quantity <= 0:
             return False, "Quantity must be positive."
 
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check Ownership
-            cursor.execute("SELECT * FROM portfolio WHERE player_id = ? AND symbol = ?", (self.player_id, stock.symbol))
-            existing = cursor.fetchone()
-            
-            if not existing or existing['quantity'] < quantity:
-                return False, "Not enough shares to sell."
-            
-            # Calculate Revenue
-            revenue = (stock.price * quantity) - stock.commission
-            
-            # Update Money
-            cursor.execute("SELECT money FROM player WHERE id = ?", (self.player_id,))
-            current_money = cursor.fetchone()['money']
-            cursor.execute("UPDATE player SET money = ? WHERE id = ?", (current_money + revenue, self.player_id))
-            
-            # Update Portfolio
-            new_qty = existing['quantity'] - quantity
-            if new_qty == 0:
-                cursor.execute("DELETE FROM portfolio WHERE player_id = ? AND symbol = ?", (self.player_id, stock.symbol))
+        # Check Ownership
+        existing = self._holding(player_id, symbol)
+        if not existing or existing.quantity < quantity:
+            return False, "Not enough shares to sell."
+        
+        # Calculate Revenue
+        revenue = (price * quantity) - commission
+        new_money = self._cash(player_id) + revenue
+        new_qty = existing.quantity - quantity
+
+        try:
+            self._fill(player_id, new_money, symbol, new_qty, existing.average_cost,
+                       ("sell", quantity, price, commission), order)
+        except TradeConflict as e:
+            return False, str(e)
+
+        return True, "Sale successful."
+
+    def _fill(self, player_id, money, symbol, quantity, average_cost, trade, order=None):
+        """
+        Apply a fill to the in-memory ledger and persist it.
+
+        `trade` is (side, quantity, price, commission) of the fill itself;
+        the database applies it with its own arithmetic, see _write_fill().
+        """
+        self.fills += 1
+        self.accounts.set_cash(player_id, money)
+        self.accounts.set_position(player_id, symbol, quantity, average_cost)
+        if player_id == self.player_id:
+            self.player.money = money
+            if quantity == 0:
+                self.positions.pop(symbol, None)
             else:
-                cursor.execute("UPDATE portfolio SET quantity = ? WHERE player_id = ? AND symbol = ?", 
-                               (new_qty, self.player_id, stock.symbol))
-            
-            conn.commit()
-            
-            # Record history
-            self.snapshot_portfolio_value(conn)
+                self.positions[symbol] = PortfolioItem(symbol=symbol, quantity=quantity, average_cost=average_cost)
+            self.valuation.on_fill(symbol, quantity, average_cost, money)
+            self.version += 1
+            net_worth = self.net_worth()
+        else:
+            net_worth = self.accounts.net_worth_of(player_id, self.price_cache)
+
+        # Record history in the same transaction as the trade, on the market's clock
+        ts = self.now()
+        self.history.record(player_id, net_worth, ts)
+        order_id = None
+        if order is not None:
+            order.status = "filled"
+            order_id = order.id
+        self._persist(self._write_fill, player_id, symbol, *trade,
+                      self.history.take_pending(), order_id, ts)
+
+    @staticmethod
+    def _write_fill(conn, player_id, symbol, side, quantity, price, commission, history_points, order_id, ts):
+        """
+        Execute one fill as a single BEGIN IMMEDIATE transaction.
+
+        Cash and quantity change relative to the stored values, guarded so
+        they cannot go negative; a guard that fails raises TradeConflict.
+        The fill is appended to `trades` along with the history point and
+        the order it executes.
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        if side == "buy":
+            cost = (price * quantity) + commission
+            cursor = conn.execute("UPDATE player SET money = money - ? WHERE id = ? AND money >= ?",
+                                  (cost, player_id, cost))
+            if cursor.rowcount == 0:
+                raise TradeConflict("Insufficient funds.")
+            conn.execute("""
+                INSERT INTO portfolio (player_id, symbol, quantity, average_cost)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (player_id, symbol) DO UPDATE SET
+                    average_cost = (quantity * average_cost + excluded.quantity * excluded.average_cost)
+                                   / (quantity + excluded.quantity),
+                    quantity = quantity + excluded.quantity
+            """, (player_id, symbol, quantity, price))
+        else:
+            cursor = conn.execute("""
+                UPDATE portfolio SET quantity = quantity - ?
+                WHERE player_id = ? AND symbol = ? AND quantity >= ?
+            """, (quantity, player_id, symbol, quantity))
+            if cursor.rowcount == 0:
+                raise TradeConflict("Not enough shares to sell.")
+            conn.execute("DELETE FROM portfolio WHERE player_id = ? AND symbol = ? AND quantity = 0",
+                         (player_id, symbol))
+            conn.execute("UPDATE player SET money = money + ? WHERE id = ?",
+                         ((price * quantity) - commission, player_id))
+        conn.execute("""
+            INSERT INTO trades (player_id, symbol, side, quantity, price, commission, order_id, executed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (player_id, symbol, side, quantity, price, commission, order_id, format_timestamp(ts)))
+        if history_points:
+            HistoryRecorder.write(conn, history_points)
+        if order_id is not None:
+            GameController._close_order(conn, order_id, "filled", price)
+
+    @staticmethod
+    def _close_order(conn, order_id, status, fill_price=None):
+        conn.execute(
+            "UPDATE orders SET status = ?, fill_price = ?, closed_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (status, fill_price, order_id)
+        )
+
+    @staticmethod
+    def _write_orders(conn, rows):
+        conn.executemany(
+            "INSERT INTO orders (id, player_id, symbol, side, kind, quantity, price) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _persist(self, fn, *args):
+        """
+        Run `fn(conn, *args)` as one transaction.
+
+        Without a persistence worker this happens right away and errors are
+        raised; with one it is queued and a failure reloads the ledger from
+        the database once it is reported back.
+        """
+        if self.persistence is None:
+            with self.db.get_connection() as conn, PROFILER.stage("db." + fn.__name__):
+                try:
+                    fn(conn, *args)
+                    conn.commit()
+                except Exception:
+                    # Database and memory must not diverge
+                    conn.rollback()
+                    self.load_ledger()
+                    raise
+        else:
+            self.persistence.submit(fn, *args, callback=self._on_persisted)
+
+    def _on_persisted(self, result, error):
+        if error is not None:
+            self.reload_ledger()
+
+    def place_order(self, symbol: str, side: str, kind: str, quantity: int, price: float,
+                    player_id: int = None) -> tuple[bool, str]:
+        """Rest a limit, stop or take-profit order; see place_orders()."""
+        return self.place_orders([(symbol, side, kind, quantity, price)], player_id)[0]
+
+    def place_orders(self, specs, player_id: int = None) -> list[tuple[bool, str]]:
+        """
+        Validate and rest a batch of (symbol, side, kind, quantity, price) orders.
+
+        Accepted orders are stored in one transaction. Orders the last known
+        price already reaches are filled right away.
+        """
+        player_id = self.player_id if player_id is None else player_id
+        results, accepted = [], [] # results: (order or None, error)
+        for symbol, side, kind, quantity, price in specs:
+            error = self._check_order(player_id, symbol, side, kind, quantity, price)
+            if error:
+                results.append((None, error))
+                continue
+            self._last_order_id += 1
+            order = Order(self._last_order_id, symbol, side, kind, quantity, price, player_id=player_id)
+            self.orders.add(order)
+            accepted.append(order)
+            results.append((order, ""))
+        if accepted:
+            self._persist(self._write_orders, [
+                (order.id, order.player_id, order.symbol, order.side, order.kind, order.quantity, order.price)
+                for order in accepted
+            ])
+            prices = self.price_cache
+            self.match_orders((order.symbol, prices[order.symbol]) for order in accepted if order.symbol in prices)
+        return [
+            (False, error) if order is None else (order.status != "rejected", f"Order #{order.id} {order.status}.")
+            for order, error in results
+        ]
+
+    def _check_order(self, player_id, symbol, side, kind, quantity, price) -> str:
+        if player_id not in self.accounts:
+            return f"Unknown player: {player_id}"
+        if side not in ORDER_SIDES:
+            return f"Unknown order side: {side}"
+        if kind not in ORDER_KINDS:
+            return f"Unknown order type: {kind}"
+        if quantity <= 0:
+            return "Quantity must be positive."
+        if price <= 0:
+            return "Price must be positive."
+        if side == "sell":
+            existing = self._holding(player_id, symbol)
+            if not existing or existing.quantity < quantity:
+                return "Not enough shares to sell."
+        return ""
+
+    def cancel_order(self, order_id: int, player_id: int = None) -> bool:
+        """Cancel one of `player_id`'s open orders; False if it is not open or belongs to another player."""
+        player_id = self.player_id if player_id is None else player_id
+        order = self.orders.orders.get(order_id)
+        if order is None or order.player_id != player_id:
+            return False
+        self.orders.cancel(order_id)
+        order.status = "cancelled"
+        self._persist(self._close_order, order_id, "cancelled")
+        return True
+
+    def get_open_orders(self, player_id: int = None) -> list[Order]:
+        player_id = self.player_id if player_id is None else player_id
+        return sorted((order for order in self.orders.orders.values() if order.player_id == player_id),
+                      key=lambda order: order.id)
 
-            return True, "Sale successful."
+    def match_orders(self, quotes) -> list[Order]:
+        """
+        Execute the open orders triggered by (symbol, price) quotes.
 
-    def update_market_cache(self, stocks: list[Stock]):
-        """Cache latest prices for accurate portfolio valuation."""
-        self.price_cache = {s.symbol: s.price for s in stocks}
+        Orders fill at the quoted price, oldest first; one that can no
+        longer be filled (cash or shares ran out) is rejected. Returns the
+        orders that left the book.
+        """
+        quotes = list(quotes)
+        prices = dict(quotes)
+        done = self.orders.match_prices(quotes)
+        for order in done:
+            price = prices[order.symbol]
+            execute = self._buy if order.side == "buy" else self._sell
+            success, _msg = execute(order.symbol, price, price * COMMISSION_RATE, order.quantity, order,
+                                    order.player_id)
+            if not success:
+                order.status = "rejected"
+                self._persist(self._close_order, order.id, "rejected")
+        return done
 
+    @PROFILER.timed("controller.update_market_cache")
+    def update_market_cache(self, stocks: Union[MarketSnapshot, list[Stock]], ts: float = None) -> list[Order]:
+        """Cache latest prices for accurate portfolio valuation; returns the orders they executed."""
+        self.market_ts = ts
+        if not isinstance(stocks, MarketSnapshot):
+            stocks = {s.symbol: s.price for s in stocks}
+        self.valuation.reset(self.player.money, list(self.positions.values()), stocks)
+        # Only symbols with resting orders are quoted to the book
+        prices = self.price_cache
+        done = self.match_orders((symbol, prices[symbol]) for symbol in self.orders.symbols() if symbol in prices)
+        self.record_tick(ts)
+        return done
+
+    @PROFILER.timed("controller.apply_market_delta")
+    def apply_market_delta(self, delta: MarketDelta, ts: float = None) -> list[Order]:
+        """Update the price cache in place for the symbols that moved; returns the orders they executed."""
+        self.market_ts = ts
+        quotes = []
+        for stock in delta.added:
+            self.valuation.on_price(stock.symbol, stock.price)
+            quotes.append((stock.symbol, stock.price))
+        for symbol, changes in delta.changed.items():
+            if "price" in changes:
+                self.valuation.on_price(symbol, changes["price"])
+                quotes.append((symbol, changes["price"]))
+        for symbol in delta.removed:
+            self.valuation.on_price(symbol, None)
+        done = self.match_orders(quotes)
+        self.record_tick(ts)
+        return done
+
+    def now(self) -> float:
+        """The time of the latest market update, so fills and samples follow a replay clock."""
+        return time.time() if self.market_ts is None else self.market_ts
+
+    def record_tick(self, ts: float = None):
+        """Sample every player's net worth into history (at most once per recorder interval)."""
+        self.market_ts = ts
+        self.history.sample_many(self.value_accounts, ts)
+
+    def value_accounts(self):
+        """(player_ids, net worths) of all accounts at cached prices, in one vectorized pass."""
+        return self.accounts.player_ids, self.accounts.net_worth(self.price_cache)
+
+    def get_valuation(self) -> ValuationSnapshot:
+        return self.valuation.snapshot()
+
+    def net_worth(self) -> float:
+        """Cash plus holdings at cached prices (average cost when unknown)."""
+        return self.valuation.net_worth
+
+    @PROFILER.timed("controller.snapshot_portfolio_value")
     def snapshot_portfolio_value(self, conn=None):
-        """Calculates total net worth and records it."""
-        # Note: If no price cache, we use average_cost (better than nothing).
-        # Ideally, we should have the latest prices.
-        
-        should_close = False
-        if conn is None:
-            conn = sqlite3.connect(self.db.db_name)
-            conn.row_factory = sqlite3.Row
-            should_close = True
+        """Records every player's net worth now; with `conn`, as part of the caller's transaction."""
+        self.history.record_many(*self.value_accounts(), self.now())
+        self.history.flush(conn)
 
-        try:
-            cursor = conn.cursor()
-            
-            # Get Money
-            cursor.execute("SELECT money FROM player WHERE id = ?", (self.player_id,))
-            row = cursor.fetchone()
-            money = row['money'] if row else 0.0
-            
-            # Get Portfolio
-            cursor.execute("SELECT * FROM portfolio WHERE player_id = ?", (self.player_id,))
-            items = cursor.fetchall()
-            
-            portfolio_value = 0.0
-            for item in items:
-                symbol = item['symbol']
-                qty = item['quantity']
-                # Use cached price if available, else cost
-                price = getattr(self, 'price_cache', {}).get(symbol, item['average_cost'])
-                portfolio_value += qty * price
-                
-            total_net_worth = money + portfolio_value
-            
-            cursor.execute("INSERT INTO portfolio_history (player_id, total_value) VALUES (?, ?)", 
-                           (self.player_id, total_net_worth))
-            if should_close:
-                conn.commit()
-        finally:
-            if should_close:
-                conn.close()
-
-    def get_portfolio_history(self) -> list[tuple]:
-        """Returns list of (timestamp, value)."""
+    def get_trades(self, start=None, end=None, player_id: int = None) -> list:
+        """Executed fills, oldest first, optionally within [start, end] (epoch seconds)."""
+        query = "SELECT * FROM trades WHERE player_id = ?"
+        params = [self.player_id if player_id is None else player_id]
+        if start is not None:
+            query += " AND executed_at >= ?"
+            params.append(format_timestamp(start))
+        if end is not None:
+            query += " AND executed_at <= ?"
+            params.append(format_timestamp(end))
+        with self.db.get_connection() as conn, PROFILER.stage("db.get_trades"):
+            return conn.execute(query + " ORDER BY id", params).fetchall()
+
+    def get_portfolio_history(self, start=None, end=None, resolution=None, max_points=None) -> list[tuple]:
+        """
+        Returns rows of (timestamp, total_value), oldest first.
+
+        See HistoryRecorder.query for how the resolution is chosen.
+        """
+        return self.history.query(self.player_id, start, end, resolution, max_points)
+
+    def fetch_portfolio_history(self, callback, start=None, end=None, resolution=None, max_points=None):
+        """get_portfolio_history() without blocking; `callback(rows)` receives the result."""
+        self.history.fetch_query(self.player_id, start, end, resolution, max_points, callback)
+
+    def fetch_portfolio_history_seed(self, max_points: int, callback):
+        """A bounded (last_id, times, values) start for incremental charts; see HistoryRecorder.seed_points()."""
+        self.history.fetch_seed_points(self.player_id, max_points, callback)
+
+    def get_portfolio_history_since(self, after_id: int = 0):
+        """Raw history points newer than `after_id`: (last_id, times, values) arrays."""
+        return self.history.points_since(self.player_id, after_id)
+
+    def fetch_portfolio_history_since(self, after_id: int, callback):
+        """get_portfolio_history_since() without blocking; `callback(points)` receives the result."""
+        self.history.fetch_points_since(self.player_id, after_id, callback)
+
+    def load_watchlists(self):
+        """(Re)load watchlists from the database and recompile the screener."""
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT timestamp, total_value FROM portfolio_history WHERE player_id = ? ORDER BY timestamp ASC", (self.player_id,))
-            return cursor.fetchall()
+            watchlists = {row["name"]: Watchlist(row["name"], [], row["expression"], row["sort"], row["row_limit"])
+                          for row in conn.execute("SELECT * FROM watchlists ORDER BY name")}
+            for row in conn.execute("SELECT watchlist, symbol FROM watchlist_symbols ORDER BY watchlist, position"):
+                watchlists[row["watchlist"]].symbols.append(row["symbol"])
+        self.watchlists = watchlists
+        self.screener.set_watchlists(watchlists.values())
+
+    def save_watchlist(self, watchlist: Watchlist) -> tuple[bool, str]:
+        """Add or replace the watchlist named `watchlist.name`."""
+        if not watchlist.name.strip():
+            return False, "Watchlist needs a name."
+        error = validate(watchlist)
+        if error:
+            return False, error
+        self.watchlists[watchlist.name] = watchlist
+        self.screener.set_watchlists(self.watchlists.values())
+        self._persist(self._write_watchlist, watchlist.name, watchlist.expression, watchlist.sort,
+                      watchlist.limit, list(watchlist.symbols))
+        return True, f"Watchlist {watchlist.name} saved."
+
+    def delete_watchlist(self, name: str) -> bool:
+        if self.watchlists.pop(name, None) is None:
+            return False
+        self.screener.set_watchlists(self.watchlists.values())
+        self._persist(self._delete_watchlist, name)
+        return True
+
+    @staticmethod
+    def _write_watchlist(conn, name, expression, sort, limit, symbols):
+        GameController._delete_watchlist(conn, name)
+        conn.execute("INSERT INTO watchlists (name, expression, sort, row_limit) VALUES (?, ?, ?, ?)",
+                     (name, expression, sort, limit))
+        conn.executemany("INSERT INTO watchlist_symbols (watchlist, position, symbol) VALUES (?, ?, ?)",
+                         [(name, i, symbol) for i, symbol in enumerate(symbols)])
+
+    @staticmethod
+    def _delete_watchlist(conn, name):
+        conn.execute("DELETE FROM watchlist_symbols WHERE watchlist = ?", (name,))
+        conn.execute("DELETE FROM watchlists WHERE name = ?", (name,))
@@ -1,21 +1,88 @@
 import sqlite3
 import os
+import threading
 from contextlib import contextmanager
+from app.history import rebuild_rollups
 
 DB_NAME = "game.db"
 
+# Applied to pooled connections
+POOLED_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",      # readers don't block the writer
+    "PRAGMA synchronous = NORMAL",    # safe with WAL, no fsync per commit
+    "PRAGMA cache_size = -8192",      # 8 MiB page cache
+    "PRAGMA temp_store = MEMORY",
+)
+
 class DatabaseManager:
-    def __init__(self, db_name=DB_NAME):
+    """
+    Hands out SQLite connections.
+
+    By default every get_connection() opens and closes its own connection.
+    With pooled=True each thread keeps one long-lived connection (WAL
+    journal, tuned pragmas), so repeated calls reuse its page cache and
+    compiled statements instead of reopening the file.
+    """
+
+    def __init__(self, db_name=DB_NAME, pooled=False, cached_statements=128):
         self.db_name = db_name
+        self.pooled = pooled
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._pool = [] # every pooled connection, for close()
+        self._pool_lock = threading.Lock()
+
+    def _connect(self):
+        # Pooled connections are only used by their own thread, but close()
+        # may run on another one
+        conn = sqlite3.connect(self.db_name, cached_statements=self.cached_statements,
+                               check_same_thread=not self.pooled)
+        conn.row_factory = sqlite3.Row  # Access columns by name
+        return conn
 
     @contextmanager
     def get_connection(self):
-        conn = sqlite3.connect(self.db_name)
-        conn.row_factory = sqlite3.Row  # Access columns by name
+        if not self.pooled:
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+            return
+
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            for pragma in POOLED_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._pool_lock:
+                self._pool.append(conn)
+        self._local.depth += 1
         try:
             yield conn
         finally:
+            self._local.depth -= 1
+            # Same outcome as closing: uncommitted work is discarded
+            if self._local.depth == 0 and conn.in_transaction:
+                conn.rollback()
+
+    def close(self):
+        """Close all pooled connections (no-op in per-call mode)."""
+        with self._pool_lock:
+            pool, self._pool = self._pool, []
+        for conn in pool:
             conn.close()
+        self._local = threading.local()
+
+    def create_players(self, count: int, money: float = 1000.0) -> list[int]:
+        """Add `count` players with `money` each in one transaction; returns their ids."""
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            ids = [conn.execute("INSERT INTO player (money) VALUES (?)", (money,)).lastrowid for _ in range(count)]
+            conn.commit()
+        return ids
 
     def init_db(self):
         """Initialize the database with necessary tables."""
@@ -55,6 +122,96 @@ class DatabaseManager:
                 )
             ''')
             
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_portfolio_history_player_time
+                ON portfolio_history (player_id, timestamp)
+            ''')
+
+            # OHLC of net worth per time bucket (resolution in seconds)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS portfolio_history_rollup (
+                    player_id INTEGER NOT NULL,
+                    resolution INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    PRIMARY KEY (player_id, resolution, bucket),
+                    FOREIGN KEY (player_id) REFERENCES player (id)
+                ) WITHOUT ROWID
+            ''')
+
+            # Limit, stop and take-profit orders; open ones are reloaded at startup
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS orders (
+                    id INTEGER PRIMARY KEY,
+                    player_id INTEGER NOT NULL,
+                    symbol TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    price REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'open',
+                    fill_price REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    closed_at TIMESTAMP,
+                    FOREIGN KEY (player_id) REFERENCES player (id)
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_orders_open
+                ON orders (player_id) WHERE status = 'open'
+            ''')
+
+            # Append-only ledger of every fill
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS trades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_id INTEGER NOT NULL,
+                    symbol TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    price REAL NOT NULL,
+                    commission REAL NOT NULL,
+                    order_id INTEGER,
+                    executed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (player_id) REFERENCES player (id),
+                    FOREIGN KEY (order_id) REFERENCES orders (id)
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_trades_player_time
+                ON trades (player_id, executed_at)
+            ''')
+
+            # Watchlists and saved screens (see app.screener), shared by all players
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS watchlists (
+                    name TEXT PRIMARY KEY,
+                    expression TEXT NOT NULL DEFAULT '',
+                    sort TEXT NOT NULL DEFAULT '',
+                    row_limit INTEGER
+                )
+            ''')
+
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS watchlist_symbols (
+                    watchlist TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    symbol TEXT NOT NULL,
+                    PRIMARY KEY (watchlist, position),
+                    FOREIGN KEY (watchlist) REFERENCES watchlists (name)
+                ) WITHOUT ROWID
+            ''')
+
+            # Backfill rollups for databases created before they existed
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM portfolio_history_rollup)')
+            if not cursor.fetchone()[0]:
+                rebuild_rollups(conn)
+            
             # Create default player if not exists
             cursor.execute('SELECT count(*) FROM player')
             if cursor.fetchone()[0] == 0:
@@ -0,0 +1,310 @@
+import time
+import threading
+
+import numpy as np
+
+# Rollup resolutions in seconds: 1 minute, 1 hour, 1 day
+RESOLUTIONS = (60, 3600, 86400)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S" # Same as SQLite's CURRENT_TIMESTAMP (UTC)
+
+UPSERT_ROLLUP = """
+    INSERT INTO portfolio_history_rollup (player_id, resolution, bucket, open, high, low, close)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(player_id, resolution, bucket) DO UPDATE SET
+        high = max(high, excluded.high),
+        low = min(low, excluded.low),
+        close = excluded.close
+"""
+
+
+def format_timestamp(ts: float) -> str:
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(ts))
+
+
+def aggregate(samples, resolution):
+    """Fold (player_id, ts, value) samples, in time order, into OHLC rows per bucket."""
+    buckets = {}
+    for player_id, ts, value in samples:
+        key = (player_id, int(ts // resolution) * resolution)
+        ohlc = buckets.get(key)
+        if ohlc is None:
+            buckets[key] = [value, value, value, value]
+        else:
+            ohlc[1] = max(ohlc[1], value)
+            ohlc[2] = min(ohlc[2], value)
+            ohlc[3] = value
+    return [(player_id, resolution, bucket, *ohlc) for (player_id, bucket), ohlc in buckets.items()]
+
+
+def rebuild_rollups(conn):
+    """Recompute all rollups from the raw portfolio_history rows."""
+    cursor = conn.execute("""
+        SELECT player_id, CAST(strftime('%s', timestamp) AS INTEGER), total_value
+        FROM portfolio_history ORDER BY timestamp ASC, id ASC
+    """)
+    samples = cursor.fetchall()
+    conn.execute("DELETE FROM portfolio_history_rollup")
+    for resolution in RESOLUTIONS:
+        conn.executemany(UPSERT_ROLLUP, aggregate(samples, resolution))
+
+
+class HistoryRecorder:
+    """
+    Buffers net-worth samples and writes them in batches.
+
+    sample() keeps at most one point per `interval` seconds per player
+    and writes the pending points, together with their 1m/1h/1d OHLC
+    rollups, in a single transaction once `flush_interval` seconds passed
+    or `batch_size` points are waiting; sample_many() does the same for
+    many players in one step. record() always keeps the point
+    and leaves writing to the caller (used for trades). With a
+    PersistenceWorker set, flushes are queued to it instead of writing on
+    the calling thread.
+    """
+
+    def __init__(self, db_manager, interval=10.0, flush_interval=60.0, batch_size=100, persistence=None):
+        self.db = db_manager
+        self.persistence = persistence
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = [] # (player_id, ts, value)
+        self._last_sample = {} # player_id -> ts
+        self._last_flush = None # sample ts the flush timer counts from; set by the first sample
+        self._lock = threading.Lock()
+        self.version = 0 # Bumped with every recorded point
+
+    def sample(self, player_id: int, value: float, ts: float = None):
+        ts = time.time() if ts is None else ts
+        if ts - self._last_sample.get(player_id, float("-inf")) >= self.interval:
+            self.record(player_id, value, ts)
+        self._flush_if_due(ts)
+
+    def sample_many(self, valuate, ts: float = None):
+        """
+        sample() for a whole league on one clock.
+
+        `valuate()` returns (player_ids, values) arrays and is only called
+        when a sample is due.
+        """
+        ts = time.time() if ts is None else ts
+        if ts - self._last_sample.get(None, float("-inf")) >= self.interval:
+            self.record_many(*valuate(), ts)
+            with self._lock:
+                self._last_sample[None] = ts
+        self._flush_if_due(ts)
+
+    def record(self, player_id: int, value: float, ts: float = None):
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._pending.append((player_id, ts, value))
+            self._last_sample[player_id] = ts
+            self.version += 1
+
+    def record_many(self, player_ids, values, ts: float = None):
+        """record() for many players at the same time."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            self._pending.extend((player_id, ts, value)
+                                 for player_id, value in zip(np.asarray(player_ids).tolist(),
+                                                             np.asarray(values).tolist()))
+            self.version += 1
+
+    def _flush_if_due(self, ts):
+        # Timed on the samples' own clock, so replayed or backdated ts work too
+        if self._last_flush is None:
+            self._last_flush = ts
+        if self._pending and (len(self._pending) >= self.batch_size
+                              or ts - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def take_pending(self) -> list:
+        """Hand pending samples to the caller, who becomes responsible for writing them."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if pending:
+                # Only ever forward, whatever order the samples came in
+                newest = max(ts for _, ts, _ in pending)
+                self._last_flush = newest if self._last_flush is None else max(self._last_flush, newest)
+        return pending
+
+    def flush(self, conn=None):
+        """Write pending samples; with `conn`, the caller commits."""
+        pending = self.take_pending()
+        if not pending:
+            return
+        if conn is not None:
+            self.write(conn, pending)
+        elif self.persistence is not None:
+            self.persistence.submit(self.write, pending)
+        else:
+            with self.db.get_connection() as conn:
+                self.write(conn, pending)
+                conn.commit()
+
+    @staticmethod
+    def write(conn, pending):
+        conn.executemany(
+            "INSERT INTO portfolio_history (player_id, total_value, timestamp) VALUES (?, ?, ?)",
+            [(player_id, value, format_timestamp(ts)) for player_id, ts, value in pending]
+        )
+        for resolution in RESOLUTIONS:
+            conn.executemany(UPSERT_ROLLUP, aggregate(pending, resolution))
+
+    def query(self, player_id: int, start: float = None, end: float = None,
+              resolution: int = None, max_points: int = None):
+        """
+        Rows with `timestamp` and `total_value` (plus open/high/low for rollups).
+
+        resolution=0 reads raw samples. None reads raw samples if the window
+        holds at most max_points of them, else the finest rollup that fits.
+        With max_points set, at most that many (most recent) rows return.
+        """
+        self.flush()
+        with self.db.get_connection() as conn:
+            return self.read_query(conn, player_id, start, end, resolution, max_points)
+
+    def fetch_query(self, player_id: int, start: float = None, end: float = None,
+                    resolution: int = None, max_points: int = None, callback=None):
+        """query() without blocking: `callback(rows)` runs once the data is read."""
+        self._fetch(callback, self.read_query, player_id, start, end, resolution, max_points)
+
+    @classmethod
+    def read_query(cls, conn, player_id, start, end, resolution, max_points):
+        if resolution is None:
+            if max_points is None:
+                return cls._query_raw(conn, player_id, start, end, None)
+            rows = cls._query_raw(conn, player_id, start, end, max_points + 1)
+            if len(rows) <= max_points:
+                return rows
+            resolution = cls._pick_resolution(conn, player_id, start, end, max_points)
+        if resolution == 0:
+            return cls._query_raw(conn, player_id, start, end, max_points)
+        return cls._query_rollup(conn, player_id, resolution, start, end, max_points)
+
+    def points_since(self, player_id: int, after_id: int = 0):
+        """
+        Raw samples with id > after_id, for charts that append incrementally.
+
+        Returns (last_id, times as datetime64[s], values as float64).
+        """
+        self.flush()
+        with self.db.get_connection() as conn:
+            return self.read_points_since(conn, player_id, after_id)
+
+    def fetch_points_since(self, player_id: int, after_id: int, callback):
+        """points_since() without blocking: `callback(result)` runs once the data is read."""
+        self._fetch(callback, self.read_points_since, player_id, after_id)
+
+    def seed_points(self, player_id: int, max_points: int):
+        """
+        A bounded start for incremental charts: at most `max_points` rows.
+
+        Returns (last_id, times, values) like points_since(), built from the
+        same raw-or-rollup rows as query(); points_since(last_id) then
+        continues with raw samples.
+        """
+        self.flush()
+        with self.db.get_connection() as conn:
+            return self.read_seed_points(conn, player_id, max_points)
+
+    def fetch_seed_points(self, player_id: int, max_points: int, callback):
+        """seed_points() without blocking: `callback(result)` runs once the data is read."""
+        self._fetch(callback, self.read_seed_points, player_id, max_points)
+
+    def _fetch(self, callback, read, *args):
+        # Reads queue behind the pending writes, so they see them
+        self.flush()
+        if self.persistence is None:
+            with self.db.get_connection() as conn:
+                callback(read(conn, *args))
+            return
+
+        # A failed read is reported as None (the worker logs the error)
+        self.persistence.submit(read, *args, callback=lambda result, error: callback(result))
+
+    @staticmethod
+    def read_points_since(conn, player_id, after_id):
+        rows = conn.execute(
+            "SELECT id, timestamp, total_value FROM portfolio_history WHERE player_id = ? AND id > ? ORDER BY id",
+            (player_id, after_id)
+        ).fetchall()
+        if not rows:
+            return after_id, np.array([], dtype="datetime64[s]"), np.array([], dtype=np.float64)
+        ids, timestamps, values = zip(*rows)
+        return ids[-1], np.array(timestamps, dtype="datetime64[s]"), np.array(values, dtype=np.float64)
+
+    @classmethod
+    def read_seed_points(cls, conn, player_id, max_points):
+        # Highest id first: samples written after it are left to points_since()
+        last_id = conn.execute("SELECT max(id) FROM portfolio_history").fetchone()[0] or 0
+        rows = cls.read_query(conn, player_id, None, None, None, max_points)
+        return (last_id,
+                np.array([row["timestamp"] for row in rows], dtype="datetime64[s]"),
+                np.array([row["total_value"] for row in rows], dtype=np.float64))
+
+    @staticmethod
+    def _query_raw(conn, player_id, start, end, limit):
+        sql = ["SELECT timestamp, total_value FROM portfolio_history WHERE player_id = ?"]
+        params = [player_id]
+        if start is not None:
+            sql.append("AND timestamp >= ?")
+            params.append(format_timestamp(start))
+        if end is not None:
+            sql.append("AND timestamp <= ?")
+            params.append(format_timestamp(end))
+        sql.append("ORDER BY timestamp DESC, id DESC")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        rows = conn.execute(" ".join(sql), params).fetchall()
+        rows.reverse()
+        return rows
+
+    @staticmethod
+    def _query_rollup(conn, player_id, resolution, start, end, limit):
+        sql = ["""
+            SELECT strftime('%Y-%m-%d %H:%M:%S', bucket, 'unixepoch') AS timestamp,
+                   close AS total_value, open, high, low
+            FROM portfolio_history_rollup
+            WHERE player_id = ? AND resolution = ?
+        """]
+        params = [player_id, resolution]
+        if start is not None:
+            sql.append("AND bucket >= ?")
+            params.append(int(start // resolution) * resolution)
+        if end is not None:
+            sql.append("AND bucket <= ?")
+            params.append(int(end))
+        sql.append("ORDER BY bucket DESC")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        rows = conn.execute(" ".join(sql), params).fetchall()
+        rows.reverse()
+        return rows
+
+    @staticmethod
+    def _pick_resolution(conn, player_id, start, end, max_points):
+        """Finest rollup resolution that covers the window in max_points buckets."""
+        # Separate min() and max() so each is a single index lookup
+        first = conn.execute(
+            "SELECT min(bucket) FROM portfolio_history_rollup WHERE player_id = ? AND resolution = ?",
+            (player_id, RESOLUTIONS[0])
+        ).fetchone()[0]
+        last = conn.execute(
+            "SELECT max(bucket) FROM portfolio_history_rollup WHERE player_id = ? AND resolution = ?",
+            (player_id, RESOLUTIONS[0])
+        ).fetchone()[0]
+        if first is None:
+            return RESOLUTIONS[0]
+        if start is not None:
+            first = max(first, start)
+        if end is not None:
+            last = min(last, end)
+        span = max(last - first, 0)
+        for resolution in RESOLUTIONS:
+            if span / resolution < max_points:
+                return resolution
+        return RESOLUTIONS[-1]
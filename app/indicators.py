@@ -0,0 +1,192 @@
+from typing import Union
+
+import numpy as np
+
+from app.models import MarketSnapshot, Stock
+
+# Names of the arrays IndicatorEngine.update() returns
+INDICATORS = (
+    "sma", "ema", "rsi", "macd", "macd_signal", "macd_hist",
+    "bb_middle", "bb_upper", "bb_lower", "vwap",
+)
+
+
+class IndicatorEngine:
+    """
+    Incremental technical indicators for the whole market at once.
+
+    Every symbol is a column in NumPy state arrays; update() folds one
+    tick into that state in O(symbols) time (a ring buffer with running
+    sums for the windowed indicators, recursive smoothing for the rest)
+    instead of recomputing each window. Symbols missing from a tick
+    carry their last price forward. Values are NaN until a symbol has
+    seen enough ticks for the indicator's window. Periods are in ticks.
+    """
+
+    RESYNC_EVERY = 1000 # Recompute running sums from the buffer to shed float drift
+
+    def __init__(self, sma_period=20, ema_period=20, rsi_period=14,
+                 macd_periods=(12, 26, 9), bollinger_period=20, bollinger_width=2.0):
+        self.sma_period = sma_period
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self.macd_fast, self.macd_slow, self.macd_signal_period = macd_periods
+        self.bollinger_period = bollinger_period
+        self.bollinger_width = bollinger_width
+
+        self.symbols = []
+        self.index = {} # symbol -> column
+        self.ticks = 0
+        self._window = max(sma_period, bollinger_period)
+
+        capacity = 64
+        self._buffer = np.zeros((self._window, capacity)) # last prices, one row per tick
+        self.count = np.zeros(capacity, dtype=np.int64)   # ticks seen per symbol
+        for name in self._STATE:
+            setattr(self, name, np.zeros(capacity))
+
+    # Per-symbol float state arrays
+    _STATE = ("last_price", "_sma_sum", "_bb_sum", "_bb_sq_sum", "_ema", "_ema_fast",
+              "_ema_slow", "_macd_signal", "_avg_gain", "_avg_loss")
+
+    def _grow(self, capacity):
+        def grow(array):
+            new = np.zeros(array.shape[:-1] + (capacity,), dtype=array.dtype)
+            new[..., :array.shape[-1]] = array
+            return new
+
+        self._buffer = grow(self._buffer)
+        self.count = grow(self.count)
+        for name in self._STATE:
+            setattr(self, name, grow(getattr(self, name)))
+
+    def register(self, symbols) -> np.ndarray:
+        """Column index of each symbol, adding new ones."""
+        columns = np.empty(len(symbols), dtype=np.int64)
+        for i, symbol in enumerate(symbols):
+            column = self.index.get(symbol)
+            if column is None:
+                column = len(self.symbols)
+                self.index[symbol] = column
+                self.symbols.append(symbol)
+            columns[i] = column
+        capacity = len(self.count)
+        if len(self.symbols) > capacity:
+            self._grow(max(len(self.symbols), capacity * 2))
+        return columns
+
+    def update(self, stocks: Union[MarketSnapshot, list[Stock]]) -> dict[str, np.ndarray]:
+        """Fold one market snapshot in; returns INDICATORS arrays aligned with self.symbols."""
+        if isinstance(stocks, MarketSnapshot):
+            columns = self.register(stocks.symbols)
+            prices = stocks.prices
+        else:
+            columns = self.register([s.symbol for s in stocks])
+            prices = np.fromiter((s.price for s in stocks), dtype=np.float64, count=len(stocks))
+        self.update_prices(columns, prices)
+        return self.values(stocks)
+
+    def update_prices(self, columns: np.ndarray, prices: np.ndarray):
+        """Fold one tick of prices in; `columns` comes from register()."""
+        n = len(self.symbols)
+
+        # Carry forward symbols absent from this tick
+        price = self.last_price[:n].copy()
+        price[columns] = prices
+        count = self.count[:n]
+        first = count == 0
+
+        # Windowed sums: drop the value leaving each window, add the new one
+        slot = self.ticks % self._window
+        buffer = self._buffer[:, :n]
+        for period, sums in ((self.sma_period, (self._sma_sum,)),
+                             (self.bollinger_period, (self._bb_sum, self._bb_sq_sum))):
+            leaving = np.where(count >= period, buffer[(self.ticks - period) % self._window], 0.0)
+            sums[0][:n] += price - leaving
+            if len(sums) == 2:
+                sums[1][:n] += price * price - leaving * leaving
+        buffer[slot] = price
+
+        # Recursive smoothing, seeded with the first price
+        for ema, period in ((self._ema, self.ema_period), (self._ema_fast, self.macd_fast),
+                            (self._ema_slow, self.macd_slow)):
+            alpha = 2.0 / (period + 1)
+            ema[:n] = np.where(first, price, ema[:n] + alpha * (price - ema[:n]))
+        macd = self._ema_fast[:n] - self._ema_slow[:n]
+        alpha = 2.0 / (self.macd_signal_period + 1)
+        signal = self._macd_signal
+        signal[:n] = np.where(first, macd, signal[:n] + alpha * (macd - signal[:n]))
+
+        # Wilder's RSI: simple average over the first period, then smoothed
+        change = np.where(first, 0.0, price - self.last_price[:n])
+        steps = np.minimum(count, self.rsi_period) # changes seen so far, capped
+        weight = np.where(first, 0.0, 1.0 / np.maximum(steps, 1))
+        self._avg_gain[:n] += weight * (np.maximum(change, 0.0) - self._avg_gain[:n])
+        self._avg_loss[:n] += weight * (np.maximum(-change, 0.0) - self._avg_loss[:n])
+
+        self.last_price[:n] = price
+        count += 1
+        self.ticks += 1
+        if self.ticks % self.RESYNC_EVERY == 0:
+            self._resync()
+
+    def _resync(self):
+        n = len(self.symbols)
+        for period, sums in ((self.sma_period, (self._sma_sum,)),
+                             (self.bollinger_period, (self._bb_sum, self._bb_sq_sum))):
+            slots = [(self.ticks - 1 - k) % self._window for k in range(period)]
+            window = self._buffer[slots, :n]
+            # Only the last `count` entries belong to symbols that started late
+            mask = np.arange(period)[:, None] < self.count[:n][None, :]
+            sums[0][:n] = np.where(mask, window, 0.0).sum(axis=0)
+            if len(sums) == 2:
+                sums[1][:n] = np.where(mask, window * window, 0.0).sum(axis=0)
+
+    def values(self, stocks: Union[MarketSnapshot, list[Stock]] = None) -> dict[str, np.ndarray]:
+        """Current indicator arrays; `stocks` supplies the volume fields for VWAP."""
+        n = len(self.symbols)
+        count = self.count[:n]
+        nan = np.nan
+
+        sma = np.where(count >= self.sma_period, self._sma_sum[:n] / self.sma_period, nan)
+        mean = self._bb_sum[:n] / self.bollinger_period
+        variance = np.maximum(self._bb_sq_sum[:n] / self.bollinger_period - mean * mean, 0.0)
+        band = self.bollinger_width * np.sqrt(variance)
+        bollinger_ready = count >= self.bollinger_period
+
+        gain, loss = self._avg_gain[:n], self._avg_loss[:n]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = np.where(loss > 0, 100.0 - 100.0 / (1.0 + gain / loss), np.where(gain > 0, 100.0, 50.0))
+        rsi = np.where(count > self.rsi_period, rsi, nan)
+
+        macd_ready = count >= self.macd_slow
+        macd = self._ema_fast[:n] - self._ema_slow[:n]
+        signal = self._macd_signal[:n]
+
+        vwap = np.full(n, nan)
+        if stocks is not None and len(stocks):
+            if isinstance(stocks, MarketSnapshot):
+                columns = np.fromiter((self.index[symbol] for symbol in stocks.symbols), dtype=np.int64, count=len(stocks))
+                lot, tl = stocks.columns["capacity_lot"], stocks.columns["capacity_tl"]
+                average = stocks.array("average")
+            else:
+                columns = np.fromiter((self.index[s.symbol] for s in stocks), dtype=np.int64, count=len(stocks))
+                lot = np.fromiter((s.capacity_lot for s in stocks), dtype=np.float64, count=len(stocks))
+                tl = np.fromiter((s.capacity_tl for s in stocks), dtype=np.float64, count=len(stocks))
+                average = np.fromiter((s.average for s in stocks), dtype=np.float64, count=len(stocks))
+            # Session VWAP from traded TL / lots, the exchange's own average otherwise
+            with np.errstate(divide="ignore", invalid="ignore"):
+                vwap[columns] = np.where(lot > 0, tl / lot, average)
+
+        return {
+            "sma": sma,
+            "ema": np.where(count > 0, self._ema[:n], nan),
+            "rsi": rsi,
+            "macd": np.where(macd_ready, macd, nan),
+            "macd_signal": np.where(macd_ready, signal, nan),
+            "macd_hist": np.where(macd_ready, macd - signal, nan),
+            "bb_middle": np.where(bollinger_ready, mean, nan),
+            "bb_upper": np.where(bollinger_ready, mean + band, nan),
+            "bb_lower": np.where(bollinger_ready, mean - band, nan),
+            "vwap": vwap,
+        }
@@ -1,6 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from typing import Optional
 
+import numpy as np
+
+# Commission per trade, as a fraction of the share price
+COMMISSION_RATE = 2 / 1000
+
 @dataclass
 class Stock:
     symbol: str
@@ -15,7 +20,206 @@ class Stock:
     @property
     def commission(self) -> float:
         """Calculate commission (example: 0.2%)"""
-        return self.price * 2 / 1000
+        return self.price * COMMISSION_RATE
+
+# Quote fields that can move between ticks (everything but the symbol)
+STOCK_FIELDS = tuple(f.name for f in fields(Stock) if f.name != "symbol")
+
+# MarketSnapshot column -> (dtype, scale): prices in integer kuruş, percent in hundredths
+SNAPSHOT_COLUMNS = {
+    "price": (np.int64, 100),
+    "highest": (np.int64, 100),
+    "lowest": (np.int64, 100),
+    "average": (np.int64, 100),
+    "percent_change": (np.int32, 100),
+    "capacity_lot": (np.float64, 1),
+    "capacity_tl": (np.float64, 1),
+}
+
+
+class StockView:
+    """
+    Read-only Stock-like view of one MarketSnapshot row.
+
+    Holds only the snapshot and the row number; every field is read from
+    the snapshot's columns when accessed.
+    """
+    __slots__ = ("snapshot", "row")
+
+    def __init__(self, snapshot: "MarketSnapshot", row: int):
+        self.snapshot = snapshot
+        self.row = row
+
+    @property
+    def symbol(self) -> str:
+        return self.snapshot.symbols[self.row]
+
+    @property
+    def commission(self) -> float:
+        return self.price * COMMISSION_RATE
+
+    def to_stock(self) -> Stock:
+        return Stock(self.symbol, *(getattr(self, name) for name in STOCK_FIELDS))
+
+    def __eq__(self, other):
+        if isinstance(other, (Stock, StockView)):
+            return all(getattr(self, name) == getattr(other, name) for name in ("symbol",) + STOCK_FIELDS)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"StockView({self.to_stock()!r})"
+
+
+def _view_field(name, scale):
+    if scale == 1:
+        return property(lambda view: float(view.snapshot.columns[name][view.row]))
+    return property(lambda view: int(view.snapshot.columns[name][view.row]) / scale)
+
+
+for _name, (_dtype, _scale) in SNAPSHOT_COLUMNS.items():
+    setattr(StockView, _name, _view_field(_name, _scale))
+
+
+class MarketSnapshot:
+    """
+    One tick of quotes for the whole market, stored column-wise.
+
+    `columns` holds one typed array per Stock field (see SNAPSHOT_COLUMNS)
+    and `index` maps symbol -> row. Consecutive snapshots with the same
+    symbols in the same order share one `symbols` list and `index` dict.
+    Iterating or get() yields StockViews, so code written for lists of
+    Stock keeps working without a Stock object per row.
+    """
+
+    def __init__(self, symbols: list[str], columns: dict[str, np.ndarray], index: dict[str, int] = None):
+        self.symbols = symbols
+        self.columns = columns
+        self.index = index if index is not None else {symbol: row for row, symbol in enumerate(symbols)}
+        self._floats = {} # field -> float64 column in lira, built on first use
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple], previous: "MarketSnapshot" = None) -> "MarketSnapshot":
+        """Build from (symbol, price, ...) tuples in Stock field order, as the parser returns them."""
+        symbols = [row[0] for row in rows]
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(len(rows), len(STOCK_FIELDS))
+        columns = {}
+        for i, (name, (dtype, scale)) in enumerate(SNAPSHOT_COLUMNS.items()):
+            column = values[:, i]
+            columns[name] = np.rint(column * scale).astype(dtype) if scale != 1 else column.copy()
+        if previous is not None and previous.symbols == symbols:
+            return cls(previous.symbols, columns, previous.index)
+        return cls(symbols, columns)
+
+    @classmethod
+    def from_stocks(cls, stocks, previous: "MarketSnapshot" = None) -> "MarketSnapshot":
+        return cls.from_rows([(s.symbol, *(getattr(s, name) for name in STOCK_FIELDS)) for s in stocks], previous)
+
+    @classmethod
+    def of(cls, stocks) -> "MarketSnapshot":
+        """`stocks` itself if it already is a snapshot, else a snapshot of the Stock list."""
+        return stocks if isinstance(stocks, cls) else cls.from_stocks(stocks)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __iter__(self):
+        return (StockView(self, row) for row in range(len(self.symbols)))
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self.index
+
+    def get(self, symbol: str) -> Optional[StockView]:
+        row = self.index.get(symbol)
+        return None if row is None else StockView(self, row)
+
+    @property
+    def prices(self) -> np.ndarray:
+        """Prices in lira as float64, aligned with `symbols`."""
+        return self.array("price")
+
+    def array(self, name: str) -> np.ndarray:
+        """One field as float64 in its natural unit (lira, percent), aligned with `symbols`; do not modify."""
+        array = self._floats.get(name)
+        if array is None:
+            _dtype, scale = SNAPSHOT_COLUMNS[name]
+            column = self.columns[name]
+            array = self._floats[name] = column / scale if scale != 1 else column
+        return array
+
+    def values(self, name: str) -> list[float]:
+        """One field for every row, as Python floats."""
+        return self.array(name).tolist()
+
+    def price_map(self) -> dict[str, float]:
+        """A new symbol -> price dict."""
+        return dict(zip(self.symbols, self.prices.tolist()))
+
+    def to_stocks(self) -> list[Stock]:
+        return [Stock(*row) for row in zip(self.symbols, *(self.values(name) for name in STOCK_FIELDS))]
+
+
+@dataclass
+class MarketDelta:
+    """Difference between two consecutive market snapshots."""
+    added: list[Stock] = field(default_factory=list)
+    changed: dict[str, dict[str, float]] = field(default_factory=dict)  # symbol -> {field: new value}
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def touched_symbols(self):
+        """Symbols whose quote was added, changed or removed."""
+        yield from (s.symbol for s in self.added)
+        yield from self.changed
+        yield from self.removed
+
+    @classmethod
+    def between_snapshots(cls, previous: Optional["MarketSnapshot"], current: "MarketSnapshot") -> "MarketDelta":
+        """between() for MarketSnapshots: fields are compared column by column in one pass."""
+        delta = cls()
+        if previous is None or not len(previous):
+            delta.added = current.to_stocks()
+            return delta
+        if current.index is previous.index:
+            old_rows = np.arange(len(current))
+        else:
+            old_rows = np.fromiter((previous.index.get(symbol, -1) for symbol in current.symbols),
+                                   dtype=np.int64, count=len(current))
+        known = old_rows >= 0
+        moved = {}
+        for name in STOCK_FIELDS:
+            old = previous.columns[name][np.where(known, old_rows, 0)]
+            moved[name] = known & (current.columns[name] != old)
+        any_moved = np.logical_or.reduce(list(moved.values()))
+        rows = np.flatnonzero(any_moved)
+        if len(rows):
+            fields = [(name, (current.columns[name][rows] / SNAPSHOT_COLUMNS[name][1]).tolist(),
+                       moved[name][rows].tolist()) for name in STOCK_FIELDS]
+            symbols = current.symbols
+            for i, row in enumerate(rows.tolist()):
+                delta.changed[symbols[row]] = {name: values[i] for name, values, flags in fields if flags[i]}
+        if current.index is not previous.index:
+            delta.added = [StockView(current, row).to_stock() for row in np.flatnonzero(~known).tolist()]
+            delta.removed = [symbol for symbol in previous.symbols if symbol not in current.index]
+        return delta
+
+    @classmethod
+    def between(cls, previous: dict[str, Stock], current: dict[str, Stock]) -> "MarketDelta":
+        delta = cls()
+        for symbol, stock in current.items():
+            old = previous.get(symbol)
+            if old is None:
+                delta.added.append(stock)
+                continue
+            diff = {
+                name: value for name in STOCK_FIELDS
+                if (value := getattr(stock, name)) != getattr(old, name)
+            }
+            if diff:
+                delta.changed[symbol] = diff
+        delta.removed = [symbol for symbol in previous if symbol not in current]
+        return delta
 
 @dataclass
 class PlayerModel:
@@ -36,3 +240,70 @@ class PortfolioItem:
     @property
     def profit_loss(self) -> float:
         return self.market_value - (self.quantity * self.average_cost)
+
+@dataclass
+class Watchlist:
+    """
+    A named view of the market: a fixed symbol list, a screener filter, or both.
+
+    With an `expression` (see app.screener) the list is re-screened every
+    tick; `symbols`, when given, limits it to those symbols. `sort` and
+    `limit` keep only the top rows, e.g. sort="capacity_tl desc", limit=20.
+    """
+    name: str
+    symbols: list[str] = field(default_factory=list)
+    expression: str = ""
+    sort: str = ""
+    limit: Optional[int] = None
+
+ORDER_SIDES = ("buy", "sell")
+ORDER_KINDS = ("limit", "stop", "take_profit")
+
+@dataclass
+class Order:
+    """A resting order, filled at the first tick that reaches `price`."""
+    id: int
+    symbol: str
+    side: str       # one of ORDER_SIDES
+    kind: str       # one of ORDER_KINDS
+    quantity: int
+    price: float    # limit or trigger level
+    status: str = "open" # open, filled, cancelled or rejected
+    player_id: int = 1
+
+    @property
+    def triggers_below(self) -> bool:
+        """True if the order fires when the price falls to `price`, False when it rises to it."""
+        # Limit buys and take-profit buys wait for a lower price, stop buys
+        # for a breakout; sells mirror that
+        return (self.side == "buy") == (self.kind != "stop")
+
+@dataclass(frozen=True)
+class PositionValuation:
+    symbol: str
+    quantity: int
+    average_cost: float
+    price: float
+    market_value: float
+    cost_basis: float
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return self.market_value - self.cost_basis
+
+@dataclass(frozen=True)
+class ValuationSnapshot:
+    """Point-in-time valuation of a portfolio, shared by all views."""
+    cash: float
+    market_value: float
+    cost_basis: float
+    positions: tuple[PositionValuation, ...]
+    version: int
+
+    @property
+    def net_worth(self) -> float:
+        return self.cash + self.market_value
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return self.market_value - self.cost_basis
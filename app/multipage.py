@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.models import MarketSnapshot
+from app.profiling import PROFILER
+from app.providers import ACCEPT_ENCODING, BigParaProvider, FetchStats, MarketDataProvider, is_live_url, parse_rows
+
+
+@dataclass
+class PageSource:
+    """One page of the feed and the parser for its markup."""
+    url: str
+    # Body -> (symbol, price, ...) tuples in Stock field order, like parse_rows();
+    # must be picklable to parse in a process pool
+    parse: Callable[[bytes], list[tuple]] = parse_rows
+
+
+@dataclass
+class _PageState:
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    body_hash: Optional[bytes] = None
+    rows: list = field(default_factory=list)   # last parse of this page
+    error: Optional[Exception] = None          # of the latest attempt
+
+
+class MultiPageProvider(MarketDataProvider):
+    """
+    Several pages (markets) fetched concurrently and merged into one snapshot.
+
+    Each fetch() downloads every source on a pool of `concurrency`
+    threads, no more often than once per `host_interval` seconds per host,
+    with the same conditional requests and body-hash skip as
+    BigParaProvider. A changed page is parsed on the thread that
+    downloaded it, or on `executor` (e.g. a process pool, to parse on
+    other cores), while the rest keep downloading. The snapshot lists the
+    pages' stocks in source order; a symbol listed by several pages keeps
+    its first quote. A page that fails keeps its last quotes and its error
+    is in `errors`; fetch() only raises when every page failed. Returns
+    None when no page changed. Like any provider, MarketScraperWorker
+    diffs the snapshot and the GUI gets it through market_delta.
+
+    Only the canli-borsa quote table has a parser (parse_rows), so other
+    BigPara pages (indices, VİOP, FX) are refused unless the source brings
+    a parser of its own.
+    """
+
+    def __init__(self, sources: list[PageSource], concurrency: int = 4, host_interval: float = 0.5,
+                 executor=None, timeout: float = 10.0):
+        self.sources = [source if isinstance(source, PageSource) else PageSource(source) for source in sources]
+        for source in self.sources:
+            if source.parse is parse_rows and is_live_url(source.url) and not _is_quote_page(source.url):
+                raise ValueError(f"No parser for {source.url}; only {BigParaProvider.URL} has one")
+        self.live = all(is_live_url(source.url) for source in self.sources)
+        self.concurrency = concurrency
+        self.host_interval = host_interval
+        self.executor = executor
+        self.timeout = timeout
+        self.stats = FetchStats()
+        self._states = [_PageState() for _ in self.sources]
+        self._pool = None
+        self._stats_lock = threading.Lock()
+        self._host_locks = {urlsplit(source.url).netloc: threading.Lock() for source in self.sources}
+        self._host_next = {} # host -> earliest time (monotonic) of its next request
+        self._sessions = {} # url -> requests.Session, each used by one page's thread at a time
+        self._snapshot = None
+
+    @property
+    def errors(self) -> dict[str, Exception]:
+        """Pages whose latest fetch failed, by URL."""
+        return {source.url: state.error for source, state in zip(self.sources, self._states) if state.error}
+
+    def fetch(self) -> Optional[MarketSnapshot]:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="multipage")
+        changed = list(self._pool.map(self._fetch_page, self.sources, self._states))
+
+        errors = [state.error for state in self._states if state.error is not None]
+        if len(errors) == len(self._states):
+            raise errors[0]
+        if not any(changed):
+            return None
+
+        merged = {}
+        for state in self._states:
+            for row in state.rows:
+                merged.setdefault(row[0], row)
+        self._snapshot = MarketSnapshot.from_rows(list(merged.values()), self._snapshot)
+        return self._snapshot
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        for session in self._sessions.values():
+            session.close()
+        self._sessions = {}
+
+    def _fetch_page(self, source: PageSource, state: _PageState) -> bool:
+        """Refresh one page's quotes on a pool thread; returns whether they changed."""
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        try:
+            self._wait_for_host(urlsplit(source.url).netloc)
+            with PROFILER.stage("scraper.http"):
+                status, response_headers, content, wire_bytes = self._download(source.url, headers)
+            self._count(requests=1)
+            if status == 304:
+                self._count(not_modified=1)
+                state.error = None
+                return False
+            if status >= 400:
+                raise requests.HTTPError(f"{status} Error for url: {source.url}")
+            self._count(bytes_decoded=len(content), bytes_transferred=wire_bytes)
+            etag, last_modified = response_headers.get("ETag"), response_headers.get("Last-Modified")
+
+            body_hash = hashlib.blake2b(content, digest_size=16).digest()
+            if body_hash == state.body_hash:
+                self._count(unchanged=1)
+                state.etag, state.last_modified = etag, last_modified
+                state.error = None
+                return False
+
+            self._count(parses=1)
+            with PROFILER.stage("scraper.parse"):
+                if self.executor is None:
+                    rows = source.parse(content)
+                else:
+                    rows = self.executor.submit(source.parse, content).result()
+        except Exception as e:
+            state.error = e
+            return False
+        # Only a page that parsed counts as seen; after a failed parse the next tick downloads it again
+        state.etag, state.last_modified, state.body_hash = etag, last_modified, body_hash
+        state.rows = rows
+        state.error = None
+        return True
+
+    def _count(self, **counts):
+        with self._stats_lock:
+            for name, value in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _wait_for_host(self, host: str):
+        """Space requests to the same host at least `host_interval` apart."""
+        with self._host_locks[host]:
+            delay = self._host_next.get(host, 0.0) - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._host_next[host] = time.monotonic() + self.host_interval
+
+    def _download(self, url: str, headers: dict):
+        """(status, headers, decoded body, bytes on the wire) of a GET."""
+        session = self._sessions.get(url)
+        if session is None:
+            session = self._sessions[url] = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+            session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+        response = session.get(url, headers=headers, timeout=self.timeout)
+        content = response.content
+        try:
+            wire_bytes = response.raw.tell()
+        except (AttributeError, OSError):
+            wire_bytes = len(content)
+        return response.status_code, response.headers, content, wire_bytes
+
+
+def _is_quote_page(url: str) -> bool:
+    """Whether `url` is BigPara's canli-borsa quote table, the page parse_rows() reads."""
+    return urlsplit(url).path.rstrip("/") == urlsplit(BigParaProvider.URL).path.rstrip("/")
@@ -0,0 +1,83 @@
+import heapq
+from typing import Iterable, Optional
+from app.models import Order
+
+
+class OrderBook:
+    """
+    Open orders per symbol, indexed by trigger price.
+
+    Every symbol keeps two heaps: orders that fire when the price falls to
+    their level (highest level on top) and orders that fire when it rises
+    to it (lowest on top). A tick pops only the triggered orders, so
+    matching costs O(k log n) for k fills instead of a scan of all n open
+    orders. Cancelled orders stay in their heap until they reach the top.
+    """
+
+    # Rebuild the heaps once this many cancelled entries pile up in them
+    COMPACT_AFTER = 10000
+
+    def __init__(self):
+        self.orders = {}  # id -> open Order
+        self._below = {}  # symbol -> heap of (-price, id)
+        self._above = {}  # symbol -> heap of (price, id)
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def add(self, order: Order):
+        self.orders[order.id] = order
+        self._push(order)
+
+    def cancel(self, order_id: int) -> Optional[Order]:
+        """Remove an open order; returns it, or None if it is not open."""
+        order = self.orders.pop(order_id, None)
+        if order is not None:
+            self._stale += 1
+            if self._stale > self.COMPACT_AFTER:
+                self._compact()
+        return order
+
+    def symbols(self) -> set[str]:
+        """Symbols with orders in the heaps (some may only have cancelled ones left)."""
+        return self._below.keys() | self._above.keys()
+
+    def match(self, symbol: str, price: float) -> list[Order]:
+        """Remove and return the orders on `symbol` that `price` triggers."""
+        triggered = []
+        heap = self._below.get(symbol)
+        while heap and -heap[0][0] >= price:
+            self._pop(heap, triggered)
+        heap = self._above.get(symbol)
+        while heap and heap[0][0] <= price:
+            self._pop(heap, triggered)
+        return triggered
+
+    def match_prices(self, quotes: Iterable[tuple[str, float]]) -> list[Order]:
+        """match() over (symbol, price) pairs; triggered orders come back oldest first."""
+        triggered = []
+        for symbol, price in quotes:
+            if symbol in self._below or symbol in self._above:
+                triggered.extend(self.match(symbol, price))
+        triggered.sort(key=lambda order: order.id)
+        return triggered
+
+    def _push(self, order):
+        if order.triggers_below:
+            heapq.heappush(self._below.setdefault(order.symbol, []), (-order.price, order.id))
+        else:
+            heapq.heappush(self._above.setdefault(order.symbol, []), (order.price, order.id))
+
+    def _pop(self, heap, triggered):
+        _, order_id = heapq.heappop(heap)
+        order = self.orders.pop(order_id, None)
+        if order is None:
+            self._stale -= 1
+        else:
+            triggered.append(order)
+
+    def _compact(self):
+        self._below, self._above, self._stale = {}, {}, 0
+        for order in self.orders.values():
+            self._push(order)
@@ -0,0 +1,69 @@
+import queue
+import time
+from concurrent.futures import Future
+from PyQt5.QtCore import QThread, pyqtSignal
+from app.profiling import PROFILER
+
+
+class PersistenceWorker(QThread):
+    """
+    Owns all database writes (and the reads the UI waits on) off the GUI thread.
+
+    Commands are `fn(conn, *args)` callables queued with submit() and run
+    in order, each in its own transaction on the worker's connection:
+    committed when fn returns, rolled back when it raises. submit() returns
+    a Future; a `callback(result, error)` given to it is called back on the
+    thread that created the worker (the GUI thread), never on the worker.
+    """
+    reply = pyqtSignal(object, object, object) # callback, result, error
+    error_occurred = pyqtSignal(str)           # every failed command
+
+    def __init__(self, db_manager):
+        super().__init__()
+        self.db = db_manager
+        self._queue = queue.Queue()
+        # Emitted from run(), delivered through the creating thread's event loop
+        self.reply.connect(self._deliver)
+
+    def submit(self, fn, *args, callback=None) -> Future:
+        future = Future()
+        self._queue.put((future, fn, args, callback, time.perf_counter()))
+        return future
+
+    def pending(self) -> int:
+        """Commands waiting to run."""
+        return self._queue.qsize()
+
+    def run(self):
+        while True:
+            command = self._queue.get()
+            if command is None:
+                break
+            future, fn, args, callback, queued = command
+            if not future.set_running_or_notify_cancel():
+                continue
+            if PROFILER.enabled:
+                PROFILER.record("db.queue_wait", time.perf_counter() - queued)
+            result = error = None
+            with self.db.get_connection() as conn, PROFILER.stage("db." + fn.__name__):
+                try:
+                    result = fn(conn, *args)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    error = e
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+                self.error_occurred.emit(str(error))
+            if callback is not None:
+                self.reply.emit(callback, result, error)
+
+    def stop(self):
+        """Run everything already queued, then end the thread."""
+        self._queue.put(None)
+        self.wait()
+
+    def _deliver(self, callback, result, error):
+        callback(result, error)
@@ -0,0 +1,117 @@
+import json
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+import numpy as np
+
+# Durations kept per stage; percentiles cover the most recent WINDOW calls
+WINDOW = 1024
+
+_DISABLED = nullcontext()
+
+
+@dataclass(frozen=True)
+class StageStats:
+    """Rolling timing summary of one stage, in seconds."""
+    calls: int       # since the last reset, not just the window
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    total: float     # over the window
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class Profiler:
+    """
+    Wall-clock timings of named hot-path stages, kept in rolling windows.
+
+    Stages are timed with `with PROFILER.stage(name):` or the
+    `@PROFILER.timed(name)` decorator from any thread. While disabled
+    both cost one attribute check: stage() hands out a shared no-op
+    context and timed() calls straight through.
+    """
+
+    def __init__(self, window: int = WINDOW):
+        self.enabled = False
+        self.window = window
+        self._samples = {}  # stage -> ring buffer of durations
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _DISABLED
+        return _Stage(self, name)
+
+    def timed(self, name: str):
+        def decorate(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = np.empty(self.window)
+                self._calls[name] = 0
+            samples[self._calls[name] % self.window] = seconds
+            self._calls[name] += 1
+
+    def stats(self) -> dict[str, StageStats]:
+        """Summary of every stage seen since the last reset, by name."""
+        with self._lock:
+            windows = {name: (self._calls[name], samples[:min(self._calls[name], self.window)].copy())
+                       for name, samples in self._samples.items()}
+        stats = {}
+        for name, (calls, samples) in sorted(windows.items()):
+            p50, p95, p99 = np.percentile(samples, (50, 95, 99))
+            stats[name] = StageStats(calls, float(p50), float(p95), float(p99),
+                                     float(samples.max()), float(samples.sum()))
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
+
+    def dump(self, path: str):
+        """Write stats() to `path` as JSON (seconds)."""
+        with open(path, "w") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "window": self.window,
+                "stages": {name: asdict(stats) for name, stats in self.stats().items()},
+            }, f, indent=2)
+
+
+# Shared by the scraper, persistence worker, controller and views
+PROFILER = Profiler()
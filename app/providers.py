@@ -0,0 +1,481 @@
+import glob
+import hashlib
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import astuple, dataclass, replace
+from html.parser import HTMLParser
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from app.models import MarketSnapshot, Stock
+from app.profiling import PROFILER
+from app.tickstore import TickStore
+
+# Spacing given to saved HTML pages, which carry no timestamps (the scraper's tick)
+FIXTURE_INTERVAL = 3.0
+
+# BigPara cell class -> Stock field
+FIELD_CLASSES = {
+    "node-c": "price",           # Last Price
+    "node-h": "highest",         # High
+    "node-i": "lowest",          # Low
+    "node-j": "average",         # Avg
+    "node-e": "percent_change",  # Percent
+    "node-k": "capacity_lot",    # Lot
+    "node-l": "capacity_tl",     # Volume TL
+}
+
+# urllib3 only decodes "br" when a brotli binding is installed
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+ROW_CLASS = "live-stock-item"
+# Hosts serving the real exchange feed; any other URL (a stand-in, a replay) is not live
+LIVE_HOSTS = frozenset(("bigpara.hurriyet.com.tr",))
+NAME_CLASS = "cell064 tal arrow"
+
+# Elements without a closing tag; they are never pushed on the open-element stack
+VOID_TAGS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+))
+
+
+def is_live_url(url: str) -> bool:
+    return urlsplit(url).hostname in LIVE_HOSTS
+
+
+def parse_float(text):
+    """Parse Turkish formatted numbers (1.234,56 -> 1234.56)."""
+    try:
+        clean = text.replace(".", "").replace(",", ".")
+        return float(clean)
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+class StockRowParser(HTMLParser):
+    """
+    Single-pass extractor for BigPara ``live-stock-item`` rows.
+
+    Walks the token stream once instead of building a tree, collecting the
+    text of the cells listed in FIELD_CLASSES and the symbol link of the
+    name cell into `rows`: plain tuples in Stock field order. Rows without
+    a symbol are dropped, like the soup path does.
+
+    Open elements are kept on a stack and an end tag closes everything
+    opened after its matching start tag, as the soup tree builder does, so
+    an unclosed <li> or <span> only affects its own row.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._stack = []       # names of the open elements
+        self._row_at = None    # stack position of the open row <ul>
+        self._cells = []       # open captured cells: (stack position, field, text parts)
+        self._link_at = None   # stack position of the name cell's symbol link
+        self._links = 0
+        self._row = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        at = len(self._stack)
+        self._stack.append(tag)
+        if tag == "ul":
+            cls = dict(attrs).get("class") or ""
+            if ROW_CLASS in cls.split():
+                if self._row_at is not None:
+                    self._close_row()
+                self._row_at = at
+                self._row = {}
+            return
+        if self._row_at is None:
+            return
+
+        if tag == "li":
+            cls = dict(attrs).get("class") or ""
+            if cls == NAME_CLASS:
+                field = "symbol"
+            else:
+                field = next((FIELD_CLASSES[c] for c in cls.split() if c in FIELD_CLASSES), None)
+            # First matching cell wins, as with row.find()
+            if field is not None and field not in self._row:
+                self._row[field] = ""
+                self._cells.append((at, field, []))
+                if field == "symbol":
+                    self._links = 0
+        elif tag == "a" and "symbol" in self._row and any(field == "symbol" for _, field, _ in self._cells):
+            # The stock name is in the second 'a' tag
+            self._links += 1
+            if self._links == 2:
+                self._link_at = at
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS or tag not in self._stack:
+            return # stray end tags are ignored, as by the soup tree builder
+        at = len(self._stack) - 1 - self._stack[::-1].index(tag)
+        del self._stack[at:]
+        if self._link_at is not None and self._link_at >= at:
+            self._link_at = None
+        while self._cells and self._cells[-1][0] >= at:
+            self._close_cell()
+        if self._row_at is not None and self._row_at >= at:
+            self._close_row()
+
+    def handle_data(self, data):
+        for _, field, text in self._cells:
+            if field != "symbol" or self._link_at is not None:
+                text.append(data)
+
+    def close(self):
+        super().close()
+        if self._row_at is not None:
+            self._close_row()
+
+    def _close_cell(self):
+        _, field, text = self._cells.pop()
+        self._row[field] = "".join(text).strip()
+
+    def _close_row(self):
+        while self._cells:
+            self._close_cell()
+        row = self._row
+        self._row_at = None
+        self._link_at = None
+        self._row = {}
+        symbol = row.pop("symbol", "")
+        if not symbol:
+            return
+        self.rows.append((symbol, *(parse_float(row.get(field, "0")) for field in FIELD_CLASSES.values())))
+
+
+@dataclass
+class FetchStats:
+    """Counters for the scraper's HTTP traffic and skipped parse work."""
+    requests: int = 0
+    not_modified: int = 0      # 304 answers
+    unchanged: int = 0         # 200 answers with the same body as last tick
+    parses: int = 0
+    bytes_transferred: int = 0 # on the wire, before decompression
+    bytes_decoded: int = 0
+
+    @property
+    def skipped_parses(self) -> int:
+        return self.not_modified + self.unchanged
+
+    @property
+    def not_modified_ratio(self) -> float:
+        return self.not_modified / self.requests if self.requests else 0.0
+
+
+def parse_stream(content: bytes) -> list[Stock]:
+    """Parse a canli-borsa page with the single-pass StockRowParser."""
+    return [Stock(*row) for row in parse_rows(content)]
+
+
+def parse_rows(content: bytes, parser_mode: str = "stream") -> list[tuple]:
+    """
+    Quotes as plain (symbol, price, ...) tuples in Stock field order.
+
+    Tuples of str and float pickle several times cheaper than Stock
+    dataclasses, which is what a process pool sends back.
+    """
+    if parser_mode != "stream":
+        return [astuple(stock) for stock in PARSERS[parser_mode](content)]
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="replace")
+    parser = StockRowParser()
+    parser.feed(content)
+    parser.close()
+    return parser.rows
+
+
+def parse_soup(content: bytes) -> list[Stock]:
+    """Parse a canli-borsa page with a BeautifulSoup tree and find()."""
+    soup = BeautifulSoup(content, "html.parser")
+
+    stocks = []
+
+    # Iterate over each stock row
+    rows = soup.find_all("ul", {"class": "live-stock-item"})
+
+    for row in rows:
+        try:
+            # Name
+            name_li = row.find("li", class_="cell064 tal arrow")
+            if not name_li:
+                continue
+
+            # The stock name is in the second 'a' tag
+            links = name_li.find_all("a")
+            if len(links) < 2:
+                continue
+            symbol = links[1].text.strip()
+
+            # Helper to get text from a specific class
+            def get_text(cls_name):
+                node = row.find("li", class_=cls_name)
+                return node.text.strip() if node else "0"
+
+            price = parse_float(get_text("node-c"))      # Last Price
+            highest = parse_float(get_text("node-h"))    # High
+            lowest = parse_float(get_text("node-i"))     # Low
+            average = parse_float(get_text("node-j"))    # Avg
+            percent = parse_float(get_text("node-e"))    # Percent
+            cap_lot = parse_float(get_text("node-k"))    # Lot
+            cap_tl = parse_float(get_text("node-l"))     # Volume TL
+
+            stock = Stock(
+                symbol=symbol,
+                price=price,
+                highest=highest,
+                lowest=lowest,
+                average=average,
+                percent_change=percent,
+                capacity_lot=cap_lot,
+                capacity_tl=cap_tl
+            )
+            stocks.append(stock)
+
+        except Exception as e:
+            print(f"Error parsing row: {e}")
+            continue
+
+    return stocks
+
+
+# "stream": single-pass StockRowParser, "soup": BeautifulSoup tree + find()
+PARSERS = {"stream": parse_stream, "soup": parse_soup}
+
+
+def load_ticks(source: str) -> list[tuple[float, list[Stock]]]:
+    """
+    Recorded market snapshots as (ts, stocks), oldest first.
+
+    `source` is a TickStore database (*.db) or BigPara HTML pages: a
+    file, a directory or a glob pattern, replayed in name order.
+    """
+    if source.endswith(".db"):
+        store = TickStore(source)
+        try:
+            return list(store.snapshots())
+        finally:
+            store.close()
+
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, "*.htm*")))
+    else:
+        paths = sorted(glob.glob(source))
+    ticks = []
+    for i, path in enumerate(paths):
+        with open(path, "rb") as f:
+            ticks.append((i * FIXTURE_INTERVAL, parse_stream(f.read())))
+    return ticks
+
+
+class MarketDataProvider:
+    """
+    A source of market snapshots.
+
+    fetch() returns the current quotes as a MarketSnapshot, or None when
+    nothing changed since the previous call. Providers are plain objects
+    with no Qt dependency; MarketScraperWorker polls one on its own thread.
+    """
+    # Whether quotes follow the exchange's session hours (replays do not)
+    live = True
+
+    def fetch(self) -> Optional[MarketSnapshot]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class BigParaProvider(MarketDataProvider):
+    """
+    Scrapes BigPara's canli-borsa page.
+
+    Uses a keep-alive session and conditional requests; a 304 answer or
+    a body identical to the last one returns None without parsing.
+
+    With `processes`, pages are parsed in a separate process that is
+    started once and kept, so the parse does not hold this process's
+    GIL; only parse_rows() tuples come back. Sending the page and rows
+    between processes costs about as much as it saves, so it is off by
+    default (see bench/bench_parse_offload.py).
+    """
+    URL = "http://bigpara.hurriyet.com.tr/borsa/canli-borsa/"
+
+    def __init__(self, url=None, parser_mode="stream", processes=False):
+        self.url = url or self.URL
+        self.live = is_live_url(self.url)
+        if parser_mode not in PARSERS:
+            raise ValueError(f"Unknown parser mode: {parser_mode}")
+        self.parser_mode = parser_mode
+        self._pool = self._start_pool() if processes else None
+
+        # Keep-alive session, reused across ticks
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+        self.session.headers.update({"Accept-Encoding": ACCEPT_ENCODING})
+
+        self.stats = FetchStats()
+        self._etag = None
+        self._last_modified = None
+        self._body_hash = None
+        self._snapshot = None # last parse, whose symbol index the next one can share
+
+    def fetch(self) -> Optional[MarketSnapshot]:
+        """
+        Fetch and parse the market page.
+
+        Returns None when the page did not change since the last call
+        (304 Not Modified or an identical body), so no parse is needed.
+        """
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        with PROFILER.stage("scraper.http"):
+            response = self.session.get(self.url, headers=headers, timeout=10)
+            content = response.content
+        self.stats.requests += 1
+
+        if response.status_code == 304:
+            self.stats.not_modified += 1
+            return None
+        response.raise_for_status()
+
+        self.stats.bytes_decoded += len(content)
+        try:
+            self.stats.bytes_transferred += response.raw.tell()
+        except (AttributeError, OSError):
+            self.stats.bytes_transferred += len(content)
+
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        body_hash = hashlib.blake2b(content, digest_size=16).digest()
+        if body_hash == self._body_hash:
+            self.stats.unchanged += 1
+            self._etag, self._last_modified = etag, last_modified
+            return None
+
+        self.stats.parses += 1
+        with PROFILER.stage("scraper.parse"):
+            snapshot = self.parse(content)
+        # Only a page that parsed counts as seen; after a failed parse the next tick downloads it again
+        self._etag, self._last_modified, self._body_hash = etag, last_modified, body_hash
+        return snapshot
+
+    def parse(self, content: bytes) -> MarketSnapshot:
+        """Parse a canli-borsa page with the configured parser mode."""
+        if self._pool is None:
+            rows = parse_rows(content, self.parser_mode)
+        else:
+            try:
+                rows = self._pool.submit(parse_rows, content, self.parser_mode).result()
+            except BrokenProcessPool:
+                # The parse process died; the next tick gets a fresh one
+                self._pool = self._start_pool()
+                raise
+        self._snapshot = MarketSnapshot.from_rows(rows, self._snapshot)
+        return self._snapshot
+
+    @staticmethod
+    def _start_pool() -> ProcessPoolExecutor:
+        # spawn, not fork: the parent runs Qt and database threads
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        pool.submit(int).result() # start the process now rather than on the first tick
+        return pool
+
+    def close(self):
+        self.session.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Plays back recorded snapshots, one per fetch().
+
+    `ticks` are (ts, stocks) pairs as returned by load_ticks(). After the
+    last one it starts over if `loop`, otherwise every fetch() returns
+    None (market unchanged).
+    """
+    live = False
+
+    def __init__(self, ticks, loop=True):
+        self.ticks = list(ticks)
+        self.loop = loop
+        self.position = 0
+        self._snapshot = None
+
+    @classmethod
+    def from_source(cls, source: str, loop=True) -> "ReplayProvider":
+        """Replay a TickStore database or saved BigPara pages (see load_ticks)."""
+        return cls(load_ticks(source), loop)
+
+    def fetch(self) -> Optional[MarketSnapshot]:
+        if self.position == len(self.ticks):
+            if not self.loop or not self.ticks:
+                return None
+            self.position = 0
+        _ts, stocks = self.ticks[self.position]
+        self.position += 1
+        self._snapshot = MarketSnapshot.from_stocks(stocks, self._snapshot)
+        return self._snapshot
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    A random-walk market of `symbols` stocks for load tests.
+
+    Every fetch() moves a `moving` fraction of the symbols by up to 1%,
+    so the feed can be made larger and busier than the live page.
+    Symbols are `prefix` plus a number.
+    """
+    live = False
+
+    def __init__(self, symbols=500, moving=0.2, seed=7, prefix="S"):
+        self.rng = random.Random(seed)
+        self.moving = moving
+        self.stocks = []
+        for i in range(symbols):
+            price = round(self.rng.uniform(1, 500), 2)
+            self.stocks.append(Stock(f"{prefix}{i:04d}", price, price, price, price, 0.0, 0.0, 0.0))
+        self._snapshot = None
+
+    def fetch(self) -> MarketSnapshot:
+        if self._snapshot is None:
+            self._snapshot = MarketSnapshot.from_stocks(self.stocks)
+            return self._snapshot
+        stocks, rng = self.stocks, self.rng
+        for i in rng.sample(range(len(stocks)), int(len(stocks) * self.moving)):
+            s = stocks[i]
+            price = round(s.price * rng.uniform(0.99, 1.01), 2)
+            lot = rng.randint(1, 1000)
+            stocks[i] = replace(
+                s, price=price, highest=max(s.highest, price), lowest=min(s.lowest, price),
+                percent_change=round((price / s.average - 1) * 100, 2),
+                capacity_lot=s.capacity_lot + lot, capacity_tl=s.capacity_tl + lot * price,
+            )
+        self._snapshot = MarketSnapshot.from_stocks(stocks, self._snapshot)
+        return self._snapshot
@@ -0,0 +1,137 @@
+import datetime
+import math
+
+# Turkey has stayed on UTC+3 all year since 2016
+ISTANBUL = datetime.timezone(datetime.timedelta(hours=3), "TRT")
+
+# National holidays the exchange closes on every year, as (month, day)
+FIXED_HOLIDAYS = frozenset({
+    (1, 1),    # New Year's Day
+    (4, 23),   # National Sovereignty and Children's Day
+    (5, 1),    # Labour Day
+    (5, 19),   # Youth and Sports Day
+    (7, 15),   # Democracy and National Unity Day
+    (8, 30),   # Victory Day
+    (10, 29),  # Republic Day
+})
+
+
+class BistCalendar:
+    """
+    Borsa Istanbul equity session hours, in Istanbul time.
+
+    The session runs weekdays from the opening auction (09:40) to the end
+    of the closing auction (18:10), except on FIXED_HOLIDAYS and the
+    given `holidays` (dates; Ramadan and Sacrifice feasts move every
+    year). `grace` keeps the session open a little longer so the closing
+    prices, which show up on the page after the auction, are still
+    picked up.
+    """
+    OPEN = datetime.time(9, 40)
+    CLOSE = datetime.time(18, 10)
+
+    def __init__(self, holidays=(), grace: float = 300.0):
+        self.holidays = frozenset(holidays)
+        self.grace = datetime.timedelta(seconds=grace)
+
+    def is_trading_day(self, day: datetime.date) -> bool:
+        return day.weekday() < 5 and (day.month, day.day) not in FIXED_HOLIDAYS and day not in self.holidays
+
+    def is_open(self, ts: float) -> bool:
+        now = datetime.datetime.fromtimestamp(ts, ISTANBUL)
+        if not self.is_trading_day(now.date()):
+            return False
+        opens, closes = self._session(now.date())
+        return opens <= now < closes
+
+    def next_open(self, ts: float) -> float:
+        """Start of the first session at or after `ts` (`ts` itself while open)."""
+        now = datetime.datetime.fromtimestamp(ts, ISTANBUL)
+        day = now.date()
+        while True:
+            if self.is_trading_day(day):
+                opens, closes = self._session(day)
+                if now < closes:
+                    return max(opens, now).timestamp()
+            day += datetime.timedelta(days=1)
+
+    def _session(self, day):
+        opens = datetime.datetime.combine(day, self.OPEN, ISTANBUL)
+        closes = datetime.datetime.combine(day, self.CLOSE, ISTANBUL) + self.grace
+        return opens, closes
+
+
+class AlwaysOpen:
+    """Calendar for feeds that do not follow the exchange (replays, synthetic markets)."""
+
+    def is_open(self, ts: float) -> bool:
+        return True
+
+    def next_open(self, ts: float) -> float:
+        return ts
+
+
+class ScrapeScheduler:
+    """
+    When the scraper should fetch next.
+
+    Fetches are due at a fixed rate of `interval` seconds measured from
+    the previous due time, not from when the last fetch finished, so
+    request latency does not stretch the period; ticks missed while a
+    fetch overran are skipped, keeping the phase. The interval doubles
+    for every `idle_after` unchanged pages in a row (up to
+    `max_idle_interval`) and for every failed fetch in a row (up to
+    `max_backoff`), and snaps back on the first change or success.
+    Outside the calendar's sessions the next fetch waits for the open;
+    the first fetch always runs right away so the last prices show.
+    """
+
+    def __init__(self, interval: float = 3.0, idle_after: int = 10, max_idle_interval: float = 30.0,
+                 max_backoff: float = 300.0, calendar: BistCalendar = None):
+        self.interval = interval
+        self.idle_after = idle_after
+        self.max_idle_interval = max_idle_interval
+        self.max_backoff = max_backoff
+        self.calendar = calendar if calendar is not None else BistCalendar()
+        self.unchanged = 0  # unchanged pages in a row
+        self.failures = 0   # failed fetches in a row
+        self._due = None
+
+    @property
+    def current_interval(self) -> float:
+        if self.failures:
+            return self._doubled(self.failures, self.max_backoff)
+        return self._doubled(self.unchanged // self.idle_after, self.max_idle_interval)
+
+    def _doubled(self, steps: int, limit: float) -> float:
+        """`interval` doubled `steps` times, capped at `limit`."""
+        limit = max(limit, self.interval)
+        if self.interval <= 0:
+            return limit
+        # Clamp the exponent first: a long outage or quiet spell would overflow 2 ** steps
+        steps = min(steps, math.ceil(math.log2(limit / self.interval)))
+        return min(self.interval * 2 ** steps, limit)
+
+    def next_run(self, now: float) -> float:
+        """Time the next fetch is due (`now` or later)."""
+        if self._due is None:
+            return now
+        due = self._due
+        if due < now:
+            # Overran: skip the missed ticks but stay on the same grid
+            due += math.ceil((now - due) / self.current_interval) * self.current_interval
+        if not self.calendar.is_open(due):
+            due = self.calendar.next_open(due)
+        return due
+
+    def completed(self, due: float, changed: bool):
+        """Record a successful fetch that was due at `due`."""
+        self.failures = 0
+        self.unchanged = 0 if changed else self.unchanged + 1
+        self._due = due + self.current_interval
+
+    def failed(self, due: float) -> int:
+        """Record a failed fetch that was due at `due`; returns the failures in a row."""
+        self.failures += 1
+        self._due = due + self.current_interval
+        return self.failures
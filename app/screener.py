@@ -0,0 +1,296 @@
+import re
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.models import STOCK_FIELDS, MarketSnapshot, Watchlist
+
+
+class ScreenError(ValueError):
+    """A screen expression that does not parse."""
+
+
+# Trailing multipliers for numbers, as in "capacity_tl > 50M"
+SUFFIXES = {"k": 1e3, "m": 1e6, "b": 1e9}
+COMPARISONS = {
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "=": np.equal, "==": np.equal, "!=": np.not_equal,
+}
+ARITHMETIC = {"+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide}
+KEYWORDS = {"and", "or", "not", "within", "of", "asc", "desc"}
+
+_TOKEN = re.compile(r"""\s*(?:
+    (?P<number>\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)(?P<suffix>[kKmMbB](?!\w))?
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op><=|>=|==|!=|[<>=%()+\-*/])
+)""", re.VERBOSE)
+
+
+def _tokenize(text: str) -> list[tuple[str, object]]:
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ScreenError(f"Unexpected {text[position:].strip()[:10]!r} in {text!r}")
+        position = match.end()
+        if match["number"]:
+            tokens.append(("num", float(match["number"]) * SUFFIXES.get((match["suffix"] or "").lower(), 1)))
+        elif match["name"]:
+            word = match["name"].lower()
+            tokens.append(("kw", word) if word in KEYWORDS else ("name", match["name"]))
+        else:
+            tokens.append(("op", match["op"]))
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent over the tokens; builds nested tuples.
+
+    Nodes are hashable tuples, so equal subexpressions of different
+    screens are the same dictionary key and evaluated once per tick.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def accept(self, kind, value=None) -> bool:
+        token_kind, token_value = self.peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, kind, value=None):
+        token = self.peek()
+        if not self.accept(kind, value):
+            found = "end of expression" if token[0] is None else repr(token[1])
+            raise ScreenError(f"Expected {value or kind}, found {found} in {self.text!r}")
+        return token[1]
+
+    def done(self):
+        if self.position != len(self.tokens):
+            raise ScreenError(f"Unexpected {self.peek()[1]!r} in {self.text!r}")
+
+    # Grammar, loosest binding first
+    def condition(self):
+        node = self.conjunction()
+        while self.accept("kw", "or"):
+            node = ("or", node, self.conjunction())
+        return node
+
+    def conjunction(self):
+        node = self.negation()
+        while self.accept("kw", "and"):
+            node = ("and", node, self.negation())
+        return node
+
+    def negation(self):
+        if self.accept("kw", "not"):
+            return ("not", self.negation())
+        return self.comparison()
+
+    def comparison(self):
+        if self.peek() == ("op", "("):
+            # A parenthesised condition, or else a parenthesised sum starting a comparison
+            start = self.position
+            self.position += 1
+            try:
+                node = self.condition()
+                self.expect("op", ")")
+                return node
+            except ScreenError:
+                self.position = start
+        left = self.sum()
+        kind, value = self.peek()
+        if kind == "op" and value in COMPARISONS:
+            self.position += 1
+            return ("cmp", value, left, self.sum())
+        if self.accept("kw", "within"):
+            tolerance = self.expect("num")
+            relative = self.accept("op", "%")
+            self.expect("kw", "of")
+            return ("within", tolerance / 100 if relative else tolerance, relative, left, self.sum())
+        raise ScreenError(f"Expected a comparison after {_describe(left)} in {self.text!r}")
+
+    def sum(self):
+        node = self.product()
+        while True:
+            kind, value = self.peek()
+            if kind != "op" or value not in "+-":
+                return node
+            self.position += 1
+            node = ("op", value, node, self.product())
+
+    def product(self):
+        node = self.unary()
+        while True:
+            kind, value = self.peek()
+            if kind != "op" or value not in "*/":
+                return node
+            self.position += 1
+            node = ("op", value, node, self.unary())
+
+    def unary(self):
+        if self.accept("op", "-"):
+            return ("op", "-", ("num", 0.0), self.unary())
+        if self.accept("op", "("):
+            node = self.sum()
+            self.expect("op", ")")
+            return node
+        kind, value = self.peek()
+        if kind == "num":
+            self.position += 1
+            return ("num", value)
+        if kind == "name":
+            self.position += 1
+            if value not in STOCK_FIELDS:
+                raise ScreenError(f"Unknown field {value!r}; expected one of {', '.join(STOCK_FIELDS)}")
+            return ("field", value)
+        found = "end of expression" if kind is None else repr(value)
+        raise ScreenError(f"Expected a field or number, found {found} in {self.text!r}")
+
+
+def _describe(node) -> str:
+    return node[1] if node[0] == "field" else "the value"
+
+
+def compile_filter(text: str):
+    """Parse a filter such as "percent_change > 3 and capacity_tl > 50M" into a node tree."""
+    parser = _Parser(text)
+    node = parser.condition()
+    parser.done()
+    return node
+
+
+def compile_sort(text: str) -> tuple[object, bool]:
+    """Parse a sort key such as "capacity_tl desc"; returns (node, descending)."""
+    parser = _Parser(text)
+    node = parser.sum()
+    descending = parser.accept("kw", "desc")
+    if not descending:
+        parser.accept("kw", "asc")
+    parser.done()
+    return node, descending
+
+
+def evaluate(node, snapshot: MarketSnapshot, memo: dict) -> np.ndarray:
+    """Array of `node` over every row of `snapshot`; `memo` caches subexpressions for one snapshot."""
+    result = memo.get(node)
+    if result is not None:
+        return result
+    kind = node[0]
+    if kind == "field":
+        result = snapshot.array(node[1])
+    elif kind == "num":
+        result = node[1]
+    elif kind == "op":
+        result = ARITHMETIC[node[1]](evaluate(node[2], snapshot, memo), evaluate(node[3], snapshot, memo))
+    elif kind == "cmp":
+        result = COMPARISONS[node[1]](evaluate(node[2], snapshot, memo), evaluate(node[3], snapshot, memo))
+    elif kind == "within":
+        _, tolerance, relative, left, right = node
+        value, reference = evaluate(left, snapshot, memo), evaluate(right, snapshot, memo)
+        bound = tolerance * np.abs(reference) if relative else tolerance
+        result = np.abs(value - reference) <= bound
+    elif kind == "and":
+        result = evaluate(node[1], snapshot, memo) & evaluate(node[2], snapshot, memo)
+    elif kind == "or":
+        result = evaluate(node[1], snapshot, memo) | evaluate(node[2], snapshot, memo)
+    else: # not
+        result = ~evaluate(node[1], snapshot, memo)
+    result = np.broadcast_to(result, (len(snapshot),))
+    memo[node] = result
+    return result
+
+
+class _Screen:
+    def __init__(self, watchlist: Watchlist):
+        self.name = watchlist.name
+        self.filter = compile_filter(watchlist.expression) if watchlist.expression.strip() else None
+        self.sort, self.descending = compile_sort(watchlist.sort) if watchlist.sort.strip() else (None, False)
+        self.limit = watchlist.limit
+        self.symbols = set(watchlist.symbols) if watchlist.symbols else None
+        self.static = list(watchlist.symbols) if self.filter is None and self.sort is None else None
+        self._mask = (None, None) # (snapshot index, rows in `symbols`)
+
+    def member_mask(self, snapshot: MarketSnapshot) -> np.ndarray:
+        index, mask = self._mask
+        if index is not snapshot.index:
+            mask = np.fromiter((symbol in self.symbols for symbol in snapshot.symbols), dtype=bool,
+                               count=len(snapshot))
+            self._mask = (snapshot.index, mask)
+        return mask
+
+
+class Screener:
+    """
+    Evaluates every watchlist against each market snapshot.
+
+    Filters compile to NumPy expressions over the snapshot's columns, so a
+    screen costs a few array operations whatever the market size, and
+    subexpressions shared by several screens (the same field, the same
+    comparison) are computed once per tick. set_watchlists() may be called
+    from another thread than evaluate(); the new set applies from the next
+    tick.
+    """
+
+    def __init__(self, watchlists: Iterable[Watchlist] = ()):
+        self._screens = ()
+        self._names = (None, None) # (snapshot index, symbols as an object array)
+        self.set_watchlists(watchlists)
+
+    def set_watchlists(self, watchlists: Iterable[Watchlist]):
+        """Compile and swap in a new set; raises ScreenError without changing anything."""
+        self._screens = tuple(_Screen(watchlist) for watchlist in watchlists)
+
+    @property
+    def names(self) -> list[str]:
+        return [screen.name for screen in self._screens]
+
+    def evaluate(self, snapshot: MarketSnapshot) -> dict[str, list[str]]:
+        """Symbols on each watchlist for this tick, by name; sorted screens in rank order."""
+        results, memo, orders = {}, {}, {}
+        index, names = self._names
+        if index is not snapshot.index:
+            names = np.array(snapshot.symbols, dtype=object)
+            self._names = (snapshot.index, names)
+        with np.errstate(all="ignore"):
+            for screen in self._screens:
+                if screen.static is not None:
+                    results[screen.name] = screen.static
+                    continue
+                mask = None if screen.filter is None else evaluate(screen.filter, snapshot, memo)
+                if screen.symbols is not None:
+                    members = screen.member_mask(snapshot)
+                    mask = members if mask is None else mask & members
+                if screen.sort is None:
+                    rows = np.arange(len(snapshot)) if mask is None else np.flatnonzero(mask)
+                else:
+                    # The whole market is ranked once per sort key; each screen keeps its rows in that order
+                    order = orders.get((screen.sort, screen.descending))
+                    if order is None:
+                        key = evaluate(screen.sort, snapshot, memo)
+                        # NaN keys go last either way
+                        order = orders[screen.sort, screen.descending] = np.argsort(
+                            -key if screen.descending else key, kind="stable")
+                    rows = order if mask is None else order[mask[order]]
+                if screen.limit is not None:
+                    rows = rows[:screen.limit]
+                results[screen.name] = names[rows].tolist()
+        return results
+
+
+def validate(watchlist: Watchlist) -> Optional[str]:
+    """Why `watchlist` cannot be screened, or None."""
+    try:
+        _Screen(watchlist)
+    except ScreenError as e:
+        return str(e)
+    return None
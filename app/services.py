@@ -1,93 +1,89 @@
 import time
-import requests
-from bs4 import BeautifulSoup
+import threading
+from typing import Optional
 from PyQt5.QtCore import QThread, pyqtSignal
-from app.models import Stock
+from app.models import MarketDelta, MarketSnapshot
+from app.profiling import PROFILER
+from app.providers import BigParaProvider, MarketDataProvider
+from app.scheduling import AlwaysOpen, ScrapeScheduler
+
 
 class MarketScraperWorker(QThread):
-    data_updated = pyqtSignal(list)
+    data_updated = pyqtSignal(object)    # full snapshot: MarketSnapshot (or list[Stock])
+    market_delta = pyqtSignal(object)    # MarketDelta against the previous snapshot
+    indicators_updated = pyqtSignal(object) # (symbols, {indicator: np.ndarray}) per snapshot
+    screens_updated = pyqtSignal(object)    # {watchlist name: [symbol, ...]} per snapshot
     error_occurred = pyqtSignal(str)
 
-    URL = "http://bigpara.hurriyet.com.tr/borsa/canli-borsa/"
-
-    def __init__(self):
+    def __init__(self, provider: MarketDataProvider = None, tick_store=None, indicators=None, scheduler=None,
+                 screener=None):
+        """`provider` defaults to scraping the live BigPara page; the scheduler to its session hours."""
         super().__init__()
-        self._is_running = True
+        self.provider = provider if provider is not None else BigParaProvider()
+        if scheduler is None:
+            scheduler = ScrapeScheduler(calendar=None if self.provider.live else AlwaysOpen())
+        self.scheduler = scheduler
+        self.tick_store = tick_store # Optional TickStore fed with every new snapshot
+        self.indicators = indicators # Optional IndicatorEngine updated with every new snapshot
+        self.screener = screener     # Optional Screener evaluated against every new snapshot
+        self._stopping = threading.Event()
+        self._snapshot = None # MarketSnapshot of the last emitted tick
+        self._tick_failures = 0 # tick_store.failed already reported
 
     def run(self):
-        while self._is_running:
+        while not self._stopping.is_set():
+            due = time.time()
             try:
+                due = self.scheduler.next_run(due)
+                if self._stopping.wait(max(0.0, due - time.time())):
+                    break
+                changed = False
                 stocks = self.fetch_data()
-                self.data_updated.emit(stocks)
+                if stocks is not None:
+                    if self.tick_store is not None:
+                        with PROFILER.stage("scraper.tick_store"):
+                            self.tick_store.append(stocks)
+                        self.report_tick_failures()
+                    self.data_updated.emit(stocks)
+                    with PROFILER.stage("scraper.diff"):
+                        delta = self.diff_snapshot(stocks)
+                    # A new page with the same quotes does not count as a market change
+                    changed = bool(delta)
+                    if changed:
+                        self.market_delta.emit(delta)
+                    if self.indicators is not None:
+                        with PROFILER.stage("scraper.indicators"):
+                            values = self.indicators.update(stocks)
+                        self.indicators_updated.emit((list(self.indicators.symbols), values))
+                    if self.screener is not None:
+                        with PROFILER.stage("scraper.screens"):
+                            screens = self.screener.evaluate(self._snapshot)
+                        self.screens_updated.emit(screens)
+                self.scheduler.completed(due, changed=changed)
             except Exception as e:
-                self.error_occurred.emit(str(e))
-            
-            # Sleep for 3 seconds before next update
-            time.sleep(3)
+                # Report the first failure of a streak; retries back off quietly
+                if self.scheduler.failed(due) == 1:
+                    self.error_occurred.emit(str(e))
+
+    def report_tick_failures(self):
+        """Emit error_occurred when the tick store lost ticks since the last report."""
+        failed = self.tick_store.failed
+        if failed != self._tick_failures:
+            self._tick_failures = failed
+            self.error_occurred.emit(f"Tick store lost {failed} ticks: {self.tick_store.last_error}")
 
     def stop(self):
-        self._is_running = False
+        self._stopping.set()
         self.wait()
+        self.provider.close()
 
-    def fetch_data(self) -> list[Stock]:
-        response = requests.get(self.URL, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        stocks = []
-        
-        # Iterate over each stock row
-        rows = soup.find_all("ul", {"class": "live-stock-item"})
-        
-        for row in rows:
-            try:
-                # Name
-                name_li = row.find("li", class_="cell064 tal arrow")
-                if not name_li:
-                    continue
-                
-                # The stock name is in the second 'a' tag
-                links = name_li.find_all("a")
-                if len(links) < 2:
-                    continue
-                symbol = links[1].text.strip()
-                
-                # Helper to get text from a specific class
-                def get_text(cls_name):
-                    node = row.find("li", class_=cls_name)
-                    return node.text.strip() if node else "0"
-
-                # Parse values (Turkey format: 1.234,56 -> 1234.56)
-                def parse_float(text):
-                    try:
-                        clean = text.replace(".", "").replace(",", ".")
-                        return float(clean)
-                    except (ValueError, AttributeError):
-                        return 0.0
-
-                price = parse_float(get_text("node-c"))      # Last Price
-                highest = parse_float(get_text("node-h"))    # High
-                lowest = parse_float(get_text("node-i"))     # Low
-                average = parse_float(get_text("node-j"))    # Avg
-                percent = parse_float(get_text("node-e"))    # Percent
-                cap_lot = parse_float(get_text("node-k"))    # Lot
-                cap_tl = parse_float(get_text("node-l"))     # Volume TL
-
-                stock = Stock(
-                    symbol=symbol,
-                    price=price,
-                    highest=highest,
-                    lowest=lowest,
-                    average=average,
-                    percent_change=percent,
-                    capacity_lot=cap_lot,
-                    capacity_tl=cap_tl
-                )
-                stocks.append(stock)
-                
-            except Exception as e:
-                print(f"Error parsing row: {e}")
-                continue
+    def diff_snapshot(self, stocks) -> MarketDelta:
+        """Diff against the previous tick and keep stocks as the new snapshot."""
+        current = MarketSnapshot.of(stocks)
+        delta = MarketDelta.between_snapshots(self._snapshot, current)
+        self._snapshot = current
+        return delta
 
-        return stocks
+    def fetch_data(self) -> Optional[MarketSnapshot]:
+        """The provider's current quotes, or None when nothing changed."""
+        return self.provider.fetch()
@@ -0,0 +1,135 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.indicators import IndicatorEngine
+from app.models import MarketDelta, Stock
+from app.providers import load_ticks
+
+
+class MovingAverageCrossover:
+    """
+    Holds `quantity` shares of every symbol whose EMA(fast) is above its SMA(slow).
+
+    Buys on the tick the EMA crosses above and sells the whole position
+    when it crosses back below.
+    """
+
+    def __init__(self, fast=12, slow=26, quantity=10):
+        self.params = {"fast": fast, "slow": slow, "quantity": quantity}
+        self.quantity = quantity
+        self.indicators = IndicatorEngine(sma_period=slow, ema_period=fast)
+
+    def on_tick(self, controller: GameController, ts: float, stocks: list[Stock]):
+        values = self.indicators.update(stocks)
+        # NaN until both windows are full compare False, i.e. no signal
+        with np.errstate(invalid="ignore"):
+            above = values["ema"] > values["sma"]
+            below = values["ema"] < values["sma"]
+        quotes = {stock.symbol: stock for stock in stocks}
+        for symbol, stock in quotes.items():
+            column = self.indicators.index[symbol]
+            held = controller.positions.get(symbol)
+            if above[column] and held is None:
+                controller.buy_stock(stock, self.quantity)
+            elif below[column] and held is not None:
+                controller.sell_stock(stock, held.quantity)
+
+
+@dataclass
+class SimulationResult:
+    params: dict = field(default_factory=dict)
+    ticks: int = 0
+    seconds: float = 0.0
+    final_equity: float = 0.0
+    trades: int = 0
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.seconds if self.seconds else 0.0
+
+
+def simulate(ticks, strategy, cash: float = 1000.0) -> SimulationResult:
+    """Replay `ticks` through a GameController on an in-memory database, trading with `strategy`."""
+    db = DatabaseManager(":memory:", pooled=True)
+    db.init_db()
+    with db.get_connection() as conn:
+        conn.execute("UPDATE player SET money = ? WHERE id = 1", (cash,))
+        conn.commit()
+    controller = GameController(db)
+
+    previous = {}
+    start = time.perf_counter()
+    for ts, stocks in ticks:
+        current = {stock.symbol: stock for stock in stocks}
+        controller.apply_market_delta(MarketDelta.between(previous, current), ts)
+        previous = current
+        strategy.on_tick(controller, ts, stocks)
+    seconds = time.perf_counter() - start
+
+    controller.close()
+    with db.get_connection() as conn:
+        trades = conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+    db.close()
+    return SimulationResult(params=getattr(strategy, "params", {}), ticks=len(ticks), seconds=seconds,
+                            final_equity=controller.net_worth(), trades=trades)
+
+
+# Ticks of the sweep's source, loaded once per worker process
+_sweep_ticks = None
+
+
+def _load_sweep_ticks(source):
+    global _sweep_ticks
+    _sweep_ticks = load_ticks(source)
+
+
+def _run_sweep_job(params, cash):
+    return simulate(_sweep_ticks, MovingAverageCrossover(**params), cash)
+
+
+def sweep(source: str, grid: list[dict], cash: float = 1000.0, workers: int = None) -> list[SimulationResult]:
+    """One MovingAverageCrossover simulation per parameter set, spread over a process pool."""
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_load_sweep_ticks, initargs=(source,)) as pool:
+        return list(pool.map(_run_sweep_job, grid, itertools.repeat(cash)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded market data through the trading logic, without the GUI.")
+    parser.add_argument("source", help="TickStore database (*.db), or BigPara HTML file, directory or glob")
+    parser.add_argument("--cash", type=float, default=1000.0)
+    parser.add_argument("--fast", type=int, nargs="+", default=[12], help="EMA period(s) in ticks")
+    parser.add_argument("--slow", type=int, nargs="+", default=[26], help="SMA period(s) in ticks")
+    parser.add_argument("--quantity", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None, help="processes for a sweep (default: one per core)")
+    args = parser.parse_args()
+
+    grid = [{"fast": fast, "slow": slow, "quantity": args.quantity}
+            for fast, slow in itertools.product(args.fast, args.slow) if fast < slow]
+    if not grid:
+        parser.error("no --fast period is shorter than a --slow period")
+
+    start = time.perf_counter()
+    if len(grid) == 1:
+        results = [simulate(load_ticks(args.source), MovingAverageCrossover(**grid[0]), args.cash)]
+    else:
+        results = sweep(args.source, grid, args.cash, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'fast':>5} {'slow':>5} {'ticks/s':>10} {'trades':>7} {'final equity':>14}")
+    for result in sorted(results, key=lambda result: result.final_equity, reverse=True):
+        print(f"{result.params['fast']:>5} {result.params['slow']:>5} {result.ticks_per_second:>10.0f}"
+              f" {result.trades:>7} {result.final_equity:>14,.2f}")
+    print(f"{len(results)} simulation(s) of {results[0].ticks} ticks in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Local HTTP stand-in for BigPara's canli-borsa page.
+
+Serves pages rendered from any MarketDataProvider (a replay or a
+synthetic market), gzip-encoded and with ETag/Last-Modified, so the
+scraper's full network path can be driven at any tick rate and symbol
+count. Runs without Qt.
+
+Usage: python -m app.standin [SOURCE] [--symbols N] [--interval S] [--latency S] [--port N]
+"""
+import argparse
+import gzip
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Union
+
+from app.models import MarketSnapshot, Stock
+from app.providers import MarketDataProvider, ReplayProvider, SyntheticProvider
+
+
+def turkish_number(value, decimals=2) -> str:
+    """1234.5 -> '1.234,50', the format BigPara renders."""
+    return f"{value:,.{decimals}f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+
+
+def render_page(stocks: Union[MarketSnapshot, list[Stock]]) -> bytes:
+    """A canli-borsa page listing `stocks`, in BigPara's markup."""
+    rows = []
+    for s in stocks:
+        direction = "up" if s.percent_change >= 0 else "down"
+        cells = (
+            ("cell048 node-c", "fiyat", turkish_number(s.price)),
+            ("cell048 node-h", "yuksek", turkish_number(s.highest)),
+            ("cell048 node-i", "dusuk", turkish_number(s.lowest)),
+            ("cell048 node-j", "aof", turkish_number(s.average)),
+            (f"cell048 node-e {direction}", "yuzde", turkish_number(s.percent_change)),
+            ("cell064 node-k", "hacimlot", turkish_number(s.capacity_lot, 0)),
+            ("cell096 node-l", "hacimtl", turkish_number(s.capacity_tl, 0)),
+            ("cell048 node-s", "saat", "18:09"),
+        )
+        rows.append(
+            f'<ul class="live-stock-item" data-symbol="{s.symbol}">\n'
+            f'<li class="cell064 tal arrow"><a href="javascript:;" class="{direction}"><i class="icon-{direction}"></i></a>'
+            f'<a href="/borsa/hisse-fiyatlari/{s.symbol.lower()}-detay/" title="{s.symbol}">{s.symbol}</a></li>\n'
+            + "".join(f'<li class="{cls}" id="h_td_{name}_id_{s.symbol}">{text}</li>\n' for cls, name, text in cells)
+            + "</ul>"
+        )
+    return (
+        '<!DOCTYPE html>\n<html lang="tr">\n<head>\n<meta charset="utf-8">\n'
+        "<title>Canlı Borsa - Hisse Senetleri - Bigpara</title>\n</head>\n<body>\n"
+        '<div class="tableCnt">\n<div class="tBody">\n' + "\n".join(rows) + "\n</div>\n</div>\n</body>\n</html>\n"
+    ).encode("utf-8")
+
+
+class StandInPage:
+    """Current page body plus the validators the handler serves with it."""
+
+    def __init__(self, body: bytes):
+        self.lock = threading.Lock()
+        self.set(body)
+
+    def set(self, body: bytes):
+        with self.lock:
+            self.body = body
+            self.gzipped = gzip.compress(body)
+            self.etag = '"%s"' % hashlib.md5(body).hexdigest()
+            self.last_modified = formatdate(time.time(), usegmt=True)
+
+
+def make_handler(page, conditional=True, latency=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            with page.lock:
+                body, gzipped, etag, modified = page.body, page.gzipped, page.etag, page.last_modified
+            if conditional and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+            payload = gzipped if use_gzip else body
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            if use_gzip:
+                self.send_header("Content-Encoding", "gzip")
+            if conditional:
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", modified)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class StandInServer:
+    """
+    Serves `body`, or pages rendered from `provider`'s snapshots.
+
+    advance() renders the provider's next snapshot; with `interval` a
+    background thread does so every `interval` seconds, so the page
+    changes on its own like the live site. `latency` delays every
+    answer, standing in for the round trip to the real host.
+    """
+
+    def __init__(self, body: bytes = b"", provider: MarketDataProvider = None, interval: float = None,
+                 host="127.0.0.1", port=0, conditional=True, latency=0.0):
+        self.provider = provider
+        self.interval = interval
+        self.page = StandInPage(body)
+        self.server = ThreadingHTTPServer((host, port), make_handler(self.page, conditional, latency))
+        self._stopping = threading.Event()
+        self._threads = []
+        if provider is not None:
+            self.advance()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def advance(self):
+        stocks = self.provider.fetch()
+        if stocks is not None:
+            self.page.set(render_page(stocks))
+
+    def start(self) -> "StandInServer":
+        self._threads.append(threading.Thread(target=self.server.serve_forever, daemon=True))
+        if self.provider is not None and self.interval:
+            self._threads.append(threading.Thread(target=self._advance_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+
+    def _advance_loop(self):
+        while not self._stopping.wait(self.interval):
+            self.advance()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("source", nargs="?",
+                        help="TickStore database or saved pages to replay (default: synthetic market)")
+    parser.add_argument("--symbols", type=int, default=500, help="synthetic market size")
+    parser.add_argument("--moving", type=float, default=0.2, help="synthetic fraction of symbols moving per tick")
+    parser.add_argument("--prefix", default="S", help="synthetic symbol prefix")
+    parser.add_argument("--interval", type=float, default=3.0, help="seconds between page changes")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every answer")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.source:
+        provider = ReplayProvider.from_source(args.source)
+    else:
+        provider = SyntheticProvider(args.symbols, args.moving, prefix=args.prefix)
+    server = StandInServer(provider=provider, interval=args.interval, host=args.host, port=args.port,
+                           latency=args.latency).start()
+    print(f"Serving at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
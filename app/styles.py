@@ -23,7 +23,7 @@ QGroupBox::title {
 }
 
 /* Tables */
-QTableWidget {
+QTableView {
     background-color: #1e1e2e;
     gridline-color: #313244;
     border: none;
@@ -31,11 +31,11 @@ QTableWidget {
     selection-color: #cdd6f4;
     outline: none;
 }
-QTableWidget::item {
+QTableView::item {
     padding: 5px;
     border-bottom: 1px solid #313244;
 }
-QTableWidget::item:hover {
+QTableView::item:hover {
     background-color: #313244;
 }
 QHeaderView::section {
@@ -45,7 +45,7 @@ QHeaderView::section {
     font-weight: bold;
     color: #bac2de;
 }
-QTableWidget QTableCornerButton::section {
+QTableView QTableCornerButton::section {
     background-color: #252535;
     border: none;
 }
@@ -0,0 +1,216 @@
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+from typing import Union
+
+import numpy as np
+
+from app.models import MarketSnapshot, SNAPSHOT_COLUMNS, Stock
+
+TICKS_DB_NAME = "ticks.db"
+
+# Stock field -> integer scale it is stored with: the snapshot's fixed-point scales
+TICK_FIELDS = {name: scale for name, (_dtype, scale) in SNAPSHOT_COLUMNS.items()}
+
+
+class TickStore:
+    """
+    Append-only store of scraped quotes.
+
+    Each tick is one row per symbol with integer-scaled values (see
+    TICK_FIELDS) in a WITHOUT ROWID table keyed by (symbol_id, ts), so a
+    symbol's history is contiguous on disk. append() only queues the
+    snapshot; a background thread writes every queued tick in one
+    transaction. Queries return NumPy arrays.
+    """
+
+    def __init__(self, db_name=TICKS_DB_NAME, max_pending=100):
+        self.db_name = db_name
+        self.dropped = 0 # Ticks discarded because the writer fell behind
+        self.failed = 0  # Ticks lost to write errors; the latest one is in last_error
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._symbol_ids = {} # symbol -> id; only the writer adds to it, under _symbols_lock
+        self._symbols_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._read_conn = None
+
+        conn = self._connect()
+        self._init_schema(conn)
+        self._symbol_ids = dict(conn.execute("SELECT symbol, id FROM tick_symbols"))
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="TickStoreWriter", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    @staticmethod
+    def _init_schema(conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS tick_symbols (
+                id INTEGER PRIMARY KEY,
+                symbol TEXT NOT NULL UNIQUE
+            )
+        ''')
+        columns = ", ".join(f"{name} INTEGER NOT NULL" for name in TICK_FIELDS)
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS ticks (
+                symbol_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL, -- unix epoch, milliseconds
+                {columns},
+                PRIMARY KEY (symbol_id, ts)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+
+    # Writing
+    def append(self, stocks: Union[MarketSnapshot, list[Stock]], ts: float = None):
+        """Queue a full market snapshot taken at `ts` (default: now). Never blocks."""
+        ts_ms = int((time.time() if ts is None else ts) * 1000)
+        try:
+            self._queue.put_nowait((ts_ms, stocks))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+        with self._read_lock:
+            if self._read_conn is not None:
+                self._read_conn.close()
+                self._read_conn = None
+
+    def _write_loop(self):
+        conn = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Drain whatever else piled up into the same transaction
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in batch
+                ticks = [item for item in batch if item is not None]
+                try:
+                    if ticks:
+                        self._write(conn, ticks)
+                except Exception as e:
+                    # Keep writing later ticks; the loss is counted for the scraper to report
+                    conn.rollback()
+                    self.last_error = e
+                    self.failed += len(ticks)
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _write(self, conn, ticks):
+        rows, new_ids = [], {}
+        for ts_ms, stocks in ticks:
+            if isinstance(stocks, MarketSnapshot):
+                # Same scales as the snapshot columns; only the float volumes need rounding
+                ids = [self._symbol_id(conn, symbol, new_ids) for symbol in stocks.symbols]
+                values = [np.rint(stocks.columns[name]).astype(np.int64).tolist() for name in TICK_FIELDS]
+                rows.extend(zip(ids, itertools.repeat(ts_ms), *values))
+                continue
+            for stock in stocks:
+                rows.append((self._symbol_id(conn, stock.symbol, new_ids), ts_ms, *(
+                    round(getattr(stock, name) * scale) for name, scale in TICK_FIELDS.items()
+                )))
+        placeholders = ", ".join("?" * (len(TICK_FIELDS) + 2))
+        conn.executemany(f"INSERT OR REPLACE INTO ticks VALUES ({placeholders})", rows)
+        conn.commit()
+        # Readers only learn about new symbols once their rows are committed
+        if new_ids:
+            with self._symbols_lock:
+                self._symbol_ids.update(new_ids)
+
+    def _symbol_id(self, conn, symbol: str, new_ids: dict) -> int:
+        # The writer thread is the only one changing _symbol_ids, so it reads without the lock
+        symbol_id = self._symbol_ids.get(symbol) or new_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = new_ids[symbol] = conn.execute(
+                "INSERT INTO tick_symbols (symbol) VALUES (?)", (symbol,)).lastrowid
+        return symbol_id
+
+    # Reading
+    def symbols(self) -> list[str]:
+        with self._symbols_lock:
+            return sorted(self._symbol_ids)
+
+    def query(self, symbol: str, start: float = None, end: float = None) -> dict[str, np.ndarray]:
+        """
+        Ticks of one symbol in [start, end] (unix seconds), oldest first.
+
+        Returns {"ts": datetime64[ms], <field>: float64, ...}; prices are
+        scaled back to TL.
+        """
+        with self._symbols_lock:
+            symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            return self._empty()
+        sql = [f"SELECT ts, {', '.join(TICK_FIELDS)} FROM ticks WHERE symbol_id = ?"]
+        params = [symbol_id]
+        if start is not None:
+            sql.append("AND ts >= ?")
+            params.append(int(start * 1000))
+        if end is not None:
+            sql.append("AND ts <= ?")
+            params.append(int(end * 1000))
+        sql.append("ORDER BY ts")
+        with self._read_lock:
+            if self._read_conn is None:
+                self._read_conn = self._connect()
+            rows = self._read_conn.execute(" ".join(sql), params).fetchall()
+        if not rows:
+            return self._empty()
+        data = np.array(rows, dtype=np.int64)
+        result = {"ts": data[:, 0].astype("datetime64[ms]")}
+        for i, (name, scale) in enumerate(TICK_FIELDS.items(), 1):
+            result[name] = data[:, i] / scale
+        return result
+
+    def snapshots(self, start: float = None, end: float = None):
+        """Yield (ts in unix seconds, list[Stock]) for every recorded tick in [start, end], oldest first."""
+        sql = [f"SELECT ts, symbol, {', '.join(TICK_FIELDS)} FROM ticks JOIN tick_symbols ON tick_symbols.id = symbol_id"]
+        params = []
+        if start is not None:
+            sql.append("WHERE ts >= ?")
+            params.append(int(start * 1000))
+        if end is not None:
+            sql.append("AND ts <= ?" if params else "WHERE ts <= ?")
+            params.append(int(end * 1000))
+        sql.append("ORDER BY ts")
+        scales = tuple(TICK_FIELDS.values())
+        conn = self._connect()
+        try:
+            rows = conn.execute(" ".join(sql), params)
+            for ts_ms, group in itertools.groupby(rows, key=lambda row: row[0]):
+                yield ts_ms / 1000, [
+                    Stock(row[1], *(value / scale for value, scale in zip(row[2:], scales)))
+                    for row in group
+                ]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _empty():
+        result = {"ts": np.array([], dtype="datetime64[ms]")}
+        result.update({name: np.array([], dtype=np.float64) for name in TICK_FIELDS})
+        return result
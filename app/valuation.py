@@ -0,0 +1,219 @@
+from typing import Optional, Union
+
+import numpy as np
+
+from app.models import MarketSnapshot, PlayerModel, PortfolioItem, PositionValuation, ValuationSnapshot
+
+
+class ValuationEngine:
+    """
+    Running portfolio totals, updated in O(1) per price change or fill.
+
+    Positions without a known price are valued at their average cost,
+    like the rest of the application does.
+    """
+
+    def __init__(self):
+        self.cash = 0.0
+        self.market_value = 0.0
+        self.cost_basis = 0.0
+        self.version = 0
+        self._positions = {} # symbol -> [quantity, average_cost, price or None]
+        self.prices = {}     # last known price for every symbol, held or not
+        self._snapshot = None
+
+    def reset(self, cash: float, items: list[PortfolioItem], prices: Union[MarketSnapshot, dict[str, float]]):
+        """Rebuild all totals from scratch; `prices` (a snapshot's, or a copy of the dict) become the price cache."""
+        self.cash = cash
+        self.prices = prices.price_map() if isinstance(prices, MarketSnapshot) else dict(prices)
+        self._positions = {
+            item.symbol: [item.quantity, item.average_cost, self.prices.get(item.symbol)]
+            for item in items
+        }
+        self.market_value = sum(self._value(p) for p in self._positions.values())
+        self.cost_basis = sum(p[0] * p[1] for p in self._positions.values())
+        self._changed()
+
+    def set_cash(self, cash: float):
+        if cash != self.cash:
+            self.cash = cash
+            self._changed()
+
+    def on_price(self, symbol: str, price: Optional[float]):
+        """A symbol's price moved (None: no longer quoted)."""
+        if price is None:
+            self.prices.pop(symbol, None)
+        else:
+            self.prices[symbol] = price
+        position = self._positions.get(symbol)
+        if position is None or position[2] == price:
+            return
+        self.market_value -= self._value(position)
+        position[2] = price
+        self.market_value += self._value(position)
+        self._changed()
+
+    def on_fill(self, symbol: str, quantity: int, average_cost: float, cash: float):
+        """A position now holds `quantity` at `average_cost`; cash is the new balance."""
+        position = self._positions.pop(symbol, None)
+        if position is not None:
+            self.market_value -= self._value(position)
+            self.cost_basis -= position[0] * position[1]
+        if quantity:
+            position = [quantity, average_cost, self.prices.get(symbol)]
+            self._positions[symbol] = position
+            self.market_value += self._value(position)
+            self.cost_basis += quantity * average_cost
+        self.cash = cash
+        self._changed()
+
+    @property
+    def net_worth(self) -> float:
+        return self.cash + self.market_value
+
+    def snapshot(self) -> ValuationSnapshot:
+        """Current valuation; the same object is returned until something changes."""
+        if self._snapshot is None:
+            positions = []
+            for symbol, (quantity, average_cost, price) in self._positions.items():
+                price = average_cost if price is None else price
+                positions.append(PositionValuation(
+                    symbol=symbol,
+                    quantity=quantity,
+                    average_cost=average_cost,
+                    price=price,
+                    market_value=quantity * price,
+                    cost_basis=quantity * average_cost,
+                ))
+            self._snapshot = ValuationSnapshot(
+                cash=self.cash,
+                market_value=self.market_value,
+                cost_basis=self.cost_basis,
+                positions=tuple(positions),
+                version=self.version,
+            )
+        return self._snapshot
+
+    @staticmethod
+    def _value(position) -> float:
+        quantity, average_cost, price = position
+        return quantity * (average_cost if price is None else price)
+
+    def _changed(self):
+        self.version += 1
+        self._snapshot = None
+
+
+class AccountBook:
+    """
+    Cash and positions of every player, for valuing them all at once.
+
+    Positions are rows of parallel NumPy arrays (account, symbol, quantity,
+    average cost), so net_worth() prices every account against the shared
+    price cache with one gather and one bincount instead of a loop over
+    players. Closed positions keep their row with quantity 0.
+    """
+
+    def __init__(self):
+        self.reset([], [])
+
+    def __len__(self) -> int:
+        return len(self.player_ids)
+
+    def __contains__(self, player_id) -> bool:
+        return player_id in self._accounts
+
+    def reset(self, players: list[PlayerModel], positions):
+        """Rebuild from all players and (player_id, PortfolioItem) pairs."""
+        self.player_ids = np.array([player.id for player in players], dtype=np.int64)
+        self.cash = np.array([player.money for player in players], dtype=np.float64)
+        self._accounts = {player.id: i for i, player in enumerate(players)} # player_id -> account index
+        self.symbols = []
+        self._symbols = {}  # symbol -> symbol index
+        self._rows = {}     # (account index, symbol index) -> position row
+        self._size = 0
+        capacity = 64
+        self._account = np.zeros(capacity, dtype=np.intp)
+        self._symbol = np.zeros(capacity, dtype=np.intp)
+        self._quantity = np.zeros(capacity)
+        self._average_cost = np.zeros(capacity)
+        for player_id, item in positions:
+            self.set_position(player_id, item.symbol, item.quantity, item.average_cost)
+
+    def add_account(self, player_id: int, cash: float):
+        self._accounts[player_id] = len(self.player_ids)
+        self.player_ids = np.append(self.player_ids, player_id)
+        self.cash = np.append(self.cash, cash)
+
+    def players(self) -> list[PlayerModel]:
+        return [PlayerModel(id=int(player_id), money=float(cash)) for player_id, cash in zip(self.player_ids, self.cash)]
+
+    def player(self, player_id: int) -> PlayerModel:
+        return PlayerModel(id=player_id, money=self.cash_of(player_id))
+
+    def positions_of(self, player_id: int) -> dict[str, PortfolioItem]:
+        account = self._accounts[player_id]
+        return {
+            self.symbols[self._symbol[row]]: PortfolioItem(
+                symbol=self.symbols[self._symbol[row]],
+                quantity=int(self._quantity[row]),
+                average_cost=float(self._average_cost[row]),
+            )
+            for row in np.flatnonzero(self._account[:self._size] == account)
+            if self._quantity[row]
+        }
+
+    def cash_of(self, player_id: int) -> float:
+        return float(self.cash[self._accounts[player_id]])
+
+    def set_cash(self, player_id: int, cash: float):
+        self.cash[self._accounts[player_id]] = cash
+
+    def position(self, player_id: int, symbol: str) -> Optional[PortfolioItem]:
+        row = self._rows.get((self._accounts[player_id], self._symbols.get(symbol)))
+        if row is None or not self._quantity[row]:
+            return None
+        return PortfolioItem(symbol=symbol, quantity=int(self._quantity[row]),
+                             average_cost=float(self._average_cost[row]))
+
+    def set_position(self, player_id: int, symbol: str, quantity: int, average_cost: float):
+        symbol_index = self._symbols.get(symbol)
+        if symbol_index is None:
+            symbol_index = self._symbols[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        key = (self._accounts[player_id], symbol_index)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._rows[key] = self._size
+            self._size += 1
+            if self._size > len(self._quantity):
+                self._grow(2 * len(self._quantity))
+            self._account[row], self._symbol[row] = key
+        self._quantity[row] = quantity
+        self._average_cost[row] = average_cost
+
+    def net_worth(self, prices: dict[str, float]) -> np.ndarray:
+        """Cash plus holdings of every account, aligned with player_ids."""
+        n = self._size
+        price = np.array([prices.get(symbol, np.nan) for symbol in self.symbols])
+        price = price[self._symbol[:n]] if len(price) else np.empty(0)
+        # Unquoted symbols are valued at average cost
+        price = np.where(np.isnan(price), self._average_cost[:n], price)
+        holdings = np.bincount(self._account[:n], weights=self._quantity[:n] * price, minlength=len(self.cash))
+        return self.cash + holdings
+
+    def net_worth_of(self, player_id: int, prices: dict[str, float]) -> float:
+        account = self._accounts[player_id]
+        rows = np.flatnonzero(self._account[:self._size] == account)
+        value = float(self.cash[account])
+        for row in rows:
+            price = prices.get(self.symbols[self._symbol[row]])
+            value += self._quantity[row] * (self._average_cost[row] if price is None else price)
+        return value
+
+    def _grow(self, capacity):
+        for name in ("_account", "_symbol", "_quantity", "_average_cost"):
+            array = getattr(self, name)
+            new = np.zeros(capacity, dtype=array.dtype)
+            new[:len(array)] = array
+            setattr(self, name, new)
@@ -1,10 +1,18 @@
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QTableWidget, QTableWidgetItem, QPushButton, QSpinBox, 
-    QTabWidget, QMessageBox, QGroupBox, QHeaderView, QFormLayout
+    QTabWidget, QMessageBox, QGroupBox, QHeaderView, QFormLayout,
+    QTableView, QLineEdit, QComboBox, QDoubleSpinBox, QCheckBox, QFileDialog, QShortcut,
+    QDialog, QDialogButtonBox
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from app.models import Stock, PortfolioItem
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QTimer, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+)
+from typing import Optional, Union
+from app.models import (
+    Stock, PortfolioItem, MarketDelta, MarketSnapshot, ValuationSnapshot, STOCK_FIELDS, Order, Watchlist,
+)
+from app.profiling import PROFILER
 from PyQt5 import QtWidgets, QtGui
 import matplotlib
 matplotlib.use('Qt5Agg')
@@ -12,49 +20,113 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.dates as mdates
 import datetime
+import numpy as np
 
 # Charts
 class PortfolioDonutChart(FigureCanvas):
+    START_ANGLE = 90
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.6
+
     def __init__(self, width=5, height=4, dpi=100):
         self.fig = Figure(figsize=(width, height), dpi=dpi)
         self.fig.patch.set_facecolor('#1e1e2e') # Match Dark Theme bg
         super().__init__(self.fig)
         self.axes = self.fig.add_subplot(111)
         self.axes.set_facecolor('#1e1e2e')
+        self.version = None # Valuation version currently drawn
+        self._labels = None
+        self._artists = None # (wedges, texts, autotexts)
 
-    def update_chart(self, cash, portfolio_items, current_prices):
-        self.axes.clear()
+    def update_chart(self, valuation: ValuationSnapshot):
+        if valuation.version == self.version:
+            return
+        self.version = valuation.version
         
         labels = ['Cash']
-        values = [cash]
+        values = [valuation.cash]
         colors = ['#a6e3a1'] # Green for cash
         
-        # Calculate value for each stock
-        for item in portfolio_items:
-            price = current_prices.get(item.symbol, item.average_cost)
-            value = item.quantity * price
+        # Value of each stock
+        for position in valuation.positions:
+            value = position.market_value
             if value > 0:
-                labels.append(item.symbol)
+                labels.append(position.symbol)
                 values.append(value)
                 # Cycle through some nice colors
                 colors.append('#89b4fa' if len(colors) % 2 == 0 else '#fab387')
 
+        if labels == self._labels:
+            # Same slices: move the existing wedges and texts
+            self._resize_wedges(values)
+        else:
+            self._rebuild(labels, values, colors)
+        self.draw_idle()
+
+    def _rebuild(self, labels, values, colors):
+        self.axes.clear()
+
         # Pie Chart
-        wedges, texts, autotexts = self.axes.pie(
+        self._artists = self.axes.pie(
             values, labels=labels, autopct='%1.1f%%',
-            startangle=90, colors=colors,
+            startangle=self.START_ANGLE, colors=colors,
+            labeldistance=self.LABEL_DISTANCE, pctdistance=self.PCT_DISTANCE,
             textprops=dict(color="w")
         )
+        self._labels = labels
         
         # Donut Style
         centre_circle = matplotlib.patches.Circle((0,0), 0.70, fc='#1e1e2e')
-        self.fig.gca().add_artist(centre_circle)
+        self.axes.add_artist(centre_circle)
         
         self.axes.set_title("Portfolio Allocation", color='#cdd6f4', fontsize=12, fontweight='bold')
-        self.fig.canvas.draw()
+
+    def _resize_wedges(self, values):
+        """Same geometry as Axes.pie(), applied to the existing artists."""
+        wedges, texts, autotexts = self._artists
+        total = sum(values)
+        theta1 = self.START_ANGLE
+        for wedge, text, autotext, value in zip(wedges, texts, autotexts, values):
+            frac = value / total
+            theta2 = theta1 + 360 * frac
+            wedge.set_theta1(theta1)
+            wedge.set_theta2(theta2)
+
+            angle = np.deg2rad((theta1 + theta2) / 2)
+            x, y = np.cos(angle), np.sin(angle)
+            text.set_position((self.LABEL_DISTANCE * x, self.LABEL_DISTANCE * y))
+            text.set_horizontalalignment('left' if x > 0 else 'right')
+            autotext.set_position((self.PCT_DISTANCE * x, self.PCT_DISTANCE * y))
+            autotext.set_text('%1.1f%%' % (100 * frac))
+            theta1 = theta2
+
+def decimate_minmax(x, y, buckets):
+    """
+    Reduce a series to the min and max point of each of `buckets` equal x
+    intervals (in their original order), so a line drawn `buckets` pixels
+    wide looks the same as the full series.
+    """
+    if len(x) <= 2 * buckets:
+        return x, y
+    span = x[-1] - x[0]
+    if span == 0:
+        # Every sample at one x: a single bucket
+        bucket = np.zeros(len(x), dtype=np.int64)
+    else:
+        bucket = np.minimum(((x - x[0]) / span * buckets).astype(np.int64), buckets - 1)
+    # Within each bucket, sort by value: first entry is the min, last the max
+    order = np.lexsort((y, bucket))
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], len(order)] - 1
+    keep = np.unique(np.concatenate(([0, len(x) - 1], order[starts], order[ends])))
+    return x[keep], y[keep]
 
 class EquityLineChart(FigureCanvas):
-    def __init__(self, width=5, height=4, dpi=100):
+    MAX_POINTS = 500 # History rows requested per refresh (rollup mode) and to seed incremental mode
+    TAIL_LIMIT = 200 # Live-tail points blitted before the body is re-decimated
+    MARKER_LIMIT = 200 # Draw point markers only for short histories
+
+    def __init__(self, width=5, height=4, dpi=100, incremental=True):
         self.fig = Figure(figsize=(width, height), dpi=dpi)
         self.fig.patch.set_facecolor('#1e1e2e')
         super().__init__(self.fig)
@@ -68,71 +140,378 @@ class EquityLineChart(FigureCanvas):
         self.axes.xaxis.label.set_color('#cdd6f4')
         self.axes.yaxis.label.set_color('#cdd6f4')
 
-    def update_chart(self, history_data):
-        self.axes.clear()
         self.axes.set_title("Net Worth History", color='#cdd6f4', fontsize=12, fontweight='bold')
         self.axes.grid(True, color='#313244', linestyle='--')
-        
-        if not history_data:
-            self.fig.canvas.draw()
-            return
+        self.line, = self.axes.plot([], [], color='#89b4fa', linewidth=2, marker='o', markersize=4)
+        self.line.set_visible(False)
 
-        # Data: list of (timestamp_str, value)
-        # Parse timestamp
-        times = [datetime.datetime.strptime(row['timestamp'], "%Y-%m-%d %H:%M:%S") for row in history_data]
-        values = [row['total_value'] for row in history_data]
-        
-        self.axes.plot(times, values, color='#89b4fa', linewidth=2, marker='o', markersize=4)
-        
         # Format Date
+        self.axes.xaxis_date()
         self.axes.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
         self.fig.autofmt_xdate()
+        self.version = None # History version currently drawn
+
+        # Incremental mode: full series cached as arrays, the body drawn
+        # decimated and points since the last full draw blitted on top
+        self.incremental = incremental
+        self.last_id = None # newest raw sample id cached; None until seeded
+        self.x = np.array([], dtype=np.float64) # matplotlib date numbers
+        self.y = np.array([], dtype=np.float64)
+        self._tail_start = 0
+        self._background = None
+        self.tail_line, = self.axes.plot([], [], color='#89b4fa', linewidth=2, animated=True)
+        self.mpl_connect('draw_event', self._on_draw)
+        self.mpl_connect('resize_event', lambda _event: self._redraw_body())
+
+    def update_chart(self, history_data, version=None):
+        if version is not None and version == self.version:
+            return
+        self.version = version
+
+        if history_data:
+            # Data: list of (timestamp_str, value)
+            # Parse timestamp
+            times = [datetime.datetime.strptime(row['timestamp'], "%Y-%m-%d %H:%M:%S") for row in history_data]
+            values = [row['total_value'] for row in history_data]
+            self.line.set_data(times, values)
+            self.line.set_marker('o' if len(values) <= self.MARKER_LIMIT else '')
+            self.line.set_visible(True)
+            self.axes.relim()
+            self.axes.autoscale_view()
+        else:
+            self.line.set_visible(False)
         
-        self.fig.canvas.draw()
+        self.draw_idle()
+
+    def append_points(self, last_id, times, values, version=None):
+        """Incremental mode: add points newer than the ones already cached."""
+        self.version = version
+        self.last_id = last_id
+        if not len(times):
+            return
+        self.x = np.concatenate((self.x, mdates.date2num(times)))
+        self.y = np.concatenate((self.y, values))
+
+        x0, x1 = self.axes.get_xlim()
+        y0, y1 = self.axes.get_ylim()
+        tail_fits = (
+            self._background is not None
+            and len(self.x) - self._tail_start <= self.TAIL_LIMIT
+            and self.x[-1] <= x1 and y0 <= self.y[-len(times):].min()
+            and self.y[-len(times):].max() <= y1
+        )
+        if tail_fits:
+            self._blit_tail()
+        else:
+            self._redraw_body()
+
+    def _redraw_body(self):
+        """Re-decimate the whole series, rescale and schedule a full draw."""
+        if not self.incremental or not len(self.x):
+            return
+        buckets = max(int(self.axes.bbox.width), 1)
+        x, y = decimate_minmax(self.x, self.y, buckets)
+        self.line.set_data(x, y)
+        self.line.set_marker('o' if len(x) <= self.MARKER_LIMIT else '')
+        self.line.set_visible(True)
+        self._tail_start = len(self.x)
+        self.tail_line.set_data([], [])
+
+        # Leave headroom so the live tail can be blitted for a while
+        span = max(self.x[-1] - self.x[0], 1 / 1440)
+        low, high = self.y.min(), self.y.max()
+        pad = max((high - low) * 0.1, abs(high) * 0.001, 1e-6)
+        self.axes.set_xlim(self.x[0] - span * 0.02, self.x[-1] + span * 0.1)
+        self.axes.set_ylim(low - pad, high + pad)
+        self.draw_idle()
+
+    def _blit_tail(self):
+        start = max(self._tail_start - 1, 0) # Connect to the last body point
+        self.tail_line.set_data(self.x[start:], self.y[start:])
+        self.restore_region(self._background)
+        self.axes.draw_artist(self.tail_line)
+        self.blit(self.axes.bbox)
+
+    def _on_draw(self, _event):
+        # Full draws skip the animated tail; keep the result for blitting
+        self._background = self.copy_from_bbox(self.axes.bbox)
+        self.axes.draw_artist(self.tail_line)
+
+
+# Raw (unformatted) cell value, used for sorting
+SORT_ROLE = Qt.UserRole
+
+class MarketTableModel(QAbstractTableModel):
+    """
+    Column-wise store of the latest quote per symbol.
 
+    Each Stock field lives in its own list, indexed by a stable
+    symbol -> row map. Updates write values in place and emit dataChanged
+    only for the cells that actually changed.
+    """
 
-class MarketTableWidget(QTableWidget):
+    # (header, Stock field, display format)
+    COLUMNS = [
+        ("Symbol", "symbol", "{}"),
+        ("Price", "price", "{:.2f}"),
+        ("High", "highest", "{:.2f}"),
+        ("Low", "lowest", "{:.2f}"),
+        ("Avg", "average", "{:.2f}"),
+        ("Change %", "percent_change", "{:.2f}%"),
+        ("Cap Lot", "capacity_lot", "{:,.0f}"),
+        ("Cap TL", "capacity_tl", "{:,.0f}"),
+    ]
+
+    CHANGE_BRUSHES = {
+        1: QtGui.QBrush(Qt.green),
+        -1: QtGui.QBrush(Qt.red),
+        0: QtGui.QBrush(Qt.lightGray),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbols = []
+        self.columns = {name: [] for name in STOCK_FIELDS}
+        self.rows = {} # symbol -> row
+        self.column_specs = list(self.COLUMNS)
+        self.column_of = {name: i for i, (_, name, _) in enumerate(self.column_specs)}
+
+    def add_column(self, header: str, key: str, fmt: str):
+        """Append an extra column (e.g. an indicator) filled via set_column_values."""
+        position = len(self.column_specs)
+        self.beginInsertColumns(QModelIndex(), position, position)
+        self.column_specs.append((header, key, fmt))
+        self.column_of[key] = position
+        self.columns[key] = [None] * len(self.symbols)
+        self.endInsertColumns()
+
+    def set_column_values(self, key: str, symbols: list[str], values):
+        """Set an extra column for the given symbols; NaN shows as an empty cell."""
+        for symbol, value in zip(symbols, values):
+            row = self.rows.get(symbol)
+            if row is not None:
+                self._set_cell(row, key, None if value != value else float(value))
+
+    # Qt model interface
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.symbols)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.column_specs)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.column_specs[section][0]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        _, name, fmt = self.column_specs[index.column()]
+        row = index.row()
+        value = self.symbols[row] if name == "symbol" else self.columns[name][row]
+        if role == Qt.DisplayRole:
+            return "" if value is None else fmt.format(value)
+        if role == SORT_ROLE:
+            return float("-inf") if value is None else value
+        if role == Qt.ForegroundRole and name == "percent_change":
+            return self.CHANGE_BRUSHES[(value > 0) - (value < 0)]
+        return None
+
+    # Store access
+    def stock(self, symbol: str) -> Optional[Stock]:
+        row = self.rows.get(symbol)
+        if row is None:
+            return None
+        return Stock(symbol, *(self.columns[name][row] for name in STOCK_FIELDS))
+
+    def set_stocks(self, stocks: Union[MarketSnapshot, list[Stock]]):
+        """Sync the store with a full snapshot."""
+        if isinstance(stocks, MarketSnapshot):
+            self._set_snapshot(stocks)
+            return
+        seen = set()
+        added = []
+        for stock in stocks:
+            seen.add(stock.symbol)
+            row = self.rows.get(stock.symbol)
+            if row is None:
+                added.append(stock)
+                continue
+            for name in STOCK_FIELDS:
+                self._set_cell(row, name, getattr(stock, name))
+        self._remove([symbol for symbol in self.symbols if symbol not in seen])
+        self._append(added)
+
+    def _set_snapshot(self, snapshot: MarketSnapshot):
+        # One list per field instead of a StockView property lookup per cell
+        self._remove([symbol for symbol in self.symbols if symbol not in snapshot])
+        values = [(name, snapshot.values(name)) for name in STOCK_FIELDS]
+        added = []
+        for i, symbol in enumerate(snapshot.symbols):
+            row = self.rows.get(symbol)
+            if row is None:
+                added.append(snapshot.get(symbol))
+                continue
+            for name, column in values:
+                self._set_cell(row, name, column[i])
+        self._append(added)
+
+    def apply_delta(self, delta: MarketDelta):
+        """Apply a tick diff; cost is proportional to the symbols that moved."""
+        self._remove(delta.removed)
+        for symbol, changes in delta.changed.items():
+            row = self.rows.get(symbol)
+            if row is None:
+                continue
+            for name, value in changes.items():
+                self._set_cell(row, name, value)
+        self._append([s for s in delta.added if s.symbol not in self.rows])
+
+    def _set_cell(self, row, name, value):
+        column = self.columns[name]
+        if column[row] != value:
+            column[row] = value
+            index = self.index(row, self.column_of[name])
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def _append(self, stocks: list[Stock]):
+        if not stocks:
+            return
+        first = len(self.symbols)
+        self.beginInsertRows(QModelIndex(), first, first + len(stocks) - 1)
+        for i, stock in enumerate(stocks, first):
+            self.rows[stock.symbol] = i
+            self.symbols.append(stock.symbol)
+            for name in STOCK_FIELDS:
+                self.columns[name].append(getattr(stock, name))
+        for name in self.columns.keys() - STOCK_FIELDS:
+            self.columns[name].extend([None] * len(stocks))
+        self.endInsertRows()
+
+    def _remove(self, symbols):
+        rows = sorted((self.rows[s] for s in symbols if s in self.rows), reverse=True)
+        if not rows:
+            return
+        # Bottom-up, so pending row numbers stay valid
+        for row in rows:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.symbols[row]
+            for column in self.columns.values():
+                del column[row]
+            self.endRemoveRows()
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+
+class MarketFilterProxyModel(QSortFilterProxyModel):
+    """
+    Sorts on raw values and filters rows by symbol substring and, optionally,
+    a ranked symbol list (a screen result), whose order is used while
+    `rank_sort` is set.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self.setFilterKeyColumn(0)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.symbols = None # symbol -> rank; only these symbols pass, when set
+        self.rank_sort = False
+
+    def set_symbols(self, symbols: Optional[list[str]]):
+        ranks = None if symbols is None else {symbol: rank for rank, symbol in enumerate(symbols)}
+        if ranks != self.symbols:
+            self.symbols = ranks
+            if self.rank_sort:
+                self.invalidate() # re-rank as well as re-filter
+            else:
+                self.invalidateFilter()
+
+    def lessThan(self, left, right):
+        if self.rank_sort and self.symbols is not None:
+            symbols = self.sourceModel().symbols
+            return self.symbols[symbols[left.row()]] < self.symbols[symbols[right.row()]]
+        return super().lessThan(left, right)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.symbols is not None and self.sourceModel().symbols[source_row] not in self.symbols:
+            return False
+        return super().filterAcceptsRow(source_row, source_parent)
+
+
+class MarketTableWidget(QTableView):
     item_selected = pyqtSignal(object)  # Emits Stock object
 
+    # Indicators shown as extra columns: (header, IndicatorEngine key, format)
+    INDICATOR_COLUMNS = [
+        ("RSI", "rsi", "{:.1f}"),
+        ("MACD", "macd", "{:.3f}"),
+        ("VWAP", "vwap", "{:.2f}"),
+    ]
+
     def __init__(self):
         super().__init__()
-        self.setColumnCount(8)
-        self.setHorizontalHeaderLabels([
-            "Symbol", "Price", "High", "Low", "Avg", "Change %", "Cap Lot", "Cap TL"
-        ])
+        self.market_model = MarketTableModel(self)
+        self.proxy_model = MarketFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.market_model)
+        self.setModel(self.proxy_model)
+
         self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
-        self.cellClicked.connect(self._on_row_click)
-        self.current_stocks = {} # symbol -> Stock
-
-    def update_data(self, stocks: list[Stock]):
-        self.setRowCount(len(stocks))
-        self.current_stocks = {s.symbol: s for s in stocks}
-        
-        for i, stock in enumerate(stocks):
-            self.setItem(i, 0, QTableWidgetItem(stock.symbol))
-            self.setItem(i, 1, QTableWidgetItem(f"{stock.price:.2f}"))
-            self.setItem(i, 2, QTableWidgetItem(f"{stock.highest:.2f}"))
-            self.setItem(i, 3, QTableWidgetItem(f"{stock.lowest:.2f}"))
-            self.setItem(i, 4, QTableWidgetItem(f"{stock.average:.2f}"))
-            
-            change_item = QTableWidgetItem(f"{stock.percent_change:.2f}%")
-            if stock.percent_change > 0:
-                change_item.setForeground(Qt.green)
-            elif stock.percent_change < 0:
-                change_item.setForeground(Qt.red)
-            else:
-                change_item.setForeground(Qt.lightGray)
-                
-            self.setItem(i, 5, change_item)
-            self.setItem(i, 6, QTableWidgetItem(f"{stock.capacity_lot:,.0f}"))
-            self.setItem(i, 7, QTableWidgetItem(f"{stock.capacity_tl:,.0f}"))
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
+        self.setSortingEnabled(True)
+        self.sortByColumn(-1, Qt.AscendingOrder) # Keep feed order until a header is clicked
+        self.horizontalHeader().sortIndicatorChanged.connect(self._on_sort_changed)
+        self.clicked.connect(self._on_row_click)
+
+    def update_data(self, stocks: Union[MarketSnapshot, list[Stock]]):
+        self.market_model.set_stocks(stocks)
+
+    def apply_delta(self, delta: MarketDelta):
+        self.market_model.apply_delta(delta)
+
+    def get_stock(self, symbol: str) -> Optional[Stock]:
+        return self.market_model.stock(symbol)
+
+    def update_indicators(self, symbols: list[str], values: dict):
+        """Show indicator arrays (aligned with `symbols`) in the INDICATOR_COLUMNS."""
+        model = self.market_model
+        for header, key, fmt in self.INDICATOR_COLUMNS:
+            if key not in values:
+                continue
+            if key not in model.column_of:
+                model.add_column(header, key, fmt)
+                self.horizontalHeader().setSectionResizeMode(model.column_of[key], QHeaderView.Stretch)
+            model.set_column_values(key, symbols, values[key])
+
+    def set_filter(self, text: str):
+        self.proxy_model.setFilterFixedString(text)
+
+    def set_symbol_filter(self, symbols: Optional[list[str]]):
+        """
+        Show only `symbols` (a watchlist or screen result) in their rank
+        order, until a header is clicked; None shows the whole market.
+        """
+        proxy = self.proxy_model
+        proxy.set_symbols(symbols)
+        if self.horizontalHeader().sortIndicatorSection() == -1:
+            rank_sort = symbols is not None
+            if rank_sort != proxy.rank_sort:
+                proxy.rank_sort = rank_sort
+                # Any column will do while rank_sort is set; -1 goes back to feed order
+                proxy.sort(0 if rank_sort else -1)
 
-    def _on_row_click(self, row, col):
-        symbol = self.item(row, 0).text()
-        if symbol in self.current_stocks:
-            self.item_selected.emit(self.current_stocks[symbol])
+    def _on_sort_changed(self, section, _order):
+        if self.proxy_model.rank_sort and section != -1:
+            # The view has already sorted this column by rank; sort it again by value
+            self.proxy_model.rank_sort = False
+            self.proxy_model.invalidate()
+
+    def _on_row_click(self, index):
+        row = self.proxy_model.mapToSource(index).row()
+        stock = self.market_model.stock(self.market_model.symbols[row])
+        if stock:
+            self.item_selected.emit(stock)
 
 class PortfolioWidget(QTableWidget):
     def __init__(self):
@@ -155,9 +534,160 @@ class PortfolioWidget(QTableWidget):
             val = price * item.quantity
             self.setItem(i, 3, QTableWidgetItem(f"{val:,.2f}"))
 
+class DiagnosticsWidget(QWidget):
+    """Live p50/p95/p99 timings of the PROFILER stages, refreshed while visible."""
+    COLUMNS = ["Stage", "Calls", "p50 ms", "p95 ms", "p99 ms", "Max ms"]
+    REFRESH_MS = 1000
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.chk_enabled = QCheckBox("Record timings")
+        self.chk_enabled.setChecked(PROFILER.enabled)
+        self.chk_enabled.toggled.connect(PROFILER.enable)
+        btn_reset = QPushButton("Reset")
+        btn_reset.clicked.connect(self._on_reset)
+        btn_dump = QPushButton("Dump...")
+        btn_dump.clicked.connect(self._on_dump)
+        controls.addWidget(self.chk_enabled)
+        controls.addStretch()
+        controls.addWidget(btn_reset)
+        controls.addWidget(btn_dump)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start(self.REFRESH_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        stats = PROFILER.stats()
+        self.table.setRowCount(len(stats))
+        for row, (name, stage) in enumerate(stats.items()):
+            cells = [name, str(stage.calls)] + [
+                f"{seconds * 1e3:.2f}" for seconds in (stage.p50, stage.p95, stage.p99, stage.max)]
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+
+    def _on_reset(self):
+        PROFILER.reset()
+        self.refresh()
+
+    def _on_dump(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Dump Timings", "timings.json", "JSON (*.json)")
+        if path:
+            PROFILER.dump(path)
+
+class WatchlistBar(QWidget):
+    """Picks the watchlist or screen the market table shows."""
+    selected = pyqtSignal(object)        # watchlist name, or None for the whole market
+    new_requested = pyqtSignal()
+    edit_requested = pyqtSignal(str)
+    delete_requested = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.combo = QComboBox()
+        self.combo.currentIndexChanged.connect(self._on_index_changed)
+        self.lbl_count = QLabel()
+        btn_new = QPushButton("New...")
+        btn_new.clicked.connect(self.new_requested)
+        self.btn_edit = QPushButton("Edit...")
+        self.btn_edit.clicked.connect(lambda: self.edit_requested.emit(self.current()))
+        self.btn_delete = QPushButton("Delete")
+        self.btn_delete.clicked.connect(lambda: self.delete_requested.emit(self.current()))
+        layout.addWidget(QLabel("Watchlist:"))
+        layout.addWidget(self.combo, stretch=1)
+        layout.addWidget(self.lbl_count)
+        layout.addWidget(btn_new)
+        layout.addWidget(self.btn_edit)
+        layout.addWidget(self.btn_delete)
+        self.set_names([])
+
+    def current(self) -> Optional[str]:
+        return self.combo.currentData()
+
+    def set_names(self, names: list[str], current: str = None):
+        """Refill the list, keeping `current` (default: the selected one) selected."""
+        current = self.current() if current is None else current
+        self.combo.blockSignals(True)
+        self.combo.clear()
+        self.combo.addItem("All stocks", None)
+        for name in names:
+            self.combo.addItem(name, name)
+        self.combo.setCurrentIndex(max(0, self.combo.findData(current)))
+        self.combo.blockSignals(False)
+        self._on_index_changed()
+
+    def set_count(self, count: Optional[int]):
+        self.lbl_count.setText("" if count is None else f"{count} stocks")
+
+    def _on_index_changed(self, _index=None):
+        name = self.current()
+        self.btn_edit.setEnabled(name is not None)
+        self.btn_delete.setEnabled(name is not None)
+        self.selected.emit(name)
+
+
+class WatchlistDialog(QDialog):
+    """Edits a Watchlist: fixed symbols and/or a screener filter, sort and row limit."""
+
+    def __init__(self, watchlist: Watchlist = None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Watchlist")
+        watchlist = watchlist or Watchlist("")
+        form = QFormLayout(self)
+        self.edit_name = QLineEdit(watchlist.name)
+        self.edit_name.setReadOnly(bool(watchlist.name)) # renaming is saving under a new name
+        self.edit_symbols = QLineEdit(", ".join(watchlist.symbols))
+        self.edit_symbols.setPlaceholderText("THYAO, GARAN, ... (empty: whole market)")
+        self.edit_expression = QLineEdit(watchlist.expression)
+        self.edit_expression.setPlaceholderText("percent_change > 3 and capacity_tl > 50M")
+        self.edit_sort = QLineEdit(watchlist.sort)
+        self.edit_sort.setPlaceholderText("capacity_tl desc")
+        self.spin_limit = QSpinBox()
+        self.spin_limit.setRange(0, 100000)
+        self.spin_limit.setSpecialValueText("No limit")
+        self.spin_limit.setValue(watchlist.limit or 0)
+        form.addRow("Name:", self.edit_name)
+        form.addRow("Symbols:", self.edit_symbols)
+        form.addRow("Filter:", self.edit_expression)
+        form.addRow("Sort by:", self.edit_sort)
+        form.addRow("Top rows:", self.spin_limit)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+
+    def watchlist(self) -> Watchlist:
+        symbols = [symbol.strip().upper() for symbol in self.edit_symbols.text().split(",") if symbol.strip()]
+        return Watchlist(self.edit_name.text().strip(), symbols, self.edit_expression.text().strip(),
+                         self.edit_sort.text().strip(), self.spin_limit.value() or None)
+
+
 class TransactionWidget(QGroupBox):
     buy_requested = pyqtSignal(str, int) # symbol, quantity
     sell_requested = pyqtSignal(str, int)
+    order_requested = pyqtSignal(str, str, str, int, float) # symbol, side, kind, quantity, price
+
+    ORDER_TYPES = (("Market", None), ("Limit", "limit"), ("Stop", "stop"), ("Take Profit", "take_profit"))
 
     def __init__(self):
         super().__init__("Trade Operations")
@@ -177,6 +707,18 @@ class TransactionWidget(QGroupBox):
         self.spin_qty.setRange(1, 1000000)
         self.spin_qty.setValue(1)
         form.addRow("Quantity:", self.spin_qty)
+
+        self.combo_type = QComboBox()
+        for label, kind in self.ORDER_TYPES:
+            self.combo_type.addItem(label, kind)
+        self.combo_type.currentIndexChanged.connect(self._on_type_changed)
+        form.addRow("Order Type:", self.combo_type)
+
+        self.spin_price = QDoubleSpinBox()
+        self.spin_price.setRange(0.01, 1000000)
+        self.spin_price.setDecimals(2)
+        self.spin_price.setEnabled(False)
+        form.addRow("Trigger Price:", self.spin_price)
         layout.addLayout(form)
         
         btn_layout = QHBoxLayout()
@@ -199,16 +741,51 @@ class TransactionWidget(QGroupBox):
         self.current_symbol = stock.symbol
         self.lbl_selected.setText(f"Selected: {stock.symbol}")
         self.lbl_price.setText(f"Price: {stock.price:.2f}")
+        self.spin_price.setValue(stock.price)
         self.btn_buy.setEnabled(True)
         self.btn_sell.setEnabled(True)
 
+    def _on_type_changed(self, _index):
+        self.spin_price.setEnabled(self.combo_type.currentData() is not None)
+
     def _on_buy(self):
-        if self.current_symbol:
-            self.buy_requested.emit(self.current_symbol, self.spin_qty.value())
+        self._request("buy", self.buy_requested)
 
     def _on_sell(self):
-        if self.current_symbol:
-            self.sell_requested.emit(self.current_symbol, self.spin_qty.value())
+        self._request("sell", self.sell_requested)
+
+    def _request(self, side, market_signal):
+        if not self.current_symbol:
+            return
+        kind = self.combo_type.currentData()
+        if kind is None:
+            market_signal.emit(self.current_symbol, self.spin_qty.value())
+        else:
+            self.order_requested.emit(self.current_symbol, side, kind, self.spin_qty.value(), self.spin_price.value())
+
+class OpenOrdersWidget(QTableWidget):
+    cancel_requested = pyqtSignal(int) # order id
+
+    def __init__(self):
+        super().__init__()
+        self.setColumnCount(7)
+        self.setHorizontalHeaderLabels(["#", "Symbol", "Side", "Type", "Quantity", "Price", ""])
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setEditTriggers(QTableWidget.NoEditTriggers)
+
+    def update_data(self, orders: list[Order]):
+        self.setRowCount(len(orders))
+        for i, order in enumerate(orders):
+            self.setItem(i, 0, QTableWidgetItem(str(order.id)))
+            self.setItem(i, 1, QTableWidgetItem(order.symbol))
+            self.setItem(i, 2, QTableWidgetItem(order.side.title()))
+            self.setItem(i, 3, QTableWidgetItem(order.kind.replace('_', ' ').title()))
+            self.setItem(i, 4, QTableWidgetItem(str(order.quantity)))
+            self.setItem(i, 5, QTableWidgetItem(f"{order.price:.2f}"))
+            btn_cancel = QPushButton("Cancel")
+            btn_cancel.clicked.connect(lambda _checked, order_id=order.id: self.cancel_requested.emit(order_id))
+            self.setCellWidget(i, 6, btn_cancel)
 
 class MainWindow(QMainWindow):
     def __init__(self, controller):
@@ -244,11 +821,19 @@ class MainWindow(QMainWindow):
         trade_layout = QHBoxLayout(trade_tab)
         
         left_trade = QVBoxLayout()
+        self.market_filter = QLineEdit()
+        self.market_filter.setPlaceholderText("Filter symbols...")
+        self.watchlist_bar = WatchlistBar()
         self.market_table = MarketTableWidget()
         self.portfolio_table = PortfolioWidget()
+        self.orders_table = OpenOrdersWidget()
+        left_trade.addWidget(self.watchlist_bar, stretch=0)
+        left_trade.addWidget(self.market_filter, stretch=0)
         left_trade.addWidget(self.market_table, stretch=2)
         left_trade.addWidget(QLabel("Current Holdings"), stretch=0)
         left_trade.addWidget(self.portfolio_table, stretch=1)
+        left_trade.addWidget(QLabel("Open Orders"), stretch=0)
+        left_trade.addWidget(self.orders_table, stretch=1)
         
         trade_layout.addLayout(left_trade, stretch=3)
         
@@ -262,8 +847,8 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(trade_tab, "Trade & Market")
         
         # Tab 2: Analytics
-        analytics_tab = QWidget()
-        analytics_layout = QHBoxLayout(analytics_tab)
+        self.analytics_tab = QWidget()
+        analytics_layout = QHBoxLayout(self.analytics_tab)
         
         self.donut_chart = PortfolioDonutChart()
         self.line_chart = EquityLineChart()
@@ -271,17 +856,33 @@ class MainWindow(QMainWindow):
         analytics_layout.addWidget(self.donut_chart)
         analytics_layout.addWidget(self.line_chart)
         
-        self.tabs.addTab(analytics_tab, "Analytics")
-        
+        self.tabs.addTab(self.analytics_tab, "Analytics")
+
+        # Tab 3: Diagnostics, hidden until toggled with Ctrl+Shift+D
+        self.diagnostics_tab = DiagnosticsWidget()
+        QShortcut(QtGui.QKeySequence("Ctrl+Shift+D"), self, activated=self.toggle_diagnostics)
+
         main_layout.addWidget(self.tabs)
 
         # Connections
+        self.market_filter.textChanged.connect(self.market_table.set_filter)
+        self.watchlist_bar.selected.connect(self.on_watchlist_selected)
+        self.watchlist_bar.new_requested.connect(lambda: self.edit_watchlist(None))
+        self.watchlist_bar.edit_requested.connect(self.edit_watchlist)
+        self.watchlist_bar.delete_requested.connect(self.delete_watchlist)
         self.market_table.item_selected.connect(self.transaction_widget.set_selected_stock)
         self.transaction_widget.buy_requested.connect(self.handle_buy)
         self.transaction_widget.sell_requested.connect(self.handle_sell)
+        self.transaction_widget.order_requested.connect(self.handle_order)
+        self.orders_table.cancel_requested.connect(self.handle_cancel)
+        self.tabs.currentChanged.connect(lambda _index: self.refresh_charts())
         
         # Data Cache
-        self.latest_prices = {}
+        self.portfolio_cache = []
+        self.held_symbols = set()
+        self.portfolio_version = None # controller.version behind portfolio_cache
+        self.history_pending = False  # a history read is queued on the persistence worker
+        self.screens = {}             # watchlist name -> symbols, from the latest tick
         
         # Refresh Timer for Analytics (Don't update too often)
         self.timer = QTimer()
@@ -289,49 +890,153 @@ class MainWindow(QMainWindow):
         self.timer.start(5000) # Every 5s
         
         # Initial Refresh
+        self.watchlist_bar.set_names(sorted(self.controller.watchlists))
         self.refresh_player_stats()
         self.refresh_charts()
 
-    def update_market(self, stocks: list[Stock]):
+    @property
+    def latest_prices(self) -> dict[str, float]:
+        """The controller's price cache, which every tick updates."""
+        return self.controller.price_cache
+
+    @PROFILER.timed("view.update_market")
+    def update_market(self, stocks: Union[MarketSnapshot, list[Stock]]):
         self.market_cache = stocks
-        self.latest_prices = {s.symbol: s.price for s in stocks}
-        self.market_table.update_data(stocks)
+        with PROFILER.stage("view.market_table"):
+            self.market_table.update_data(stocks)
         
         # Update Controller cache for valuation
-        self.controller.update_market_cache(stocks)
+        self.report_orders(self.controller.update_market_cache(stocks))
         
         # Update Portfolio Table live values
-        # We need to get portfolio again to update estimated values based on new prices
-        portfolio = self.controller.get_portfolio()
-        self.portfolio_table.update_data(portfolio, self.latest_prices)
+        self.sync_portfolio()
+        self.portfolio_table.update_data(self.portfolio_cache, self.latest_prices)
+
+    @PROFILER.timed("view.apply_market_delta")
+    def apply_market_delta(self, delta: MarketDelta):
+        """Apply a tick diff in place; work is proportional to the symbols that moved."""
+        with PROFILER.stage("view.market_table"):
+            self.market_table.apply_delta(delta)
+        self.report_orders(self.controller.apply_market_delta(delta))
+
+        # Only re-value the holdings table when they changed or one of them moved
+        held = self.held_symbols
+        if self.sync_portfolio() or any(symbol in held for symbol in delta.touched_symbols()):
+            self.portfolio_table.update_data(self.portfolio_cache, self.latest_prices)
+
+    def update_screens(self, screens: dict):
+        """Slot for MarketScraperWorker.screens_updated: {watchlist name: symbols}."""
+        self.screens = screens
+        name = self.watchlist_bar.current()
+        if name is not None and name in screens:
+            self.market_table.set_symbol_filter(screens[name])
+            self.watchlist_bar.set_count(len(screens[name]))
 
+    def on_watchlist_selected(self, name):
+        if name is None:
+            symbols = None
+        else:
+            # Until the next tick screens it, a new screen shows its fixed symbols (if any)
+            watchlist = self.controller.watchlists.get(name)
+            symbols = self.screens.get(name, watchlist.symbols if watchlist else [])
+        self.market_table.set_symbol_filter(symbols)
+        self.watchlist_bar.set_count(None if symbols is None else len(symbols))
+
+    def edit_watchlist(self, name):
+        dialog = WatchlistDialog(self.controller.watchlists.get(name), self)
+        while dialog.exec_() == QDialog.Accepted:
+            watchlist = dialog.watchlist()
+            if name is None and watchlist.name in self.controller.watchlists:
+                QMessageBox.warning(self, "Invalid Watchlist", f"Watchlist {watchlist.name} already exists.")
+                continue
+            success, msg = self.controller.save_watchlist(watchlist)
+            if success:
+                self.screens.pop(watchlist.name, None)
+                self.watchlist_bar.set_names(sorted(self.controller.watchlists), watchlist.name)
+                return
+            QMessageBox.warning(self, "Invalid Watchlist", msg)
+
+    def delete_watchlist(self, name):
+        answer = QMessageBox.question(self, "Delete Watchlist", f"Delete watchlist {name}?")
+        if answer == QMessageBox.Yes and self.controller.delete_watchlist(name):
+            self.watchlist_bar.set_names(sorted(self.controller.watchlists))
+
+    def update_indicators(self, payload):
+        """Slot for MarketScraperWorker.indicators_updated: (symbols, {name: array})."""
+        symbols, values = payload
+        self.market_table.update_indicators(symbols, values)
+
+    def sync_portfolio(self) -> bool:
+        """Refresh portfolio_cache if the controller's ledger changed; returns whether it did."""
+        if self.portfolio_version == self.controller.version:
+            return False
+        self.portfolio_cache = self.controller.get_portfolio()
+        self.held_symbols = {item.symbol for item in self.portfolio_cache}
+        self.portfolio_version = self.controller.version
+        return True
+
+    @PROFILER.timed("view.refresh_player_stats")
     def refresh_player_stats(self):
-        player = self.controller.get_player()
-        portfolio = self.controller.get_portfolio()
-        
-        # Calculate Total Net Worth
-        portfolio_val = sum(
-            item.quantity * self.latest_prices.get(item.symbol, item.average_cost) 
-            for item in portfolio
-        )
-        net_worth = player.money + portfolio_val
+        self.sync_portfolio()
+        valuation = self.controller.get_valuation()
         
-        self.lbl_net_worth.setText(f"Net Worth: {net_worth:,.2f} ₺")
-        self.lbl_cash.setText(f"Cash: {player.money:,.2f} ₺")
+        self.lbl_net_worth.setText(f"Net Worth: {valuation.net_worth:,.2f} ₺")
+        self.lbl_cash.setText(f"Cash: {valuation.cash:,.2f} ₺")
         
-        self.portfolio_table.update_data(portfolio, self.latest_prices)
+        self.portfolio_table.update_data(self.portfolio_cache, self.latest_prices)
+        self.orders_table.update_data(self.controller.get_open_orders())
 
+    @PROFILER.timed("view.refresh_charts")
     def refresh_charts(self):
-        # Refresh Data
-        player = self.controller.get_player()
-        portfolio = self.controller.get_portfolio()
-        history = self.controller.get_portfolio_history()
-        
-        self.donut_chart.update_chart(player.money, portfolio, self.latest_prices)
-        self.line_chart.update_chart(history)
+        # Charts catch up when the Analytics tab is shown
+        if not self.analytics_tab.isVisible():
+            return
+
+        # Each chart redraws only if its input changed since the last draw
+        with PROFILER.stage("view.donut_chart"):
+            self.donut_chart.update_chart(self.controller.get_valuation())
+
+        # History is read on the persistence thread; one request in flight at a time
+        history_version = self.controller.history.version
+        if history_version != self.line_chart.version and not self.history_pending:
+            self.history_pending = True
+            if self.line_chart.incremental and self.line_chart.last_id is None:
+                # Start from a bounded raw-or-rollup view, not every raw sample
+                self.controller.fetch_portfolio_history_seed(
+                    self.line_chart.MAX_POINTS,
+                    lambda points: self.on_history_points(points, history_version))
+            elif self.line_chart.incremental:
+                self.controller.fetch_portfolio_history_since(
+                    self.line_chart.last_id,
+                    lambda points: self.on_history_points(points, history_version))
+            else:
+                self.controller.fetch_portfolio_history(
+                    lambda history: self.on_history(history, history_version),
+                    max_points=self.line_chart.MAX_POINTS)
+
+    @PROFILER.timed("view.equity_chart")
+    def on_history_points(self, points, version):
+        self.history_pending = False
+        if points is not None:
+            self.line_chart.append_points(*points, version=version)
+
+    @PROFILER.timed("view.equity_chart")
+    def on_history(self, history, version):
+        self.history_pending = False
+        if history is not None:
+            self.line_chart.update_chart(history, version)
+
+    def toggle_diagnostics(self):
+        index = self.tabs.indexOf(self.diagnostics_tab)
+        if index == -1:
+            PROFILER.enable()
+            self.diagnostics_tab.chk_enabled.setChecked(True)
+            self.tabs.setCurrentIndex(self.tabs.addTab(self.diagnostics_tab, "Diagnostics"))
+        else:
+            self.tabs.removeTab(index)
 
     def handle_buy(self, symbol, qty):
-        stock = self.market_table.current_stocks.get(symbol)
+        stock = self.market_table.get_stock(symbol)
         if not stock:
             QMessageBox.critical(self, "Error", "Market data out of sync.")
             return
@@ -344,8 +1049,32 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "Failed", msg)
 
+    def handle_order(self, symbol, side, kind, qty, price):
+        success, msg = self.controller.place_order(symbol, side, kind, qty, price)
+        if success:
+            self.statusBar().showMessage(msg)
+            self.refresh_player_stats()
+        else:
+            QMessageBox.warning(self, "Failed", msg)
+
+    def handle_cancel(self, order_id):
+        if self.controller.cancel_order(order_id):
+            self.statusBar().showMessage(f"Order #{order_id} cancelled.")
+        else:
+            QMessageBox.warning(self, "Failed", f"Order #{order_id} is no longer open.")
+        self.refresh_player_stats()
+
+    def report_orders(self, orders: list[Order]):
+        """Show orders a price update executed (or had to reject) in the status bar."""
+        if orders:
+            self.statusBar().showMessage("  ".join(
+                f"{order.side.title()} {order.kind.replace('_', ' ')} #{order.id} {order.symbol} x{order.quantity}: {order.status}"
+                for order in orders
+            ))
+            self.refresh_player_stats()
+
     def handle_sell(self, symbol, qty):
-        stock = self.market_table.current_stocks.get(symbol)
+        stock = self.market_table.get_stock(symbol)
         if not stock:
             QMessageBox.critical(self, "Error", "Market data out of sync.")
             return
@@ -0,0 +1,5 @@
+"""
+Benchmarks for Stock Market Simulator hot paths.
+
+Run from the repository root, e.g. ``python -m bench.bench_parser``.
+"""
@@ -0,0 +1,86 @@
+"""
+Main-thread time per Analytics refresh: rebuild-and-draw vs artist updates.
+
+Compares the previous chart code (axes.clear(), re-plot and a blocking
+canvas.draw() on every refresh) with the current charts for refreshes
+where nothing changed and where prices moved. Times include the
+deferred draw_idle() paint, processed by the event loop.
+
+Usage: python -m bench.bench_charts [--positions N] [--history N] [--refreshes N]
+"""
+import argparse
+import datetime
+import os
+import statistics
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import matplotlib
+from PyQt5.QtWidgets import QApplication
+
+from app.history import format_timestamp
+from app.views import EquityLineChart, PortfolioDonutChart
+from bench.generators import valuations
+
+
+def legacy_donut(chart, valuation):
+    chart.axes.clear()
+    labels = ['Cash'] + [p.symbol for p in valuation.positions]
+    values = [valuation.cash] + [p.market_value for p in valuation.positions]
+    colors = ['#a6e3a1'] + ['#89b4fa' if i % 2 else '#fab387' for i in range(len(valuation.positions))]
+    chart.axes.pie(values, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors,
+                   textprops=dict(color="w"))
+    chart.axes.add_artist(matplotlib.patches.Circle((0, 0), 0.70, fc='#1e1e2e'))
+    chart.axes.set_title("Portfolio Allocation", color='#cdd6f4', fontsize=12, fontweight='bold')
+    chart.fig.canvas.draw()
+
+
+def legacy_line(chart, history):
+    chart.axes.clear()
+    chart.axes.set_title("Net Worth History", color='#cdd6f4', fontsize=12, fontweight='bold')
+    chart.axes.grid(True, color='#313244', linestyle='--')
+    times = [datetime.datetime.strptime(row['timestamp'], "%Y-%m-%d %H:%M:%S") for row in history]
+    values = [row['total_value'] for row in history]
+    chart.axes.plot(times, values, color='#89b4fa', linewidth=2, marker='o', markersize=4)
+    chart.fig.canvas.draw()
+
+
+def measure(app, refresh, inputs):
+    timings = []
+    for item in inputs:
+        start = time.perf_counter()
+        refresh(item)
+        app.processEvents()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--positions", type=int, default=8)
+    parser.add_argument("--history", type=int, default=500)
+    parser.add_argument("--refreshes", type=int, default=30)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    history = [{"timestamp": format_timestamp(1.7e9 + 60 * i), "total_value": 1000 + i % 37}
+               for i in range(args.history)]
+
+    print(f"{args.positions} positions, {args.history} history points; median ms per refresh")
+    for moving in (False, True):
+        donut_old, donut_new = PortfolioDonutChart(), PortfolioDonutChart()
+        line_old, line_new = EquityLineChart(), EquityLineChart()
+        for chart in (donut_old, donut_new, line_old, line_new):
+            chart.show()
+        histories = [(history, version if moving else 0) for version in range(args.refreshes)]
+        old = (measure(app, lambda v: legacy_donut(donut_old, v), valuations(args.positions, args.refreshes, moving))
+               + measure(app, lambda h: legacy_line(line_old, h[0]), histories))
+        new = (measure(app, donut_new.update_chart, valuations(args.positions, args.refreshes, moving))
+               + measure(app, lambda h: line_new.update_chart(*h), histories))
+        label = "data changed" if moving else "unchanged"
+        print(f"  {label:<13} rebuild {old * 1000:8.2f} ms   update {new * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
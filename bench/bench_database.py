@@ -0,0 +1,63 @@
+"""
+Controller read/write paths with per-call vs pooled SQLite connections.
+
+Usage: python -m bench.bench_database [--calls N]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.models import Stock
+
+
+def measure(func, calls):
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def run(pooled, calls, workdir):
+    db = DatabaseManager(os.path.join(workdir, f"bench_{'pooled' if pooled else 'percall'}.db"), pooled=pooled)
+    db.init_db()
+    with db.get_connection() as conn:
+        conn.execute("UPDATE player SET money = 1e12 WHERE id = 1")
+        conn.commit()
+    controller = GameController(db)
+    stocks = [Stock(f"S{i:03d}", 10.0 + i, 0, 0, 0, 0, 0, 0) for i in range(20)]
+    for stock in stocks:
+        controller.buy_stock(stock, 1)
+
+    results = {
+        "get_player": measure(controller.get_player, calls),
+        "get_portfolio": measure(controller.get_portfolio, calls),
+        "buy_stock": measure(lambda: controller.buy_stock(stocks[0], 1), calls),
+    }
+    db.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        per_call = run(False, args.calls, workdir)
+        pooled = run(True, args.calls, workdir)
+
+    print(f"Median per call over {args.calls} calls")
+    print(f"  {'':<14} {'per-call':>10} {'pooled':>10}")
+    for name in per_call:
+        print(f"  {name:<14} {per_call[name] * 1e6:8.0f}us {pooled[name] * 1e6:8.0f}us"
+              f"   {per_call[name] / pooled[name]:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
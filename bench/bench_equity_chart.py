@@ -0,0 +1,90 @@
+"""
+Equity chart with long histories: full re-plot vs cached, decimated, blitted.
+
+The incremental chart reads from a temporary database the way the GUI
+does: a bounded raw-or-rollup seed first, then only newer raw rows.
+
+Usage: python -m bench.bench_equity_chart [--points N] [--appends N]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+
+from app.database import DatabaseManager
+from app.history import HistoryRecorder, format_timestamp
+from app.views import EquityLineChart
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=300_000)
+    parser.add_argument("--appends", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    rng = np.random.default_rng(2)
+    total = args.points + args.appends
+    epoch = np.arange(total) * 10 + 1_700_000_000
+    values = 1000 * np.exp(np.cumsum(rng.normal(0, 0.0005, total)))
+    print(f"{args.points:,} history points, then {args.appends} live appends")
+
+    # Previous behaviour: every refresh parses and re-plots the whole history
+    legacy = EquityLineChart(incremental=False)
+    legacy.resize(600, 450)
+    legacy.show()
+    rows = [{"timestamp": format_timestamp(t), "total_value": v} for t, v in zip(epoch, values)]
+    timings = []
+    for i in range(3):
+        start = time.perf_counter()
+        legacy.update_chart(rows[:args.points + i], version=i)
+        app.processEvents()
+        timings.append(time.perf_counter() - start)
+    print(f"  full re-plot        {statistics.median(timings) * 1000:9.1f} ms per refresh")
+
+    # Incremental chart over the real database path: the first refresh reads
+    # a bounded seed, later ones only the new raw rows
+    with tempfile.TemporaryDirectory() as workdir:
+        db = DatabaseManager(os.path.join(workdir, "bench_equity_chart.db"), pooled=True)
+        db.init_db()
+        recorder = HistoryRecorder(db, batch_size=total, flush_interval=float("inf"))
+        with db.get_connection() as conn:
+            recorder.write(conn, [(1, ts, value) for ts, value in zip(epoch[:args.points].tolist(),
+                                                                      values[:args.points].tolist())])
+            conn.commit()
+
+        for name, load in (("load all raw rows", lambda chart: recorder.points_since(1, 0)),
+                           ("seeded load", lambda chart: recorder.seed_points(1, chart.MAX_POINTS))):
+            chart = EquityLineChart()
+            chart.resize(600, 450)
+            chart.show()
+            app.processEvents()
+            start = time.perf_counter()
+            chart.append_points(*load(chart), version=0)
+            app.processEvents()
+            print(f"  {name:<19} {(time.perf_counter() - start) * 1000:9.1f} ms "
+                  f"({len(chart.line.get_xdata()):,} points drawn)")
+
+        timings = []
+        redraws = 0
+        for i in range(args.points, total):
+            start = time.perf_counter()
+            tail_before = chart._tail_start
+            recorder.record(1, values[i], epoch[i])
+            recorder.flush()
+            chart.append_points(*recorder.points_since(1, chart.last_id), version=i)
+            app.processEvents()
+            redraws += chart._tail_start != tail_before
+            timings.append(time.perf_counter() - start)
+        print(f"  live append         {statistics.median(timings) * 1000:9.2f} ms median, "
+              f"{max(timings) * 1000:.1f} ms max ({redraws} full redraws)")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Scraper HTTP traffic against a local stand-in for the BigPara page.
+
+Serves the generated fixture page (gzip-encoded, with ETag/Last-Modified) and
+changes it every few requests, then reports the provider's FetchStats.
+
+Usage: python -m bench.bench_fetch [--ticks N] [--change-every N] [--no-conditional]
+"""
+import argparse
+import os
+import time
+
+from app.providers import BigParaProvider
+from app.standin import StandInServer
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "bigpara_canli_borsa.html")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--change-every", type=int, default=5)
+    parser.add_argument("--no-conditional", action="store_true",
+                        help="server ignores validators (exercises the body-hash skip)")
+    args = parser.parse_args()
+
+    with open(FIXTURE, "rb") as f:
+        body = f.read()
+    server = StandInServer(body, conditional=not args.no_conditional).start()
+    provider = BigParaProvider(url=server.url)
+    start = time.perf_counter()
+    for tick in range(args.ticks):
+        if tick and tick % args.change_every == 0:
+            server.page.set(body + f"<!-- tick {tick} -->".encode())
+        provider.fetch()
+    elapsed = time.perf_counter() - start
+    server.stop()
+    provider.close()
+
+    stats = provider.stats
+    print(f"Ticks: {args.ticks} in {elapsed:.2f}s")
+    print(f"  requests          {stats.requests}")
+    print(f"  304 ratio         {stats.not_modified_ratio:.0%}")
+    print(f"  unchanged bodies  {stats.unchanged}")
+    print(f"  parses / skipped  {stats.parses} / {stats.skipped_parses}")
+    print(f"  bytes on wire     {stats.bytes_transferred / 1024:.0f} KiB "
+          f"(decoded {stats.bytes_decoded / 1024:.0f} KiB, "
+          f"full downloads would be {args.ticks * len(body) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Equity history: batched recording and bounded chart queries over a year.
+
+Usage: python -m bench.bench_history [--days N] [--interval SECONDS] [--max-points N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.database import DatabaseManager
+from app.history import HistoryRecorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between samples")
+    parser.add_argument("--max-points", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db = DatabaseManager(os.path.join(workdir, "bench_history.db"), pooled=True)
+        db.init_db()
+        recorder = HistoryRecorder(db, interval=args.interval, batch_size=1000, flush_interval=float("inf"))
+
+        rng = random.Random(1)
+        end = time.time()
+        ts = end - args.days * 86400
+        value = 1000.0
+        samples = 0
+        start = time.perf_counter()
+        while ts < end:
+            value *= 1 + rng.gauss(0, 0.0005)
+            recorder.sample(1, value, ts)
+            ts += args.interval
+            samples += 1
+        recorder.flush()
+        elapsed = time.perf_counter() - start
+        print(f"Recorded {samples:,} samples in {elapsed:.2f}s "
+              f"({elapsed / samples * 1e6:.1f}us per sample, batches of {recorder.batch_size})")
+
+        windows = {
+            "last hour": end - 3600,
+            "last day": end - 86400,
+            "last week": end - 7 * 86400,
+            "last month": end - 30 * 86400,
+            "full history": None,
+        }
+        for name, window_start in windows.items():
+            start = time.perf_counter()
+            rows = recorder.query(1, start=window_start, max_points=args.max_points)
+            elapsed = time.perf_counter() - start
+            resolution = "raw" if "open" not in rows[0].keys() else "rollup"
+            print(f"  {name:<13} {len(rows):5d} rows ({resolution:<6}) in {elapsed * 1000:7.2f} ms")
+
+        start = time.perf_counter()
+        rows = recorder.query(1, resolution=0)
+        print(f"  unbounded raw {len(rows):,} rows in {(time.perf_counter() - start) * 1000:.0f} ms")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Indicator engine: incremental per-tick update vs recomputing the window.
+
+Synthetic random-walk prices for a whole market over several trading
+days of 3-second ticks.
+
+Usage: python -m bench.bench_indicators [--symbols N] [--days N] [--window N]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.indicators import IndicatorEngine
+
+TICKS_PER_DAY = 8 * 3600 // 3 # 8 hour session, one tick every 3 seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--window", type=int, default=TICKS_PER_DAY // 8,
+                        help="ticks of history replayed by the recompute baseline")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    ticks = args.days * TICKS_PER_DAY
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, (ticks, args.symbols)), axis=0))
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+
+    engine = IndicatorEngine()
+    columns = engine.register(symbols)
+    start = time.perf_counter()
+    for row in prices:
+        engine.update_prices(columns, row)
+    engine.values()
+    elapsed = time.perf_counter() - start
+    per_tick = elapsed / ticks
+    print(f"{args.days} days x {TICKS_PER_DAY} ticks x {args.symbols} symbols")
+    print(f"  incremental  {per_tick * 1e6:9.1f} us per tick ({elapsed:.2f}s total)")
+
+    # Baseline: rebuild every indicator from the trailing window on each tick
+    samples = 20
+    start = time.perf_counter()
+    for end in range(ticks - samples, ticks):
+        fresh = IndicatorEngine()
+        fresh_columns = fresh.register(symbols)
+        for row in prices[end - args.window:end]:
+            fresh.update_prices(fresh_columns, row)
+        fresh.values()
+    recompute = (time.perf_counter() - start) / samples
+    print(f"  recompute    {recompute * 1e6:9.1f} us per tick ({args.window}-tick window)")
+    print(f"  speedup      {recompute / per_tick:9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
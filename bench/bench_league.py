@@ -0,0 +1,101 @@
+"""
+League valuation per tick: one pass over all accounts vs one player at a time.
+
+Hundreds of accounts hold random positions in a shared synthetic market.
+Every tick each account's net worth is computed and written to history.
+The per-player baseline values accounts one by one and writes each
+snapshot in its own transaction, like snapshot_portfolio_value() did.
+The league path uses GameController.value_accounts() and one batched
+history insert.
+
+Usage: python -m bench.bench_league [--players N] [--positions N] [--ticks N]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.history import HistoryRecorder
+
+
+def setup(args, workdir, name):
+    rng = random.Random(9)
+    db = DatabaseManager(os.path.join(workdir, f"bench_{name}.db"), pooled=True)
+    db.init_db()
+    player_ids = [1] + db.create_players(args.players - 1, 1e6)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO portfolio (player_id, symbol, quantity, average_cost) VALUES (?, ?, ?, ?)",
+            [(player_id, symbol, rng.randint(1, 1000), rng.uniform(10, 100))
+             for player_id in player_ids for symbol in rng.sample(symbols, args.positions)]
+        )
+        conn.commit()
+    controller = GameController(db)
+    prices = {symbol: rng.uniform(10, 100) for symbol in symbols}
+    return db, controller, prices, rng
+
+
+def walk(prices, rng):
+    for symbol in prices:
+        prices[symbol] *= rng.uniform(0.995, 1.005)
+
+
+def run_per_player(args, workdir):
+    db, controller, prices, rng = setup(args, workdir, "per_player")
+    history = HistoryRecorder(db)
+    portfolios = [(player.id, controller.accounts.positions_of(player.id), player.money)
+                  for player in controller.get_players()]
+    timings = []
+    for _ in range(args.ticks):
+        walk(prices, rng)
+        start = time.perf_counter()
+        for player_id, positions, cash in portfolios:
+            value = cash + sum(item.quantity * prices.get(item.symbol, item.average_cost)
+                               for item in positions.values())
+            history.record(player_id, value)
+            history.flush()
+        timings.append(time.perf_counter() - start)
+    db.close()
+    return timings
+
+
+def run_league(args, workdir):
+    db, controller, prices, rng = setup(args, workdir, "league")
+    controller.update_market_cache([])
+    timings = []
+    for _ in range(args.ticks):
+        walk(prices, rng)
+        # Feed prices directly; update_market_cache() would sample history itself
+        controller.valuation.prices = prices
+        start = time.perf_counter()
+        controller.snapshot_portfolio_value()
+        timings.append(time.perf_counter() - start)
+    db.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--positions", type=int, default=20, help="positions per player")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        per_player = run_per_player(args, workdir)
+        league = run_league(args, workdir)
+
+    print(f"{args.players} players x {args.positions} positions, {args.ticks} ticks (value + write history)")
+    print(f"  per player  median {statistics.median(per_player) * 1e3:8.2f}ms per tick")
+    print(f"  league      median {statistics.median(league) * 1e3:8.2f}ms per tick")
+    print(f"  speedup     {statistics.median(per_player) / statistics.median(league):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+UI update latency of the market table for synthetic 500-symbol ticks.
+
+Compares the previous QTableWidget implementation (new items for every
+cell on every tick) with the model/view MarketTableWidget, fed either
+full snapshots or MarketDelta diffs. Each measurement includes the
+repaint triggered by the update.
+
+Usage: python -m bench.bench_market_table [--symbols N] [--ticks N] [--moving F]
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication, QHeaderView, QTableWidget, QTableWidgetItem
+
+from app.models import MarketDelta
+from app.views import MarketTableWidget
+from bench.generators import synthetic_ticks
+
+
+class LegacyMarketTable(QTableWidget):
+    """The QTableWidget market table this benchmark is measured against."""
+
+    def __init__(self):
+        super().__init__()
+        self.setColumnCount(8)
+        self.setHorizontalHeaderLabels([
+            "Symbol", "Price", "High", "Low", "Avg", "Change %", "Cap Lot", "Cap TL"
+        ])
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+
+    def update_data(self, stocks):
+        self.setRowCount(len(stocks))
+        self.current_stocks = {s.symbol: s for s in stocks}
+        for i, stock in enumerate(stocks):
+            self.setItem(i, 0, QTableWidgetItem(stock.symbol))
+            self.setItem(i, 1, QTableWidgetItem(f"{stock.price:.2f}"))
+            self.setItem(i, 2, QTableWidgetItem(f"{stock.highest:.2f}"))
+            self.setItem(i, 3, QTableWidgetItem(f"{stock.lowest:.2f}"))
+            self.setItem(i, 4, QTableWidgetItem(f"{stock.average:.2f}"))
+            change_item = QTableWidgetItem(f"{stock.percent_change:.2f}%")
+            if stock.percent_change > 0:
+                change_item.setForeground(Qt.green)
+            elif stock.percent_change < 0:
+                change_item.setForeground(Qt.red)
+            else:
+                change_item.setForeground(Qt.lightGray)
+            self.setItem(i, 5, change_item)
+            self.setItem(i, 6, QTableWidgetItem(f"{stock.capacity_lot:,.0f}"))
+            self.setItem(i, 7, QTableWidgetItem(f"{stock.capacity_tl:,.0f}"))
+
+
+def run(app, table, update, snapshots):
+    table.resize(1000, 700)
+    table.show()
+    update(snapshots[0])
+    app.processEvents()
+    timings = []
+    for snapshot in snapshots[1:]:
+        start = time.perf_counter()
+        update(snapshot)
+        app.processEvents()
+        timings.append(time.perf_counter() - start)
+    table.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--moving", type=float, default=0.1, help="fraction of symbols changing per tick")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    snapshots = list(synthetic_ticks(args.symbols, args.ticks, args.moving))
+    deltas = [MarketDelta.between({}, {s.symbol: s for s in snapshots[0]})]
+    for prev, cur in zip(snapshots, snapshots[1:]):
+        deltas.append(MarketDelta.between({s.symbol: s for s in prev}, {s.symbol: s for s in cur}))
+
+    legacy = LegacyMarketTable()
+    model_view = MarketTableWidget()
+    model_view_delta = MarketTableWidget()
+    delta_iter = iter(deltas)
+    results = {
+        "QTableWidget, full rebuild": run(app, legacy, legacy.update_data, snapshots),
+        "model/view, full snapshot": run(app, model_view, model_view.update_data, snapshots),
+        "model/view, delta": run(app, model_view_delta,
+                                 lambda _snapshot: model_view_delta.apply_delta(next(delta_iter)), snapshots),
+    }
+
+    print(f"{args.symbols} symbols, {args.ticks} ticks, {args.moving:.0%} moving per tick")
+    baseline = statistics.median(results["QTableWidget, full rebuild"])
+    for name, timings in results.items():
+        median = statistics.median(timings)
+        print(f"  {name:<28} median {median * 1000:8.2f} ms   p95 {sorted(timings)[int(len(timings) * 0.95)] * 1000:8.2f} ms"
+              f"   {baseline / median:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Multi-page tick latency: pages fetched one after another vs concurrently.
+
+Several local stand-in pages, each a synthetic market of its own with an
+artificial round-trip latency, change on every tick. The sequential
+baseline polls one BigParaProvider per page in turn; MultiPageProvider
+downloads them concurrently on its thread pool and parses on the same
+threads, or on a process pool with --processes.
+
+Usage: python -m bench.bench_multipage [--pages N] [--symbols N] [--latency S] [--ticks N] [--processes]
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.multipage import MultiPageProvider
+from app.providers import BigParaProvider, SyntheticProvider
+from app.standin import StandInServer
+
+
+def start_servers(args):
+    return [StandInServer(provider=SyntheticProvider(args.symbols, seed=page, prefix=f"P{page}S"),
+                          latency=args.latency).start()
+            for page in range(args.pages)]
+
+
+def run(servers, fetch, ticks):
+    timings = []
+    for _ in range(ticks):
+        for server in servers:
+            server.advance()
+        start = time.perf_counter()
+        stocks = fetch()
+        timings.append(time.perf_counter() - start)
+    return timings, len(stocks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--symbols", type=int, default=200, help="symbols per page")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per request")
+    parser.add_argument("--ticks", type=int, default=10)
+    parser.add_argument("--processes", action="store_true", help="parse on a process pool")
+    args = parser.parse_args()
+
+    servers = start_servers(args)
+    try:
+        providers = [BigParaProvider(url=server.url) for server in servers]
+        sequential, count = run(servers, lambda: [s for p in providers for s in p.fetch()], args.ticks)
+        for provider in providers:
+            provider.close()
+
+        executor = ProcessPoolExecutor() if args.processes else None
+        multi = MultiPageProvider([server.url for server in servers], concurrency=args.pages,
+                                  host_interval=0.0, executor=executor)
+        concurrent, merged = run(servers, multi.fetch, args.ticks)
+        multi.close()
+        if executor is not None:
+            executor.shutdown()
+    finally:
+        for server in servers:
+            server.stop()
+
+    print(f"{args.pages} pages x {args.symbols} symbols, {args.latency * 1e3:.0f} ms latency, "
+          f"{args.ticks} ticks (parse on {'processes' if args.processes else 'threads'})")
+    print(f"  sequential  median {statistics.median(sequential) * 1e3:8.1f} ms per tick  ({count} quotes)")
+    print(f"  concurrent  median {statistics.median(concurrent) * 1e3:8.1f} ms per tick  ({merged} quotes)")
+    print(f"  speedup     {statistics.median(sequential) / statistics.median(concurrent):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Order matching per tick: indexed OrderBook vs scanning every open order.
+
+Thousands of limit, stop and take-profit orders rest around the prices of
+a synthetic market; each random-walk tick matches the book and tops it
+back up to the same size. The last section runs whole ticks through
+GameController.apply_market_delta, fills persisted to SQLite included.
+
+Usage: python -m bench.bench_orders [--symbols N] [--orders N] [--ticks N]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.models import MarketDelta, Order, ORDER_KINDS, ORDER_SIDES
+from app.orders import OrderBook
+
+TICK_INTERVAL = 3.0
+
+
+class ScanBook:
+    """Baseline: tests every open order against every quote."""
+
+    def __init__(self):
+        self.orders = {}
+
+    def add(self, order):
+        self.orders[order.id] = order
+
+    def match_prices(self, quotes):
+        prices = dict(quotes)
+        triggered = [
+            order for order in self.orders.values()
+            if (price := prices.get(order.symbol)) is not None
+            and (price <= order.price if order.triggers_below else price >= order.price)
+        ]
+        for order in triggered:
+            del self.orders[order.id]
+        return triggered
+
+
+class OrderFactory:
+    def __init__(self, symbols, rng):
+        self.symbols = symbols
+        self.rng = rng
+        self.last_id = 0
+
+    def spec(self, prices):
+        symbol = self.rng.choice(self.symbols)
+        side, kind = self.rng.choice(ORDER_SIDES), self.rng.choice(ORDER_KINDS)
+        level = prices[symbol] * self.rng.uniform(0.9, 1.1)
+        order = Order(0, symbol, side, kind, 1, level)
+        # Place it on the side of the price it has to wait on
+        if order.triggers_below == (level > prices[symbol]):
+            level = 2 * prices[symbol] - level
+        return symbol, side, kind, 1, round(level, 2)
+
+    def order(self, prices):
+        self.last_id += 1
+        return Order(self.last_id, *self.spec(prices))
+
+
+def walk(prices, rng):
+    for symbol in prices:
+        prices[symbol] = round(prices[symbol] * rng.uniform(0.995, 1.005), 2)
+
+
+def run_book(args, book):
+    rng = random.Random(3)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    prices = {symbol: rng.uniform(10, 100) for symbol in symbols}
+    factory = OrderFactory(symbols, rng)
+    for _ in range(args.orders):
+        book.add(factory.order(prices))
+
+    timings, fills = [], 0
+    for _ in range(args.ticks):
+        walk(prices, rng)
+        start = time.perf_counter()
+        triggered = book.match_prices(prices.items())
+        timings.append(time.perf_counter() - start)
+        fills += len(triggered)
+        for _ in triggered:
+            book.add(factory.order(prices))
+    return timings, fills
+
+
+def run_controller(args, workdir):
+    rng = random.Random(3)
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    prices = {symbol: rng.uniform(10, 100) for symbol in symbols}
+    factory = OrderFactory(symbols, rng)
+
+    db = DatabaseManager(os.path.join(workdir, "bench_orders.db"), pooled=True)
+    db.init_db()
+    with db.get_connection() as conn:
+        conn.execute("UPDATE player SET money = 1e12 WHERE id = 1")
+        conn.executemany("INSERT INTO portfolio (player_id, symbol, quantity, average_cost) VALUES (1, ?, 1000000, 1.0)",
+                         [(symbol,) for symbol in symbols])
+        conn.commit()
+    controller = GameController(db)
+    controller.update_market_cache([])
+    controller.place_orders([factory.spec(prices) for _ in range(args.orders)])
+
+    timings, fills = [], 0
+    for _ in range(args.ticks):
+        walk(prices, rng)
+        delta = MarketDelta(changed={symbol: {"price": price} for symbol, price in prices.items()})
+        start = time.perf_counter()
+        done = controller.apply_market_delta(delta)
+        timings.append(time.perf_counter() - start)
+        fills += len(done)
+        controller.place_orders([factory.spec(prices) for _ in done])
+    controller.close()
+    db.close()
+    return timings, fills
+
+
+def report(name, timings, fills, ticks):
+    print(f"  {name:<24} median {statistics.median(timings) * 1e3:8.2f}ms  max {max(timings) * 1e3:8.2f}ms"
+          f"  {fills / ticks:6.1f} fills/tick  ({max(timings) / TICK_INTERVAL:.2%} of the tick interval)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.orders} open orders on {args.symbols} symbols, {args.ticks} ticks")
+    scan, scan_fills = run_book(args, ScanBook())
+    indexed, indexed_fills = run_book(args, OrderBook())
+    report("scan", scan, scan_fills, args.ticks)
+    report("OrderBook", indexed, indexed_fills, args.ticks)
+    print(f"  speedup {statistics.median(scan) / statistics.median(indexed):.0f}x")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        timings, fills = run_controller(args, workdir)
+    report("controller (with fills)", timings, fills, args.ticks)
+
+
+if __name__ == "__main__":
+    main()
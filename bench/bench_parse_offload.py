@@ -0,0 +1,110 @@
+"""
+GUI-thread latency while the scraper parses, with the parse in-thread vs in a process.
+
+A MarketScraperWorker polls a local stand-in page that changes on every
+request, so each tick downloads and parses the full fixture. Meanwhile a
+heartbeat timer on the main event loop records how late it fires: the
+in-thread parse holds the GIL, the process-pool parse only hands back
+parse_rows() tuples. Also reports what each result format costs to send
+between processes.
+
+The process pool has not been faster here: pickling the page out and the
+rows back costs about what the stream parser saves on the GIL, and its p99
+lateness came out higher than in-thread. That is why BIST_PARSE_PROCESS
+stays off by default; rerun this before turning it on.
+
+Usage: python -m bench.bench_parse_offload [--seconds S] [--interval S]
+"""
+import argparse
+import pickle
+import statistics
+import sys
+import time
+
+from PyQt5.QtCore import QCoreApplication, Qt, QTimer
+
+from app.providers import BigParaProvider, parse_rows, parse_stream
+from app.scheduling import AlwaysOpen, ScrapeScheduler
+from app.services import MarketScraperWorker
+from app.standin import StandInServer
+from bench.generators import load_fixture
+
+TIMER_INTERVAL_MS = 5
+
+
+class ChangingPage(StandInServer):
+    """Stand-in whose body changes after every request, so every fetch parses."""
+
+    def __init__(self, body):
+        super().__init__(body)
+        self.body = body
+        self.version = 0
+
+    def bump(self):
+        self.version += 1
+        self.page.set(self.body + f"<!-- {self.version} -->".encode())
+
+
+def run(app, processes, args, body):
+    server = ChangingPage(body).start()
+    provider = BigParaProvider(url=server.url, processes=processes)
+    worker = MarketScraperWorker(provider, scheduler=ScrapeScheduler(interval=args.interval, calendar=AlwaysOpen()))
+    worker.data_updated.connect(lambda _stocks: server.bump())
+
+    beats = []
+    heartbeat = QTimer()
+    heartbeat.setTimerType(Qt.PreciseTimer)
+    heartbeat.timeout.connect(lambda: beats.append(time.perf_counter()))
+    heartbeat.start(TIMER_INTERVAL_MS)
+    worker.start()
+
+    QTimer.singleShot(int(args.seconds * 1000), app.quit)
+    app.exec_()
+    heartbeat.stop()
+    worker.stop()
+    server.stop()
+
+    lateness = sorted(max(0.0, b - a - TIMER_INTERVAL_MS / 1000) for a, b in zip(beats, beats[1:]))
+    return {
+        "parses": provider.stats.parses,
+        "p50": statistics.median(lateness),
+        "p99": lateness[int(len(lateness) * 0.99)],
+        "max": lateness[-1],
+    }
+
+
+def transfer_cost(body, repeat=20):
+    """Seconds to pickle + unpickle one parsed page, per result format."""
+    costs = {}
+    for name, value in (("Stock dataclasses", parse_stream(body)), ("row tuples", parse_rows(body))):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            pickle.loads(data)
+        costs[name] = ((time.perf_counter() - start) / repeat, len(data))
+    return costs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.25, help="scrape interval")
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    body = load_fixture()
+    in_thread = run(app, False, args, body)
+    in_process = run(app, True, args, body)
+
+    print(f"{args.seconds:.0f}s of scraping every {args.interval}s, {TIMER_INTERVAL_MS}ms heartbeat on the main thread")
+    print(f"  {'':<14} {'parses':>7} {'p50 late':>10} {'p99 late':>10} {'max late':>10}")
+    for name, result in (("in thread", in_thread), ("process pool", in_process)):
+        print(f"  {name:<14} {result['parses']:>7} {result['p50'] * 1e3:8.2f}ms "
+              f"{result['p99'] * 1e3:8.2f}ms {result['max'] * 1e3:8.2f}ms")
+    print("Result transfer per page (pickle + unpickle):")
+    for name, (seconds, size) in transfer_cost(body).items():
+        print(f"  {name:<18} {seconds * 1e3:6.2f}ms  {size / 1024:5.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-tick parse time of the BigPara page: BeautifulSoup vs single-pass parser.
+
+The default fixture is generated BigPara markup (see
+bench.generators.load_fixture); pass --fixture to time a real capture.
+
+Usage: python -m bench.bench_parser [--repeat N] [--fixture PATH]
+"""
+import argparse
+import statistics
+import time
+
+from app.providers import PARSERS, parse_soup, parse_stream
+from bench.generators import FIXTURE, load_fixture
+
+
+def measure(parse, content, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(content)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--fixture", help="a saved page (default: the generated fixture)")
+    args = parser.parse_args()
+
+    if args.fixture is None:
+        content = load_fixture()
+    else:
+        with open(args.fixture, "rb") as f:
+            content = f.read()
+
+    soup_rows = parse_soup(content)
+    stream_rows = parse_stream(content)
+    if soup_rows != stream_rows:
+        raise SystemExit("Parser modes disagree on fixture output.")
+
+    print(f"Fixture: {args.fixture or FIXTURE} ({len(content) / 1024:.0f} KiB, {len(stream_rows)} rows)")
+    results = {}
+    for mode, parse in PARSERS.items():
+        timings = measure(parse, content, args.repeat)
+        results[mode] = statistics.median(timings)
+        print(f"  {mode:<7} median {results[mode] * 1000:8.2f} ms   min {min(timings) * 1000:8.2f} ms")
+
+    print(f"Speedup: {results['soup'] / results['stream']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
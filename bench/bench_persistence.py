@@ -0,0 +1,128 @@
+"""
+GUI-thread responsiveness while the database is stalled, with and without the PersistenceWorker.
+
+Another connection holds an exclusive lock on the database for --stall
+seconds while trades are placed from a timer on the event loop. A second
+timer measures how late the event loop services it. Trading directly
+blocks the loop until the lock is released; with the persistence worker
+the loop must keep servicing timers (largest gap under --max-gap ms) and
+the queued trades must reach the database once the lock is gone. Exits
+non-zero when either check fails.
+
+Usage: python -m bench.bench_persistence [--stall S] [--trades N] [--max-gap MS]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from PyQt5.QtCore import QCoreApplication, QTimer
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.models import Stock
+from app.persistence import PersistenceWorker
+
+TIMER_INTERVAL_MS = 10
+
+
+def hold_lock(db_name, seconds, locked):
+    conn = sqlite3.connect(db_name)
+    conn.execute("BEGIN EXCLUSIVE")
+    locked.set()
+    time.sleep(seconds)
+    conn.commit()
+    conn.close()
+
+
+def run(app, use_worker, args, workdir):
+    db = DatabaseManager(os.path.join(workdir, f"bench_{'worker' if use_worker else 'direct'}.db"), pooled=True)
+    db.init_db()
+    with db.get_connection() as conn:
+        conn.execute("UPDATE player SET money = 1e12 WHERE id = 1")
+        conn.commit()
+    persistence = PersistenceWorker(db) if use_worker else None
+    if persistence is not None:
+        persistence.start()
+    controller = GameController(db, persistence=persistence)
+    stock = Stock("S000", 10.0, 0, 0, 0, 0, 0, 0)
+
+    locked = threading.Event()
+    staller = threading.Thread(target=hold_lock, args=(db.db_name, args.stall, locked))
+    staller.start()
+    locked.wait()
+
+    ticks = []
+    trade_times = []
+
+    def trade():
+        if len(trade_times) == args.trades:
+            return
+        start = time.perf_counter()
+        controller.buy_stock(stock, 1)
+        trade_times.append(time.perf_counter() - start)
+
+    heartbeat = QTimer()
+    heartbeat.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    heartbeat.start(TIMER_INTERVAL_MS)
+    trader = QTimer()
+    trader.timeout.connect(trade)
+    trader.start(max(1, int(args.stall * 1000 / (args.trades + 1))))
+
+    QTimer.singleShot(int(args.stall * 1000), app.quit)
+    app.exec_()
+    heartbeat.stop()
+    trader.stop()
+    staller.join()
+
+    controller.close()
+    if persistence is not None:
+        persistence.stop()
+    with db.get_connection() as conn:
+        stored = conn.execute("SELECT money FROM player WHERE id = 1").fetchone()[0]
+    db.close()
+
+    gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+    return {
+        "timer ticks": len(ticks),
+        "max gap": max(gaps, default=args.stall),
+        "trades": len(trade_times),
+        "max trade": max(trade_times, default=0.0),
+        "persisted": abs(stored - controller.player.money) < 1e-6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stall", type=float, default=1.0, help="seconds the database stays locked")
+    parser.add_argument("--trades", type=int, default=10)
+    parser.add_argument("--max-gap", type=float, default=100.0, help="allowed timer gap with the worker, ms")
+    args = parser.parse_args()
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as workdir:
+        direct = run(app, False, args, workdir)
+        worker = run(app, True, args, workdir)
+
+    print(f"Database locked for {args.stall:.1f}s, {TIMER_INTERVAL_MS}ms heartbeat timer")
+    print(f"  {'':<12} {'direct':>10} {'worker':>10}")
+    print(f"  {'timer ticks':<12} {direct['timer ticks']:>10} {worker['timer ticks']:>10}")
+    print(f"  {'trades':<12} {direct['trades']:>10} {worker['trades']:>10}")
+    for name in ("max gap", "max trade"):
+        print(f"  {name:<12} {direct[name] * 1e3:8.1f}ms {worker[name] * 1e3:8.1f}ms")
+
+    failures = []
+    if worker["max gap"] * 1e3 > args.max_gap:
+        failures.append(f"event loop stalled for {worker['max gap'] * 1e3:.1f}ms with the worker")
+    if worker["trades"] != args.trades or not worker["persisted"]:
+        failures.append("queued trades did not reach the database")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
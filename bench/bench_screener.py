@@ -0,0 +1,92 @@
+"""
+Screener: saved screens evaluated against every tick of a synthetic market.
+
+Compares Screener.evaluate() (one vectorized pass, shared subexpressions
+computed once) with the same screens as Python predicates run over the
+tick's Stock objects, one screen at a time.
+
+Usage: python -m bench.bench_screener [--symbols N] [--screens N] [--ticks N]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.models import MarketSnapshot, Watchlist
+from app.screener import Screener
+from bench.generators import synthetic_ticks
+
+# (screen expression, equivalent Python predicate) for thresholds a, b
+TEMPLATES = [
+    ("percent_change > {a} and capacity_tl > {b}M",
+     lambda a, b: lambda s: s.percent_change > a and s.capacity_tl > b * 1e6),
+    ("price within {a}% of lowest",
+     lambda a, b: lambda s: abs(s.price - s.lowest) <= a / 100 * abs(s.lowest)),
+    ("price within {a}% of highest and capacity_lot > {b}K",
+     lambda a, b: lambda s: abs(s.price - s.highest) <= a / 100 * abs(s.highest) and s.capacity_lot > b * 1e3),
+    ("(price - average) / average * 100 > {a}",
+     lambda a, b: lambda s: (s.price - s.average) / s.average * 100 > a),
+    ("percent_change < -{a} or capacity_tl > {b}M",
+     lambda a, b: lambda s: s.percent_change < -a or s.capacity_tl > b * 1e6),
+]
+
+
+def make_screens(count, seed=3):
+    """`count` (Watchlist, predicate, sorted) triples; every fifth keeps the top 20 by turnover."""
+    rng = random.Random(seed)
+    screens = []
+    for i in range(count):
+        text, predicate = TEMPLATES[i % len(TEMPLATES)]
+        a, b = rng.choice((1, 2, 3, 5)), rng.choice((10, 50, 100, 500))
+        top = i % 5 == 4
+        watchlist = Watchlist(f"screen{i}", expression=text.format(a=a, b=b),
+                              sort="capacity_tl desc" if top else "", limit=20 if top else None)
+        screens.append((watchlist, predicate(a, b), top))
+    return screens
+
+
+def per_stock(screens, stocks):
+    results = {}
+    for watchlist, predicate, top in screens:
+        matches = [s for s in stocks if predicate(s)]
+        if top:
+            matches = sorted(matches, key=lambda s: -s.capacity_tl)[:20]
+        results[watchlist.name] = [s.symbol for s in matches]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--screens", type=int, default=100)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    screens = make_screens(args.screens)
+    screener = Screener(watchlist for watchlist, _, _ in screens)
+    snapshots, previous = [], None
+    for stocks in synthetic_ticks(args.symbols, args.ticks, 0.2):
+        previous = MarketSnapshot.from_stocks(stocks, previous)
+        snapshots.append(previous)
+    # The baseline gets the same kuruş-rounded quotes, so both agree exactly
+    stock_lists = [snapshot.to_stocks() for snapshot in snapshots]
+
+    vectorized, baseline = [], []
+    for snapshot, stocks in zip(snapshots, stock_lists):
+        start = time.perf_counter()
+        results = screener.evaluate(snapshot)
+        vectorized.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = per_stock(screens, stocks)
+        baseline.append(time.perf_counter() - start)
+        assert results == expected, "screener and per-stock predicates disagree"
+
+    matches = statistics.mean(len(symbols) for symbols in results.values())
+    print(f"{args.screens} screens x {args.symbols} symbols, {args.ticks} ticks ({matches:.0f} matches per screen)")
+    print(f"  per-stock predicates  median {statistics.median(baseline) * 1e3:8.2f} ms per tick")
+    print(f"  Screener.evaluate     median {statistics.median(vectorized) * 1e3:8.2f} ms per tick")
+    print(f"  speedup               {statistics.median(baseline) / statistics.median(vectorized):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
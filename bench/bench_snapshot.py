@@ -0,0 +1,88 @@
+"""
+Per-tick market handling: lists of Stock dataclasses vs a MarketSnapshot.
+
+Starts from the parser's row tuples for a synthetic market where a
+fraction of symbols move every tick, and times what the scraper and GUI
+threads do with each tick before any widget is touched: build the quotes,
+diff them against the previous tick, feed the indicator engine and build
+the symbol -> price maps the view and the controller keep (with a
+snapshot, one map they share). Also reports
+the memory one tick of quotes holds.
+
+Usage: python -m bench.bench_snapshot [--symbols N] [--ticks N] [--moving F]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from app.indicators import IndicatorEngine
+from app.models import STOCK_FIELDS, MarketDelta, MarketSnapshot, Stock
+from bench.generators import synthetic_ticks
+
+
+def stock_list_tick(rows, state, engine):
+    stocks = [Stock(*row) for row in rows]
+    current = {s.symbol: s for s in stocks}
+    delta = MarketDelta.between(state.get("previous", {}), current)
+    state["previous"] = current
+    engine.update(stocks)
+    latest_prices = {s.symbol: s.price for s in stocks}  # MainWindow.update_market
+    prices = {s.symbol: s.price for s in stocks}         # GameController.update_market_cache
+    return delta, latest_prices, prices
+
+
+def snapshot_tick(rows, state, engine):
+    snapshot = MarketSnapshot.from_rows(rows, state.get("previous"))
+    delta = MarketDelta.between_snapshots(state.get("previous"), snapshot)
+    state["previous"] = snapshot
+    engine.update(snapshot)
+    return delta, snapshot.price_map()  # GameController's price cache, shared by MainWindow
+
+
+def run(tick, ticks):
+    state, engine, timings = {}, IndicatorEngine(), []
+    tick(ticks[0], state, engine)
+    for rows in ticks[1:]:
+        start = time.perf_counter()
+        tick(rows, state, engine)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def retained(build):
+    """Bytes still allocated by what build() returns."""
+    tracemalloc.start()
+    value = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--moving", type=float, default=0.2, help="fraction of symbols moving per tick")
+    args = parser.parse_args()
+
+    ticks = [[(s.symbol, *(getattr(s, name) for name in STOCK_FIELDS)) for s in stocks]
+             for stocks in synthetic_ticks(args.symbols, args.ticks, args.moving)]
+    # Steady state: the snapshot shares the previous tick's symbol list and index
+    first = MarketSnapshot.from_rows(ticks[0])
+    results = {
+        "list[Stock]": (run(stock_list_tick, ticks), retained(lambda: [Stock(*row) for row in ticks[1]])),
+        "MarketSnapshot": (run(snapshot_tick, ticks), retained(lambda: MarketSnapshot.from_rows(ticks[1], first))),
+    }
+
+    print(f"{args.symbols} symbols, {args.ticks} ticks, {args.moving:.0%} moving per tick")
+    print(f"  {'':<16} {'median':>10} {'p95':>10} {'one tick':>10}")
+    for name, (timings, size) in results.items():
+        timings.sort()
+        print(f"  {name:<16} {statistics.median(timings) * 1e3:8.2f}ms "
+              f"{timings[int(len(timings) * 0.95)] * 1e3:8.2f}ms {size / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Tick store: scraper-side append cost, writer throughput and range queries.
+
+Usage: python -m bench.bench_tickstore [--symbols N] [--ticks N]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.models import Stock
+from app.tickstore import TickStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks of 3s each (2000 ~ 1.7 hours)")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    base = [rng.uniform(1, 500) for _ in range(args.symbols)]
+    with tempfile.TemporaryDirectory() as workdir:
+        store = TickStore(os.path.join(workdir, "bench_ticks.db"), max_pending=args.ticks)
+        t0 = time.time() - args.ticks * 3
+        append_times = []
+        start = time.perf_counter()
+        for tick in range(args.ticks):
+            stocks = [Stock(f"S{i:04d}", round(p * rng.uniform(0.98, 1.02), 2), p, p, p, 0.5, 1e6, 1e8)
+                      for i, p in enumerate(base)]
+            t = time.perf_counter()
+            store.append(stocks, t0 + tick * 3)
+            append_times.append(time.perf_counter() - t)
+        store.flush()
+        elapsed = time.perf_counter() - start
+        rows = args.symbols * args.ticks
+        print(f"{args.ticks} ticks x {args.symbols} symbols = {rows:,} rows in {elapsed:.2f}s "
+              f"({rows / elapsed:,.0f} rows/s, {elapsed / args.ticks * 1000:.2f} ms per tick)")
+        print(f"  append() on the scraper thread: median {statistics.median(append_times) * 1e6:.1f}us, "
+              f"max {max(append_times) * 1e6:.1f}us, dropped {store.dropped}, failed {store.failed}")
+        print(f"  database size {os.path.getsize(store.db_name) / rows:.1f} bytes per row")
+
+        for name, window in (("full range", None), ("last hour", 3600)):
+            start = time.perf_counter()
+            data = store.query("S0042", start=None if window is None else time.time() - window)
+            print(f"  query {name:<10} {len(data['price']):6d} points in {(time.perf_counter() - start) * 1000:6.2f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Inputs shared by the benchmarks: a BigPara-style page, synthetic quotes, valuations and history.
+"""
+import os
+import random
+from dataclasses import replace
+
+import numpy as np
+
+from app.models import PositionValuation, Stock, ValuationSnapshot
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "bigpara_canli_borsa.html")
+
+
+def load_fixture() -> bytes:
+    """
+    The fixture canli-borsa page.
+
+    It is generated, not a capture of the live site: 480 made-up symbols
+    in BigPara's row markup (the same cells app.standin.render_page()
+    writes, every quote time 18:09) inside a page skeleton.
+    """
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+
+def synthetic_market(symbols, seed=7) -> list[Stock]:
+    rng = random.Random(seed)
+    stocks = []
+    for i in range(symbols):
+        price = rng.uniform(1, 500)
+        stocks.append(Stock(f"S{i:04d}", price, price * 1.02, price * 0.98, price,
+                            0.0, rng.uniform(1e3, 1e7), rng.uniform(1e5, 1e9)))
+    return stocks
+
+
+def synthetic_ticks(symbols, ticks, moving, seed=7):
+    """Yield full snapshots where a `moving` fraction of symbols trade each tick."""
+    rng = random.Random(seed)
+    stocks = synthetic_market(symbols, seed)
+    yield list(stocks)
+    for _ in range(ticks):
+        for i in rng.sample(range(symbols), int(symbols * moving)):
+            s = stocks[i]
+            price = round(s.price * rng.uniform(0.99, 1.01), 2)
+            stocks[i] = replace(s, price=price, highest=max(s.highest, price), lowest=min(s.lowest, price),
+                                percent_change=round(rng.uniform(-5, 5), 2),
+                                capacity_lot=s.capacity_lot + 100, capacity_tl=s.capacity_tl + 100 * price)
+        yield list(stocks)
+
+
+def valuations(positions, refreshes, moving, seed=5):
+    """ValuationSnapshots of `positions` holdings; prices move on every refresh if `moving`."""
+    rng = random.Random(seed)
+    prices = [rng.uniform(10, 100) for _ in range(positions)]
+    for version in range(refreshes):
+        if moving:
+            prices = [p * rng.uniform(0.99, 1.01) for p in prices]
+        else:
+            version = 0
+        yield ValuationSnapshot(
+            cash=1000.0, market_value=sum(prices), cost_basis=0.0, version=version,
+            positions=tuple(PositionValuation(f"S{i:02d}", 1, p, p, p, p) for i, p in enumerate(prices)))
+
+
+def equity_curve(points, start=1_700_000_000, step=10, seed=2):
+    """(epoch seconds, net worth) arrays of a random-walk equity curve."""
+    rng = np.random.default_rng(seed)
+    epoch = np.arange(points) * step + start
+    values = 1000 * np.exp(np.cumsum(rng.normal(0, 0.0005, points)))
+    return epoch, values
@@ -0,0 +1,327 @@
+"""
+Benchmark suite for the per-tick hot paths, with JSON results to compare across commits.
+
+Each case times one operation of the 3-second tick in isolation:
+parsing and fetching the market page, controller trades and history
+snapshots, market table updates and both charts (offscreen Qt). Results
+carry the commit they were measured on; --compare prints the change
+against an earlier results file.
+
+Usage: python -m bench.run [--output FILE] [--compare FILE] [--only SUBSTR] [--runs N]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.history import format_timestamp
+from app.models import MarketDelta
+from app.providers import BigParaProvider, parse_soup, parse_stream
+from app.standin import StandInServer, render_page
+from app.views import EquityLineChart, MarketTableWidget, PortfolioDonutChart
+from bench.generators import (
+    equity_curve, load_fixture, synthetic_market, synthetic_ticks, valuations,
+)
+
+MARKET_SYMBOLS = 500
+
+# name -> generator function: sets up, yields the operation to time, then cleans up
+CASES = {}
+
+
+def case(name):
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@case("parse.stream.fixture")
+def parse_stream_fixture(runs):
+    content = load_fixture()
+    yield lambda: parse_stream(content)
+
+
+@case("parse.soup.fixture")
+def parse_soup_fixture(runs):
+    content = load_fixture()
+    yield lambda: parse_soup(content)
+
+
+@case("parse.stream.synthetic")
+def parse_stream_synthetic(runs):
+    content = render_page(synthetic_market(MARKET_SYMBOLS))
+    yield lambda: parse_stream(content)
+
+
+@case("fetch_data.changed")
+def fetch_data_changed(runs):
+    """Download, decompress and parse: the page changes between calls."""
+    body = load_fixture()
+    server = StandInServer(body).start()
+    provider = BigParaProvider(url=server.url)
+    bodies = itertools.cycle([body, body + b"<!-- changed -->"])
+
+    def fetch():
+        server.page.set(next(bodies))
+        provider.fetch()
+    yield fetch
+    server.stop()
+    provider.close()
+
+
+@case("fetch_data.not_modified")
+def fetch_data_not_modified(runs):
+    """Conditional request answered 304."""
+    server = StandInServer(load_fixture()).start()
+    provider = BigParaProvider(url=server.url)
+    provider.fetch()
+    yield provider.fetch
+    server.stop()
+    provider.close()
+
+
+def controller_fixture(workdir, symbols=20):
+    db = DatabaseManager(os.path.join(workdir, "bench_run.db"), pooled=True)
+    db.init_db()
+    with db.get_connection() as conn:
+        conn.execute("UPDATE player SET money = 1e12 WHERE id = 1")
+        conn.commit()
+    controller = GameController(db)
+    stocks = synthetic_market(symbols)
+    controller.update_market_cache(stocks)
+    return db, controller, stocks
+
+
+@case("controller.buy_stock")
+def controller_buy(runs):
+    with tempfile.TemporaryDirectory() as workdir:
+        db, controller, stocks = controller_fixture(workdir)
+        cycle = itertools.cycle(stocks)
+        yield lambda: controller.buy_stock(next(cycle), 1)
+        db.close()
+
+
+@case("controller.sell_stock")
+def controller_sell(runs):
+    with tempfile.TemporaryDirectory() as workdir:
+        db, controller, stocks = controller_fixture(workdir)
+        for stock in stocks:
+            controller.buy_stock(stock, runs + 10)
+        cycle = itertools.cycle(stocks)
+        yield lambda: controller.sell_stock(next(cycle), 1)
+        db.close()
+
+
+@case("controller.snapshot_portfolio_value")
+def controller_snapshot(runs):
+    with tempfile.TemporaryDirectory() as workdir:
+        db, controller, stocks = controller_fixture(workdir)
+        for stock in stocks:
+            controller.buy_stock(stock, 10)
+        yield controller.snapshot_portfolio_value
+        db.close()
+
+
+@case("controller.apply_market_delta")
+def controller_delta(runs):
+    with tempfile.TemporaryDirectory() as workdir:
+        db, controller, _stocks = controller_fixture(workdir)
+        snapshots = list(synthetic_ticks(MARKET_SYMBOLS, runs + 1, 0.2))
+        deltas = itertools.cycle([
+            MarketDelta.between({s.symbol: s for s in prev}, {s.symbol: s for s in cur})
+            for prev, cur in zip(snapshots, snapshots[1:])
+        ])
+        yield lambda: controller.apply_market_delta(next(deltas))
+        db.close()
+
+
+def market_table(runs):
+    qt = app()
+    table = MarketTableWidget()
+    table.resize(1000, 700)
+    table.show()
+    snapshots = list(synthetic_ticks(MARKET_SYMBOLS, runs + 1, 0.2))
+    table.update_data(snapshots[0])
+    qt.processEvents()
+    return qt, table, snapshots
+
+
+@case("market_table.update_data")
+def market_table_update(runs):
+    qt, table, snapshots = market_table(runs)
+    cycle = itertools.cycle(snapshots[1:])
+
+    def update():
+        table.update_data(next(cycle))
+        qt.processEvents()
+    yield update
+    table.close()
+
+
+@case("market_table.apply_delta")
+def market_table_delta(runs):
+    qt, table, snapshots = market_table(runs)
+    deltas = [MarketDelta.between({s.symbol: s for s in prev}, {s.symbol: s for s in cur})
+              for prev, cur in zip(snapshots, snapshots[1:])]
+    cycle = iter(deltas)
+
+    def update():
+        table.apply_delta(next(cycle))
+        qt.processEvents()
+    yield update
+    table.close()
+
+
+@case("donut.update_chart")
+def donut_update(runs):
+    qt = app()
+    chart = PortfolioDonutChart()
+    chart.resize(500, 400)
+    chart.show()
+    inputs = valuations(8, runs + 1, moving=True)
+    chart.update_chart(next(inputs))
+    qt.processEvents()
+
+    def update():
+        chart.update_chart(next(inputs))
+        qt.processEvents()
+    yield update
+    chart.close()
+
+
+@case("equity.update_chart")
+def equity_update(runs):
+    """Rollup path: a MAX_POINTS window that moves by one row per refresh."""
+    qt = app()
+    chart = EquityLineChart(incremental=False)
+    chart.resize(600, 450)
+    chart.show()
+    epoch, values = equity_curve(chart.MAX_POINTS + runs + 1)
+    rows = [{"timestamp": format_timestamp(t), "total_value": v} for t, v in zip(epoch, values)]
+    versions = itertools.count()
+
+    def update():
+        i = next(versions)
+        chart.update_chart(rows[i:i + chart.MAX_POINTS], version=i)
+        qt.processEvents()
+    yield update
+    chart.close()
+
+
+@case("equity.append_points")
+def equity_append(runs):
+    """Incremental path: one live point appended to a 50k point history."""
+    qt = app()
+    chart = EquityLineChart()
+    chart.resize(600, 450)
+    chart.show()
+    history = 50_000
+    epoch, values = equity_curve(history + runs + 1)
+    times = epoch.astype("datetime64[s]")
+    chart.append_points(history, times[:history], values[:history], version=0)
+    qt.processEvents()
+    positions = itertools.count(history)
+
+    def update():
+        i = next(positions)
+        chart.append_points(i + 1, times[i:i + 1], values[i:i + 1], version=i)
+        qt.processEvents()
+    yield update
+    chart.close()
+
+
+def measure(fn, runs, warmup):
+    setup = fn(runs + warmup)
+    operation = next(setup)
+    timings = []
+    for i in range(runs + warmup):
+        start = time.perf_counter()
+        operation()
+        if i >= warmup:
+            timings.append(time.perf_counter() - start)
+    next(setup, None)
+    timings.sort()
+    return {
+        "runs": runs,
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "min": timings[0],
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    print(f"\nAgainst {baseline.get('commit') or 'baseline'} (median, lower is better)")
+    for name, stats in results["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            print(f"  {name:<36} {'new':>10}")
+            continue
+        ratio = stats["median"] / before["median"]
+        print(f"  {name:<36} {before['median'] * 1e3:9.3f}ms -> {stats['median'] * 1e3:9.3f}ms  {ratio:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    parser.add_argument("--only", help="run cases whose name contains this")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": {},
+    }
+    for name, fn in CASES.items():
+        if args.only and args.only not in name:
+            continue
+        results["cases"][name] = stats = measure(fn, args.runs, args.warmup)
+        print(f"  {name:<36} median {stats['median'] * 1e3:9.3f}ms  p95 {stats['p95'] * 1e3:9.3f}ms",
+              file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,78 @@
+import os
 import sys
 from PyQt5.QtWidgets import QApplication, QMessageBox
 from app.database import DatabaseManager
 from app.controllers import GameController
 from app.views import MainWindow
 from app.services import MarketScraperWorker
+from app.scheduling import AlwaysOpen, ScrapeScheduler
+from app.providers import BigParaProvider, ReplayProvider
+from app.multipage import MultiPageProvider
+from app.persistence import PersistenceWorker
+from app.tickstore import TickStore
+from app.indicators import IndicatorEngine
+from app.profiling import PROFILER
 
 from app.styles import DARK_THEME_QSS
 
 def main():
+    # BIST_PROFILE=timings.json records hot-path timings from startup and dumps them on exit
+    profile_path = os.environ.get("BIST_PROFILE")
+    PROFILER.enable(bool(profile_path))
+
     # 1. Setup Application
     app = QApplication(sys.argv)
     app.setStyle("Fusion") 
     app.setStyleSheet(DARK_THEME_QSS) 
 
     # 2. Initialize Database
-    db_manager = DatabaseManager()
+    db_manager = DatabaseManager(pooled=True)
     try:
         db_manager.init_db()
     except Exception as e:
         QMessageBox.critical(None, "Database Error", f"Failed to initialize database: {e}")
         sys.exit(1)
 
-    # 3. Initialize Controller
-    controller = GameController(db_manager)
+    # 3. Initialize Controller (database writes run on the persistence thread)
+    persistence = PersistenceWorker(db_manager)
+    persistence.start()
+    controller = GameController(db_manager, persistence=persistence)
 
     # 4. Initialize View
     window = MainWindow(controller)
     window.show()
 
     # 5. Initialize Background Service
-    scraper_worker = MarketScraperWorker()
+    # BIST_FEED: page URL(s), comma separated (e.g. `python -m app.standin`), or recorded ticks to replay
+    feed = os.environ.get("BIST_FEED")
+    if feed and "," in feed:
+        provider = MultiPageProvider(feed.split(","))
+    elif not feed or feed.startswith(("http://", "https://")):
+        # BIST_PARSE_PROCESS=1 parses pages in a separate process (off by default: not faster, see bench_parse_offload)
+        provider = BigParaProvider(url=feed, processes=os.environ.get("BIST_PARSE_PROCESS") == "1")
+    else:
+        provider = ReplayProvider.from_source(feed)
+    # Only the real feed follows BIST session hours and is worth recording
+    tick_store = TickStore() if provider.live else None
+    # BIST_INTERVAL: seconds between scrapes (default 3)
+    scheduler = ScrapeScheduler(interval=float(os.environ.get("BIST_INTERVAL", 3.0)),
+                                calendar=None if provider.live else AlwaysOpen())
+    scraper_worker = MarketScraperWorker(provider, tick_store=tick_store, indicators=IndicatorEngine(),
+                                         scheduler=scheduler, screener=controller.screener)
     
     # Connect signals
-    scraper_worker.data_updated.connect(window.update_market)
+    scraper_worker.market_delta.connect(window.apply_market_delta)
+    scraper_worker.indicators_updated.connect(window.update_indicators)
+    scraper_worker.screens_updated.connect(window.update_screens)
     
     def on_scraper_error(err):
         # We might not want to verify block with a popup loop if it spams,
         # but for now let's just log to status bar or print
-        window.statusBar().showMessage(f"Network Error: {err}")
+        window.statusBar().showMessage(f"Scraper Error: {err}")
 
     scraper_worker.error_occurred.connect(on_scraper_error)
+    persistence.error_occurred.connect(
+        lambda err: window.statusBar().showMessage(f"Database Error: {err}"))
 
     # Start scraper
     scraper_worker.start()
@@ -49,6 +82,13 @@ def main():
     
     # Cleanup
     scraper_worker.stop()
+    if tick_store is not None:
+        tick_store.close()
+    controller.close()
+    persistence.stop()
+    db_manager.close()
+    if profile_path:
+        PROFILER.dump(profile_path)
     sys.exit(exit_code)
 
 if __name__ == "__main__":
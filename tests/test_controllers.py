@@ -0,0 +1,50 @@
+import pytest
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.history import format_timestamp
+from app.models import Stock
+
+
+@pytest.fixture
+def controller(tmp_path):
+    db = DatabaseManager(str(tmp_path / "game.db"))
+    db.init_db()
+    controller = GameController(db)
+    yield controller
+    controller.close()
+
+
+def test_cancel_order_refuses_another_players_order(controller):
+    other, = controller.add_players(1)
+    success, _msg = controller.place_order("THYAO", "buy", "limit", 1, 10.0, player_id=other)
+    assert success
+    order, = controller.get_open_orders(other)
+
+    assert not controller.cancel_order(order.id)
+    assert controller.get_open_orders(other) == [order]
+
+    assert controller.cancel_order(order.id, player_id=other)
+    assert controller.get_open_orders(other) == []
+    assert order.status == "cancelled"
+
+
+def test_trade_mid_replay_stays_on_the_replay_clock(controller):
+    start = 1_600_000_000 # 2020-09-13, long before time.time()
+    for i in range(200):
+        ts = start + i * 3
+        controller.update_market_cache([Stock("AAA", 10.0 + i % 7, 17.0, 10.0, 13.0, 0.0, 1, 1.0)], ts)
+        if i == 100:
+            success, _msg = controller.buy_stock(Stock("AAA", 10.0, 17.0, 10.0, 13.0, 0.0, 1, 1.0), 1)
+            assert success
+
+    # Timed flushes kept going after the trade: at most one flush interval is left pending
+    pending = controller.history.take_pending()
+    assert len(pending) <= controller.history.flush_interval / controller.history.interval
+    end = format_timestamp(start + 199 * 3)
+    with controller.db.get_connection() as conn:
+        stamps = [row[0] for row in conn.execute("SELECT timestamp FROM portfolio_history")]
+        executed_at, = conn.execute("SELECT executed_at FROM trades").fetchone()
+    assert len(stamps) > 40
+    assert all(format_timestamp(start) <= stamp <= end for stamp in stamps)
+    assert executed_at == format_timestamp(start + 100 * 3)
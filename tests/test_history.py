@@ -0,0 +1,36 @@
+from app.database import DatabaseManager
+from app.history import HistoryRecorder
+
+import pytest
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    db = DatabaseManager(str(tmp_path / "history.db"))
+    db.init_db()
+    yield HistoryRecorder(db, flush_interval=float("inf"), batch_size=100_000)
+
+
+def test_seed_points_is_bounded_and_followed_by_new_raw_rows(recorder):
+    start = 1_700_000_000
+    for i in range(5000):
+        recorder.record(1, 1000.0 + i, start + i * 10)
+    recorder.flush()
+
+    last_id, times, values = recorder.seed_points(1, 100)
+    assert 0 < len(times) <= 100
+    assert values[-1] == 1000.0 + 4999
+
+    recorder.record(1, 42.0, start + 5000 * 10)
+    after_id, times, values = recorder.points_since(1, last_id)
+    assert after_id > last_id
+    assert values.tolist() == [42.0]
+
+
+def test_flush_interval_runs_on_the_sample_clock(recorder):
+    recorder.flush_interval = 60.0
+    start = 1_000_000.0 # long before time.time()
+    for i in range(7):
+        recorder.sample(1, 1000.0 + i, start + i * 10)
+    assert recorder.take_pending() == []
+    assert len(recorder.query(1, resolution=0)) == 7
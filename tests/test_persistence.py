@@ -0,0 +1,135 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+from PyQt5.QtCore import QCoreApplication
+
+from app.controllers import GameController
+from app.database import DatabaseManager
+from app.models import Stock
+from app.persistence import PersistenceWorker
+
+STOCK = Stock("AAA", 10.0, 0, 0, 0, 0, 0, 0)
+
+
+class InOrderQueue:
+    """A PersistenceWorker stand-in that runs commands in order when told to and delivers callbacks later."""
+
+    def __init__(self, db):
+        self.db = db
+        self.commands = []
+        self.replies = []
+
+    def submit(self, fn, *args, callback=None):
+        self.commands.append((fn, args, callback))
+
+    def run(self):
+        while self.commands:
+            fn, args, callback = self.commands.pop(0)
+            result = error = None
+            with self.db.get_connection() as conn:
+                try:
+                    result = fn(conn, *args)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    error = e
+            if callback is not None:
+                self.replies.append((callback, result, error))
+
+    def deliver(self):
+        replies, self.replies = self.replies, []
+        for callback, result, error in replies:
+            callback(result, error)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager(str(tmp_path / "game.db"), pooled=True)
+    db.init_db()
+    yield db
+    db.close()
+
+
+def stored_ledger(db):
+    with db.get_connection() as conn:
+        money = conn.execute("SELECT money FROM player WHERE id = 1").fetchone()[0]
+        holdings = dict(conn.execute("SELECT symbol, quantity FROM portfolio WHERE player_id = 1").fetchall())
+    return money, holdings
+
+
+def memory_ledger(controller):
+    return controller.player.money, {symbol: item.quantity for symbol, item in controller.positions.items()}
+
+
+def set_money(db, money):
+    with db.get_connection() as conn:
+        conn.execute("UPDATE player SET money = ? WHERE id = 1", (money,))
+        conn.commit()
+
+
+def test_trades_queued_behind_a_locked_database_reach_it_in_order(db):
+    app = QCoreApplication.instance() or QCoreApplication([])
+    persistence = PersistenceWorker(db)
+    persistence.start()
+    controller = GameController(db, persistence=persistence)
+
+    locked, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        conn = sqlite3.connect(db.db_name)
+        conn.execute("BEGIN EXCLUSIVE")
+        locked.set()
+        release.wait()
+        conn.commit()
+        conn.close()
+
+    staller = threading.Thread(target=hold_lock)
+    staller.start()
+    locked.wait()
+    start = time.perf_counter()
+    for quantity in range(1, 6):
+        assert controller.buy_stock(STOCK, quantity)[0]
+    # The GUI thread does not wait for the lock
+    assert time.perf_counter() - start < 1.0
+    release.set()
+    staller.join()
+    persistence.stop()
+    app.processEvents()
+
+    assert stored_ledger(db) == pytest.approx(memory_ledger(controller))
+    with db.get_connection() as conn:
+        quantities = [row[0] for row in conn.execute("SELECT quantity FROM trades ORDER BY id")]
+    assert quantities == [1, 2, 3, 4, 5]
+
+
+def test_failed_write_reloads_the_ledger(db):
+    persistence = InOrderQueue(db)
+    controller = GameController(db, persistence=persistence)
+    set_money(db, 5.0) # Changed behind the controller's back
+    assert controller.buy_stock(STOCK, 1)[0]
+    persistence.run()     # the write fails and asks for a reload
+    persistence.deliver()
+    persistence.run()     # the reload read
+    persistence.deliver()
+    assert memory_ledger(controller) == stored_ledger(db) == (5.0, {})
+
+
+def test_reload_does_not_wipe_fills_made_while_it_was_queued(db):
+    persistence = InOrderQueue(db)
+    controller = GameController(db, persistence=persistence)
+    set_money(db, 5.0)
+    assert controller.buy_stock(STOCK, 1)[0]
+    persistence.run()
+    persistence.deliver() # the failed write queues a reload
+    set_money(db, 1000.0)
+    assert controller.buy_stock(STOCK, 1)[0] # queued after the reload read
+    persistence.run()
+    persistence.deliver() # the reload result is stale by now
+    persistence.run()
+    persistence.deliver()
+
+    money, holdings = stored_ledger(db)
+    assert holdings == {"AAA": 1}
+    assert memory_ledger(controller) == (pytest.approx(money), holdings)
@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from app.models import Stock
+from app.multipage import MultiPageProvider, PageSource
+from app.providers import BigParaProvider, parse_rows, parse_soup, parse_stream
+from app.scheduling import AlwaysOpen, ScrapeScheduler
+from app.services import MarketScraperWorker
+from app.standin import StandInServer, render_page
+from bench.generators import load_fixture
+
+STOCKS = [
+    Stock("AKBNK", 45.12, 46.0, 44.5, 45.3, 1.25, 1200000.0, 54300000.0),
+    Stock("THYAO", 301.5, 305.0, 299.25, 302.1, -0.75, 800000.0, 241680000.0),
+]
+
+
+@pytest.fixture
+def server():
+    server = StandInServer(render_page(STOCKS)).start()
+    yield server
+    server.stop()
+
+
+def test_failed_parse_is_retried_on_the_next_fetch(server, monkeypatch):
+    provider = BigParaProvider(url=server.url)
+    parse = provider.parse
+    calls = []
+
+    def parse_once_broken(content):
+        calls.append(content)
+        if len(calls) == 1:
+            raise RuntimeError("parse process died")
+        return parse(content)
+
+    monkeypatch.setattr(provider, "parse", parse_once_broken)
+    with pytest.raises(RuntimeError):
+        provider.fetch()
+    snapshot = provider.fetch() # same body, same ETag
+    provider.close()
+
+    assert snapshot is not None
+    assert snapshot.to_stocks() == STOCKS
+    assert provider.stats.not_modified == 0
+
+
+def test_multipage_retries_a_page_whose_parse_failed(server):
+    calls = []
+
+    def parse_once_broken(content):
+        calls.append(content)
+        if len(calls) == 1:
+            raise ValueError("bad markup")
+        return parse_rows(content)
+
+    provider = MultiPageProvider([PageSource(server.url, parse_once_broken)], host_interval=0.0)
+    with pytest.raises(ValueError):
+        provider.fetch()
+    snapshot = provider.fetch()
+    provider.close()
+
+    assert snapshot is not None
+    assert snapshot.to_stocks() == STOCKS
+    assert provider.stats.bytes_transferred < provider.stats.bytes_decoded # served gzipped
+
+
+def test_multipage_refuses_bigpara_pages_it_cannot_parse():
+    with pytest.raises(ValueError):
+        MultiPageProvider([BigParaProvider.URL, "http://bigpara.hurriyet.com.tr/doviz/"])
+    MultiPageProvider([BigParaProvider.URL]).close()
+
+
+def test_multipage_snapshot_reaches_the_gui_as_a_market_delta(server):
+    other = [Stock("GARAN", 98.4, 99.0, 97.5, 98.2, 0.5, 500000.0, 49100000.0)]
+    second = StandInServer(render_page(other)).start()
+    worker = MarketScraperWorker(MultiPageProvider([server.url, second.url], host_interval=0.0),
+                                 scheduler=ScrapeScheduler(interval=0.01, calendar=AlwaysOpen()))
+    received = threading.Event()
+    deltas = []
+
+    def on_delta(delta):
+        deltas.append(delta)
+        received.set()
+
+    worker.market_delta.connect(on_delta, Qt.DirectConnection)
+    worker.start()
+    try:
+        assert received.wait(10)
+    finally:
+        worker.stop()
+        second.stop()
+    assert [stock.symbol for stock in deltas[0].added] == ["AKBNK", "THYAO", "GARAN"]
+
+
+@pytest.mark.parametrize("broken, fixed", [
+    ('<li class="cell048 node-h" id="h_td_yuksek_id_AKBNK">46,00</li>',      # unclosed cell
+     '<li class="cell048 node-h" id="h_td_yuksek_id_AKBNK">46,00'),
+    ('<li class="cell048 node-i" id="h_td_dusuk_id_AKBNK">44,50</li>',       # unclosed inline element
+     '<li class="cell048 node-i" id="h_td_dusuk_id_AKBNK"><span>44,50</li>'),
+    ('<li class="cell048 node-j" id="h_td_aof_id_AKBNK">45,30</li>',         # stray end tag
+     '<li class="cell048 node-j" id="h_td_aof_id_AKBNK">45,30</span></div></li>'),
+])
+def test_stream_parser_recovers_from_malformed_markup_like_soup(broken, fixed):
+    page = render_page(STOCKS).decode()
+    assert broken in page
+    content = page.replace(broken, fixed).encode()
+    stocks = parse_stream(content)
+    assert [s.symbol for s in stocks] == ["AKBNK", "THYAO"]
+    assert stocks == parse_soup(content)
+    assert stocks[1] == STOCKS[1]
+
+
+def test_stream_parser_recovers_from_an_unclosed_row():
+    page = render_page(STOCKS).decode()
+    content = page.replace("</ul>", "", 1).encode()
+    assert parse_stream(content) == parse_soup(content) == STOCKS
+
+
+def test_parsers_agree_on_the_bench_fixture():
+    content = load_fixture()
+    rows = parse_stream(content)
+    assert len(rows) == 480
+    assert rows == parse_soup(content)
@@ -0,0 +1,18 @@
+from app.scheduling import AlwaysOpen, ScrapeScheduler
+
+
+def test_long_outage_backs_off_to_the_cap_without_overflowing():
+    scheduler = ScrapeScheduler(interval=3.0, max_backoff=300, calendar=AlwaysOpen())
+    due = 0.0
+    for _ in range(5000):
+        scheduler.failed(due)
+        due = scheduler.next_run(due)
+    assert scheduler.current_interval == 300
+
+
+def test_long_quiet_spell_slows_down_to_the_idle_cap():
+    scheduler = ScrapeScheduler(interval=3.0, idle_after=1, max_idle_interval=30, calendar=AlwaysOpen())
+    scheduler.unchanged = 10 ** 6
+    assert scheduler.current_interval == 30
+    scheduler.completed(0.0, changed=True)
+    assert scheduler.current_interval == 3
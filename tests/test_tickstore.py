@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from app.models import MarketSnapshot, Stock
+from app.tickstore import TickStore
+
+STOCKS = [
+    Stock("AKBNK", 41.26, 41.5, 40.9, 41.18, -0.34, 1_250_000, 51_475_000.0),
+    Stock("THYAO", 287.75, 290.0, 285.25, 288.1, 1.27, 830_000, 239_123_000.0),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TickStore(str(tmp_path / "ticks.db"))
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize("make", [list, MarketSnapshot.from_stocks], ids=["stocks", "snapshot"])
+def test_ticks_round_trip(store, make):
+    store.append(make(STOCKS), ts=1_700_000_000)
+    store.flush()
+    (ts, stocks), = store.snapshots()
+    assert ts == 1_700_000_000
+    assert stocks == STOCKS
+
+
+def test_symbols_and_query_while_the_writer_adds_symbols(store, monkeypatch):
+    resolve = store._symbol_id
+
+    def slow_symbol_id(*args):
+        # Widen the window between resolving a new symbol and committing its rows
+        symbol_id = resolve(*args)
+        time.sleep(0.001)
+        return symbol_id
+
+    monkeypatch.setattr(store, "_symbol_id", slow_symbol_id)
+    appended = [f"S{i:03d}" for i in range(100)] # no more than the queue holds, so none are dropped
+    for i, symbol in enumerate(appended):
+        store.append([Stock(symbol, 1.0, 1.0, 1.0, 1.0, 0.0, 1, 1.0)], ts=1_700_000_000 + i)
+    # Whatever the writer has published so far already has its rows committed
+    checked, deadline = set(), time.monotonic() + 10
+    while len(checked) < len(appended):
+        assert time.monotonic() < deadline, "the writer stopped publishing symbols"
+        for symbol in set(store.symbols()) - checked:
+            assert len(store.query(symbol)["price"]) == 1
+            checked.add(symbol)
+    store.flush()
+    assert store.symbols() == appended
+
+
+def test_write_errors_are_counted_and_later_ticks_still_written(store):
+    store.append([Stock("BAD", float("nan"), 1.0, 1.0, 1.0, 0.0, 1, 1.0)], ts=1_700_000_000)
+    store.flush()
+    store.append(STOCKS, ts=1_700_000_001)
+    store.flush()
+    assert store.failed == 1
+    assert isinstance(store.last_error, ValueError)
+    assert [stocks for _ts, stocks in store.snapshots()] == [STOCKS]
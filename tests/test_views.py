@@ -0,0 +1,52 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QApplication
+
+from app.models import Stock
+from app.views import MarketTableWidget, decimate_minmax
+
+
+@pytest.fixture
+def table():
+    app = QApplication.instance() or QApplication([])
+    table = MarketTableWidget()
+    table.update_data([Stock(symbol, price, 0, 0, 0, 0, 0, price * 1e6)
+                       for symbol, price in [("AAA", 1.0), ("BBB", 2.0), ("CCC", 3.0), ("DDD", 4.0)]])
+    yield table
+    table.deleteLater()
+    app.processEvents()
+
+
+def shown(table):
+    proxy = table.proxy_model
+    return [proxy.data(proxy.index(row, 0)) for row in range(proxy.rowCount())]
+
+
+def test_screen_results_keep_their_rank_order(table):
+    table.set_symbol_filter(["DDD", "BBB", "CCC"]) # e.g. "capacity_tl desc" with a different key
+    assert shown(table) == ["DDD", "BBB", "CCC"]
+    table.set_symbol_filter(["CCC", "AAA"]) # the next tick's ranking
+    assert shown(table) == ["CCC", "AAA"]
+    table.set_symbol_filter(None)
+    assert shown(table) == ["AAA", "BBB", "CCC", "DDD"]
+
+
+def test_clicked_header_overrides_the_rank_order(table):
+    table.set_symbol_filter(["DDD", "BBB", "CCC"])
+    table.sortByColumn(1, Qt.AscendingOrder)
+    assert shown(table) == ["BBB", "CCC", "DDD"]
+    table.set_symbol_filter(["CCC", "AAA"])
+    assert shown(table) == ["AAA", "CCC"]
+
+
+def test_decimate_minmax_with_every_sample_at_one_time():
+    x, y = np.full(10, 19000.5), np.array([3.0, 1.0, 4.0, 1.0, 5.0, 9.0, 2.0, 6.0, 5.0, 3.0])
+    with np.errstate(all="raise"):
+        kept_x, kept_y = decimate_minmax(x, y, 2)
+    assert kept_x.tolist() == [19000.5] * 4
+    assert kept_y.tolist() == [3.0, 1.0, 9.0, 3.0] # first, min, max, last